@@ -0,0 +1,230 @@
+import os
+import json
+import time
+import shutil
+import asyncio
+import logging
+import threading
+import zipfile
+import tempfile
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import requests
+
+try:
+    from .utils import REQUEST_HEADERS
+    from .pipeline import process_cv_file, init_worker_process
+    from .ingest import FILE_EXTENSIONS, UPLOAD_MAX_BYTES, sniff_file_type, is_docx
+except ImportError:
+    from utils import REQUEST_HEADERS
+    from pipeline import process_cv_file, init_worker_process
+    from ingest import FILE_EXTENSIONS, UPLOAD_MAX_BYTES, sniff_file_type, is_docx
+
+logger = logging.getLogger(__name__)
+
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", os.cpu_count() or 2))
+BATCH_MAX_FILES = int(os.environ.get("BATCH_MAX_FILES", 1000))
+# Cap on the total uncompressed size of an uploaded archive
+BATCH_MAX_ARCHIVE_BYTES = int(os.environ.get("BATCH_MAX_ARCHIVE_BYTES", 500 * 1024 * 1024))
+BATCH_DOWNLOAD_TIMEOUT = 20
+
+CV_EXTENSIONS = (".pdf", ".docx")
+
+
+class BatchError(ValueError):
+    """A batch input that cannot be processed at all (as opposed to one bad file in it)."""
+
+
+def _is_url(source: str) -> bool:
+    return source.startswith(("http://", "https://"))
+
+
+def _download(url: str, dest_dir: str) -> str:
+    """Fetch a CV into dest_dir under the extension its content sniffs as."""
+    with requests.get(url, timeout=BATCH_DOWNLOAD_TIMEOUT, headers=REQUEST_HEADERS, stream=True) as response:
+        response.raise_for_status()
+        part_path = os.path.join(dest_dir, "download.part")
+        size = 0
+        with open(part_path, "wb") as f:
+            for chunk in response.iter_content(64 * 1024):
+                size += len(chunk)
+                if size > UPLOAD_MAX_BYTES:
+                    raise BatchError(f"Download is larger than the {UPLOAD_MAX_BYTES} byte limit")
+                f.write(chunk)
+
+    with open(part_path, "rb") as f:
+        file_type = sniff_file_type(f.read(1024))
+    if file_type == "zip":
+        file_type = "docx" if is_docx(part_path) else None
+    if file_type is None:
+        raise BatchError("Only PDF and DOCX files are supported")
+
+    path = os.path.join(dest_dir, f"download{FILE_EXTENSIONS[file_type]}")
+    os.replace(part_path, path)
+    return path
+
+
+def process_source(source: str) -> dict:
+    """
+    Parse and map one CV (file path or URL) into a JSON Lines record.
+    Never raises: failures become {"status": "error"} records so one bad
+    file doesn't sink the batch. Module-level so it pickles into workers.
+    """
+    started = time.perf_counter()
+    tmp_dir = None
+    try:
+        path = source
+        if _is_url(source):
+            tmp_dir = tempfile.mkdtemp(prefix="cv-batch-")
+            path = _download(source, tmp_dir)
+
+        result = process_cv_file(path)
+        return {
+            "source": source,
+            "status": "ok",
+            "cv_data": result["cv_data"],
+            "portfolio_data": result["portfolio_data"],
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+    except Exception as e:
+        logger.debug(traceback.format_exc())
+        return {
+            "source": source,
+            "status": "error",
+            "error": str(e),
+            "error_type": type(e).__name__,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def iter_directory(path: str) -> list:
+    """Every PDF/DOCX under path, recursively, in a stable order."""
+    found = []
+    for root, _, filenames in os.walk(path):
+        for filename in filenames:
+            if filename.lower().endswith(CV_EXTENSIONS) and not filename.startswith("."):
+                found.append(os.path.join(root, filename))
+    return sorted(found)
+
+
+def expand_sources(inputs: list) -> list:
+    """Directories become the CVs inside them; files and URLs pass through."""
+    sources = []
+    for item in inputs:
+        if not _is_url(item) and os.path.isdir(item):
+            sources.extend(iter_directory(item))
+        else:
+            sources.append(item)
+    return sources
+
+
+def extract_archive(archive_path: str, dest_dir: str, max_files: int = BATCH_MAX_FILES,
+                    max_bytes: int = BATCH_MAX_ARCHIVE_BYTES) -> list:
+    """
+    Unpack the PDF/DOCX members of a zip into dest_dir and return their paths.
+    Member names are flattened (no path traversal) and the total
+    uncompressed size is capped before anything is written.
+    """
+    try:
+        archive = zipfile.ZipFile(archive_path)
+    except zipfile.BadZipFile as e:
+        raise BatchError(f"Not a valid zip archive: {e}")
+
+    with archive:
+        members = [
+            info for info in archive.infolist()
+            if not info.is_dir() and info.filename.lower().endswith(CV_EXTENSIONS)
+            and not os.path.basename(info.filename).startswith(".")
+        ]
+        if len(members) > max_files:
+            raise BatchError(f"Archive holds {len(members)} CVs, more than the {max_files} file limit")
+        total = sum(info.file_size for info in members)
+        if total > max_bytes:
+            raise BatchError(f"Archive expands to {total} bytes, more than the {max_bytes} byte limit")
+
+        paths = []
+        for index, info in enumerate(members):
+            name = f"{index:05d}_{os.path.basename(info.filename)}"
+            path = os.path.join(dest_dir, name)
+            with archive.open(info) as src, open(path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            paths.append(path)
+        return paths
+
+
+def run_batch(sources: list, workers: int = BATCH_WORKERS):
+    """Yield one record per source, in completion order, from a process pool."""
+    if not sources:
+        return
+    workers = max(1, min(workers, len(sources)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker_process) as executor:
+        futures = {executor.submit(process_source, source): index for index, source in enumerate(sources)}
+        try:
+            for future in as_completed(futures):
+                yield {"index": futures[future], **future.result()}
+        finally:
+            # Closing the generator early drops whatever hasn't started
+            for future in futures:
+                future.cancel()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_batch_executor() -> ProcessPoolExecutor:
+    """
+    Process pool shared by every batch request in this process, so parallel
+    batches queue for the same BATCH_WORKERS processes instead of each
+    starting (and loading models into) their own.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            logger.info(f"Starting batch process pool with {BATCH_WORKERS} workers")
+            _executor = ProcessPoolExecutor(max_workers=max(1, BATCH_WORKERS), initializer=init_worker_process)
+        return _executor
+
+
+def shutdown_batch_executor(wait: bool = True):
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait, cancel_futures=True)
+            _executor = None
+
+
+async def arun_batch(sources: list, executor: ProcessPoolExecutor = None):
+    """
+    run_batch for the event loop, on the shared batch pool: records are
+    yielded as they finish. If the consumer stops early (e.g. the client
+    disconnected), CVs that haven't started are cancelled.
+    """
+    executor = executor or get_batch_executor()
+    futures = {
+        asyncio.wrap_future(executor.submit(process_source, source)): index
+        for index, source in enumerate(sources)
+    }
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                yield {"index": futures[future], **future.result()}
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def write_jsonl(records, out) -> dict:
+    """Write records as JSON Lines and return ok/error counts."""
+    counts = {"ok": 0, "error": 0}
+    for record in records:
+        counts[record["status"]] += 1
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+    return counts
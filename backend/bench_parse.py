@@ -0,0 +1,177 @@
+"""
+Offline benchmark and golden-output check for the CV parser.
+
+Runs extract_text + parse_cv over a local corpus (by default the PDFs in
+uploads/), reports p50/p95 per stage and overall throughput, and diffs
+every result against data/golden/<file>.json. Run from the backend
+directory:
+
+    python bench_parse.py                   # time + diff against goldens
+    python bench_parse.py --runs 5 --json   # machine-readable report
+    python bench_parse.py --update-golden   # (re)write goldens after an intended change
+
+Exits non-zero when any output differs from its golden file, so
+performance work can't silently change extraction results.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from utils import extract_text, parse_cv
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS = os.path.join(BASE_DIR, "uploads")
+DEFAULT_GOLDEN_DIR = os.path.join(BASE_DIR, "data", "golden")
+
+STAGES = [
+    "extract_text", "fix_broken_words", "sectioning", "name", "contact", "summary", "skills",
+    "education", "experience", "projects", "certifications", "sanitize", "canonicalize_skills",
+    "validate_schema", "total",
+]
+
+
+def corpus_files(path: str) -> list:
+    if os.path.isfile(path):
+        return [path]
+    return sorted(
+        os.path.join(path, name) for name in os.listdir(path)
+        if name.lower().endswith((".pdf", ".docx")) and not name.startswith(".")
+    )
+
+
+def golden_path(golden_dir: str, cv_path: str) -> str:
+    return os.path.join(golden_dir, os.path.splitext(os.path.basename(cv_path))[0] + ".json")
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def diff_json(expected, actual, path: str = "$") -> list:
+    """Human-readable differences between two JSON values."""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        diffs = []
+        for key in sorted(set(expected) | set(actual), key=str):
+            if key not in actual:
+                diffs.append(f"{path}.{key}: missing (expected {json.dumps(expected[key])[:80]})")
+            elif key not in expected:
+                diffs.append(f"{path}.{key}: unexpected {json.dumps(actual[key])[:80]}")
+            else:
+                diffs.extend(diff_json(expected[key], actual[key], f"{path}.{key}"))
+        return diffs
+    if isinstance(expected, list) and isinstance(actual, list):
+        diffs = []
+        if len(expected) != len(actual):
+            diffs.append(f"{path}: length {len(actual)}, expected {len(expected)}")
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            diffs.extend(diff_json(e, a, f"{path}[{i}]"))
+        return diffs
+    if expected != actual:
+        return [f"{path}: {json.dumps(actual)[:80]}, expected {json.dumps(expected)[:80]}"]
+    return []
+
+
+def run_once(cv_path: str):
+    timings = {}
+    started = time.perf_counter()
+    text = extract_text(cv_path)
+    timings["extract_text"] = (time.perf_counter() - started) * 1000
+    result = parse_cv(text, timings=timings)
+    timings["total"] = (time.perf_counter() - started) * 1000
+    return result, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parse_cv and diff it against golden outputs.")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="Directory (or single file) of CVs.")
+    parser.add_argument("--golden-dir", default=DEFAULT_GOLDEN_DIR, help="Directory of golden JSON outputs.")
+    parser.add_argument("--runs", type=int, default=3, help="Timed passes over the corpus.")
+    parser.add_argument("--update-golden", action="store_true", help="Write current outputs as the goldens.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    files = corpus_files(args.corpus)
+    if not files:
+        raise SystemExit(f"No CVs found in {args.corpus}")
+
+    # Untimed pass: loads spaCy, the skill matcher etc. and produces the outputs to check
+    outputs = {path: run_once(path)[0] for path in files}
+
+    samples = {stage: [] for stage in STAGES}
+    started = time.perf_counter()
+    for _ in range(args.runs):
+        for path in files:
+            _, timings = run_once(path)
+            for stage in STAGES:
+                samples[stage].append(timings.get(stage, 0.0))
+    elapsed = time.perf_counter() - started
+
+    mismatches = {}
+    missing = []
+    if args.update_golden:
+        os.makedirs(args.golden_dir, exist_ok=True)
+        for path, output in outputs.items():
+            with open(golden_path(args.golden_dir, path), "w") as f:
+                json.dump(output, f, indent=2, sort_keys=True)
+                f.write("\n")
+    else:
+        for path, output in outputs.items():
+            golden_file = golden_path(args.golden_dir, path)
+            if not os.path.exists(golden_file):
+                missing.append(os.path.basename(path))
+                continue
+            with open(golden_file) as f:
+                diffs = diff_json(json.load(f), json.loads(json.dumps(output)))
+            if diffs:
+                mismatches[os.path.basename(path)] = diffs
+
+    report = {
+        "files": len(files),
+        "runs": args.runs,
+        "throughput_cvs_per_s": round(len(files) * args.runs / elapsed, 2) if elapsed else 0.0,
+        "stages": {
+            stage: {
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+            }
+            for stage, values in samples.items()
+        },
+        "golden": {
+            "updated": len(outputs) if args.update_golden else 0,
+            "matched": 0 if args.update_golden else len(files) - len(missing) - len(mismatches),
+            "missing": missing,
+            "mismatched": mismatches,
+        },
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['files']} CVs x {report['runs']} runs, {report['throughput_cvs_per_s']} CVs/s")
+        print(f"{'stage':<18}{'p50 (ms)':>12}{'p95 (ms)':>12}")
+        for stage, row in report["stages"].items():
+            print(f"{stage:<18}{row['p50_ms']:>12}{row['p95_ms']:>12}")
+        golden = report["golden"]
+        if args.update_golden:
+            print(f"\nWrote {golden['updated']} golden files to {args.golden_dir}")
+        else:
+            print(f"\nGolden: {golden['matched']} matched, {len(golden['mismatched'])} differ, "
+                  f"{len(golden['missing'])} without a golden file")
+            for name, diffs in golden["mismatched"].items():
+                print(f"  {name}")
+                for line in diffs[:10]:
+                    print(f"    {line}")
+                if len(diffs) > 10:
+                    print(f"    ... {len(diffs) - 10} more")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
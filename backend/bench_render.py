@@ -0,0 +1,87 @@
+"""
+Render benchmark for site_renderer.
+
+Builds synthetic portfolios with many projects, skills and experience
+entries and times full-page rendering per theme. Run from the backend
+directory:
+
+    python bench_render.py
+    python bench_render.py --projects 500 --skills 1000 --runs 20
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from site_renderer import THEME_STYLES, render_site, write_site
+
+
+def synthetic_portfolio(projects: int, skills: int, jobs: int) -> dict:
+    skill_names = [f"Skill <{i}> & Co" for i in range(skills)]
+    return {
+        "hero": {"name": "Ada \"Bench\" Lovelace", "tagline": "Engineer | Writer", "location": "London"},
+        "about": {"summary": "Builds things & measures them. " * 10},
+        "skills_section": {"primary_skills": skill_names[:8], "secondary_skills": skill_names[8:]},
+        "experience_timeline": [
+            {
+                "role": f"Engineer {i}",
+                "company": f"Company {i}",
+                "period": "Jan 2020 - Dec 2022",
+                "highlights": [f"Shipped feature {j} for <team {i}>" for j in range(4)],
+                "tech_stack": skill_names[:5],
+            }
+            for i in range(jobs)
+        ],
+        "projects_section": [
+            {
+                "title": f"Project {i}",
+                "short_description": f"A project that does {i} things & more.",
+                "tech_stack": skill_names[i % 10:i % 10 + 6],
+                "highlights": [],
+            }
+            for i in range(projects)
+        ],
+        "contact_section": {
+            "full_name": "Ada Lovelace",
+            "email": "ada@example.com",
+            "linkedin": "https://linkedin.com/in/ada",
+            "github": "https://github.com/ada",
+            "portfolio": "",
+        },
+    }
+
+
+def timed(fn, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark portfolio site rendering.")
+    parser.add_argument("--projects", type=int, default=300)
+    parser.add_argument("--skills", type=int, default=500)
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    portfolio = synthetic_portfolio(args.projects, args.skills, args.jobs)
+    index_path = os.path.join(tempfile.mkdtemp(), "index.html")
+
+    print(f"{args.projects} projects, {args.skills} skills, {args.jobs} jobs, {args.runs} runs")
+    print(f"{'theme':<10}{'render p50 (ms)':>17}{'render max (ms)':>17}{'write p50 (ms)':>16}{'size (KB)':>11}")
+    for theme in THEME_STYLES:
+        render_site(portfolio, theme)  # compile templates outside the timed runs
+        render_ms = timed(lambda: render_site(portfolio, theme), args.runs)
+        write_ms = timed(lambda: write_site(index_path, portfolio, theme), args.runs)
+        size_kb = os.path.getsize(index_path) / 1024
+        print(f"{theme:<10}{statistics.median(render_ms):>17.2f}{max(render_ms):>17.2f}"
+              f"{statistics.median(write_ms):>16.2f}{size_kb:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Import-time benchmark for the backend modules.
+
+Each module is imported in a fresh interpreter so results reflect a real
+cold start. Run from the backend directory:
+
+    python bench_startup.py --runs 5
+    python bench_startup.py --warm-up all --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+MODULES = ["utils", "llm_enhancer", "tools", "pipeline", "main"]
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+warm = {warm!r}
+loaded = {{}}
+if warm:
+    from resources import registry
+    registry.warm_up(None if warm == "all" else warm.split(","))
+    loaded = registry.loaded()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "warm_up_ms": (time.perf_counter() - imported) * 1000,
+    "resources": loaded,
+}}))
+"""
+
+
+def measure(module: str, warm: str = "") -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, warm=warm)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip()}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import time of backend modules.")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per module.")
+    parser.add_argument("--modules", nargs="+", default=MODULES, help="Modules to import.")
+    parser.add_argument(
+        "--warm-up",
+        default="",
+        help="Also time resources.registry.warm_up() for these names ('all' or comma-separated).",
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    report = {}
+    for module in args.modules:
+        samples = [measure(module, args.warm_up) for _ in range(args.runs)]
+        report[module] = {
+            "import_ms_median": round(statistics.median(s["import_ms"] for s in samples), 1),
+            "import_ms_max": round(max(s["import_ms"] for s in samples), 1),
+            "warm_up_ms_median": round(statistics.median(s["warm_up_ms"] for s in samples), 1),
+            "resources": samples[-1]["resources"],
+        }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'module':<14}{'import p50 (ms)':>18}{'import max (ms)':>18}{'warm-up p50 (ms)':>19}")
+    for module, row in report.items():
+        print(f"{module:<14}{row['import_ms_median']:>18}{row['import_ms_max']:>18}{row['warm_up_ms_median']:>19}")
+        for name, ms in row["resources"].items():
+            print(f"    {name:<28}{ms:>10} ms")
+
+
+if __name__ == "__main__":
+    main()
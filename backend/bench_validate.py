@@ -0,0 +1,78 @@
+"""
+Validation benchmark for parser output.
+
+Compares the old path, validate_schema(json.dumps(data), data) (serialize,
+regex-extract, json.loads, then check), with validate_cv_dict on the dict
+itself, for synthetic CVs of increasing size. Run from the backend
+directory:
+
+    python bench_validate.py
+    python bench_validate.py --jobs 200 --projects 200 --runs 500
+"""
+import argparse
+import json
+import logging
+import statistics
+import time
+
+from schema_validator import validate_cv_dict, validate_schema
+
+
+def synthetic_cv(jobs: int, projects: int, skills: int) -> dict:
+    bullets = [f"Shipped feature {i} that cut p95 latency by {i}% across services" for i in range(6)]
+    return {
+        "name": "Ada Lovelace",
+        "contact": {"email": "ada@example.com", "phone": "+44 20 7946 0000", "links": [], "location": "London"},
+        "summary": "Engineer who builds and measures things. " * 8,
+        "skills": [f"Skill {i}" for i in range(skills)],
+        "education": [{"degree": "B.Sc. Mathematics", "institution": "University of London", "year": "2015",
+                       "duration": "2012 - 2015"}],
+        "experience": [
+            {"role": f"Engineer {i}", "company": f"Company {i}", "start_date": "Jan 2020",
+             "end_date": "Dec 2022", "description": bullets, "tech_stack": ["Python", "Go", "Postgres"]}
+            for i in range(jobs)
+        ],
+        "projects": [
+            {"title": f"Project {i}", "description": bullets[:3], "tech_stack": ["React", "FastAPI"]}
+            for i in range(projects)
+        ],
+        "certifications": [f"Certification {i}" for i in range(10)],
+    }
+
+
+def time_call(fn, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CV schema validation paths.")
+    parser.add_argument("--jobs", type=int, default=50, help="Experience entries in the largest CV.")
+    parser.add_argument("--projects", type=int, default=50, help="Projects in the largest CV.")
+    parser.add_argument("--skills", type=int, default=300, help="Skills in the largest CV.")
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    # Rejections are logged; keep the output to the table
+    logging.getLogger("schema_validator").setLevel(logging.ERROR)
+
+    sizes = [
+        ("typical", synthetic_cv(3, 4, 30)),
+        ("large", synthetic_cv(args.jobs // 4 or 1, args.projects // 4 or 1, args.skills // 4 or 1)),
+        ("huge", synthetic_cv(args.jobs, args.projects, args.skills)),
+    ]
+
+    print(f"{'cv':<10}{'json bytes':>12}{'round-trip (us)':>18}{'dict (us)':>12}{'speedup':>10}")
+    for label, cv in sizes:
+        assert validate_schema(json.dumps(cv), cv) is not cv and not validate_cv_dict(cv)
+        old = statistics.median(time_call(lambda: validate_schema(json.dumps(cv), cv), args.runs))
+        new = statistics.median(time_call(lambda: validate_cv_dict(cv), args.runs))
+        print(f"{label:<10}{len(json.dumps(cv)):>12}{old:>18.1f}{new:>12.1f}{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import re
+from typing import Dict, List
+
+BULLET_RE = re.compile(r'^[\s]*[•\-\*]')
+YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
+
+
+def normalize_text(text):
+    text = re.sub(r"\r", "\n", text)
+    text = re.sub(r"\n+", "\n", text)
+    return text
+
+
+# Section types behind is_section_header's 'OTHER', first match wins
+# ("Skills & Certifications" is SKILLS)
+OTHER_SECTIONS = [
+    ("SKILLS", ["skill", "programming language"]),
+    ("EDUCATION", ["education"]),
+    ("COURSEWORK", ["coursework"]),
+    ("CERTIFICATIONS", ["certification"]),
+    ("ACHIEVEMENTS", ["award", "honor", "achievement"]),
+    ("PUBLICATIONS", ["publication"]),
+    ("ACTIVITIES", ["activity", "leadership", "volunteer"]),
+    ("INTERESTS", ["interest"]),
+    ("LANGUAGES", ["language"]),
+    ("REFERENCES", ["reference"]),
+    ("SUMMARY", ["summary", "objective", "profile"]),
+]
+
+# Skills headers only matched as the whole line: as substrings they would
+# also catch "Technologies: React, Node" lines inside projects
+SKILLS_HEADERS = {"technologies", "tech stack", "skills used"}
+
+
+def is_section_header(line):
+    """
+    Detect if a line is a major section header (Education, Experience, Projects, etc.)
+    Returns the section type or None
+    """
+    clean = line.lower().strip().rstrip(':').rstrip('.')
+    words = clean.split()
+
+    # Headers should be short
+    if len(words) > 5:
+        return None
+
+    # Must look like a header
+    if not (line.isupper() or line.istitle() or line.endswith(':') or
+            (len(words) <= 2 and all(w[0].isupper() for w in words if w))):
+        return None
+
+    # Experience variations
+    if any(kw in clean for kw in ['experience', 'employment', 'work history', 'internship']):
+        return 'EXPERIENCE'
+
+    # Projects variations
+    if any(kw in clean for kw in ['project']):
+        return 'PROJECTS'
+
+    # Other sections to stop at
+    if clean in SKILLS_HEADERS or any(kw in clean for _, keywords in OTHER_SECTIONS for kw in keywords):
+        return 'OTHER'
+
+    return None
+
+
+def section_type(line):
+    """is_section_header with 'OTHER' resolved to the specific section (SKILLS, EDUCATION, ...)."""
+    kind = is_section_header(line)
+    if kind != 'OTHER':
+        return kind
+    clean = line.lower()
+    if clean.strip().rstrip(':').rstrip('.') in SKILLS_HEADERS:
+        return 'SKILLS'
+    for name, keywords in OTHER_SECTIONS:
+        if any(kw in clean for kw in keywords):
+            return name
+    return kind
+
+
+def is_tech_stack_line(lower: str) -> bool:
+    return (
+        "tech stack" in lower
+        or "technologies" in lower
+        or "technologies used" in lower
+        or "tools used" in lower
+        or lower.startswith("stack:")
+    )
+
+
+class DocLine:
+    """One stripped line of a CV, classified once."""
+
+    __slots__ = ("text", "lower", "kind", "is_bullet", "has_year", "is_tech_stack")
+
+    def __init__(self, line: str):
+        self.text = line.strip()
+        self.lower = self.text.lower()
+        # Section type from section_type, or None for content lines
+        self.kind = section_type(self.text) if self.text else None
+        self.is_bullet = BULLET_RE.match(self.text) is not None
+        self.has_year = YEAR_RE.search(self.text) is not None
+        self.is_tech_stack = is_tech_stack_line(self.lower)
+
+    def __repr__(self):
+        return f"DocLine({self.text!r}, kind={self.kind})"
+
+
+def as_doc_lines(lines) -> List[DocLine]:
+    """Accept plain strings as well as DocLines, for callers outside parse_cv."""
+    return [line if isinstance(line, DocLine) else DocLine(line) for line in lines]
+
+
+class CVDocument:
+    """
+    A CV's text split, lowercased and classified in a single pass, shared by
+    every extractor in parse_cv instead of each re-splitting the text.
+
+    `raw_lines` is the text split on newlines as-is (extractors that look at
+    the first N lines count blank ones too); `lines` is the normalized text
+    (see normalize_text) as DocLines. `spans` lists (section, start, end)
+    ranges of `lines` that follow each section header, end exclusive, for
+    every section type section_type knows; extractors read only their own.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = text.lower()
+        self.raw_lines = text.split("\n")
+        # Lowercasing never adds or removes newlines, so this lines up with raw_lines
+        self.raw_lower = self.lower.split("\n")
+        self.lines = [DocLine(line) for line in normalize_text(text).split("\n") if line]
+        self.spans = self._segment()
+        self._sections: Dict[str, List[DocLine]] = {}
+
+    def _segment(self) -> list:
+        spans = []
+        current, start = None, 0
+        for index, line in enumerate(self.lines):
+            if line.kind is None:
+                continue
+            if current is not None:
+                spans.append((current, start, index))
+            current, start = line.kind, index + 1
+        if current is not None:
+            spans.append((current, start, len(self.lines)))
+        return spans
+
+    def section(self, name: str) -> List[DocLine]:
+        """Non-empty content lines under every header of the given section type, in order."""
+        if name not in self._sections:
+            self._sections[name] = [
+                line
+                for section, start, end in self.spans if section == name
+                for line in self.lines[start:end] if line.text
+            ]
+        return self._sections[name]
+
+    def has_section(self, name: str) -> bool:
+        return any(section == name for section, _, _ in self.spans)
+
+    def section_text(self, name: str) -> List[str]:
+        return [line.text for line in self.section(name)]
+
+
+def as_document(text_or_doc) -> CVDocument:
+    return text_or_doc if isinstance(text_or_doc, CVDocument) else CVDocument(text_or_doc)
@@ -0,0 +1,252 @@
+import os
+import time
+import random
+import hashlib
+import asyncio
+import logging
+from collections import OrderedDict
+from uuid import uuid4
+
+try:
+    from .vercel_deploy import collect_files, is_retryable
+    from .metrics import request_id_var
+except ImportError:
+    from vercel_deploy import collect_files, is_retryable
+    from metrics import request_id_var
+
+logger = logging.getLogger(__name__)
+
+DEPLOY_WORKERS = int(os.environ.get("DEPLOY_WORKERS", 2))
+# Deployments that may be queued or running at once before /deploy answers 429
+DEPLOY_MAX_PENDING = int(os.environ.get("DEPLOY_MAX_PENDING", 100))
+DEPLOY_MAX_ATTEMPTS = int(os.environ.get("DEPLOY_MAX_ATTEMPTS", 4))
+DEPLOY_BACKOFF_BASE = float(os.environ.get("DEPLOY_BACKOFF_BASE", 2.0))
+DEPLOY_BACKOFF_MAX = float(os.environ.get("DEPLOY_BACKOFF_MAX", 60.0))
+DEPLOY_RETENTION = int(os.environ.get("DEPLOY_RETENTION", 500))
+
+ACTIVE_STATUSES = ("queued", "running", "retrying")
+
+
+class DeployQueueFullError(RuntimeError):
+    """Raised when DEPLOY_MAX_PENDING deployments are already in flight."""
+
+
+def site_content_hash(repo_path: str) -> str:
+    """Idempotency key for a deploy: hash of every deployable file name and SHA-1."""
+    digest = hashlib.sha256()
+    for entry in collect_files(repo_path):
+        digest.update(f"{entry['file']}\0{entry['sha']}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def backoff_delay(attempt: int, base: float = DEPLOY_BACKOFF_BASE, cap: float = DEPLOY_BACKOFF_MAX) -> float:
+    """Exponential backoff with up to 10% jitter: base, 2*base, 4*base, ... capped."""
+    delay = min(cap, base * (2 ** (attempt - 1)))
+    return delay + random.uniform(0, delay * 0.1)
+
+
+class Deployment:
+    """One deploy of a site folder, shared by every user who requested the same content."""
+
+    def __init__(self, repo_path: str, idempotency_key: str):
+        self.deploy_id = str(uuid4())
+        self.repo_path = repo_path
+        self.idempotency_key = idempotency_key
+        self.user_ids = []
+        # Request that queued the deploy, so worker logs can be traced back to it
+        self.request_id = request_id_var.get()
+        self.status = "queued"
+        self.attempts = 0
+        self.error = None
+        self.live_url = None
+        self.result = None
+        self.created_at = time.time()
+        self.next_attempt_at = None
+        self.finished_at = None
+        self._finished = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    async def wait(self, timeout: float = None) -> bool:
+        """Wait for the deploy to finish; False if the timeout expired first."""
+        try:
+            await asyncio.wait_for(self._finished.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def to_dict(self) -> dict:
+        return {
+            "deploy_id": self.deploy_id,
+            "repo_path": self.repo_path,
+            "idempotency_key": self.idempotency_key,
+            "request_id": self.request_id,
+            "status": self.status,
+            "attempts": self.attempts,
+            "error": self.error,
+            "live_url": self.live_url,
+            "created_at": self.created_at,
+            "next_attempt_at": self.next_attempt_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class DeployQueue:
+    """
+    Bounded pool of asyncio workers running deploy_fn in threads.
+
+    deploy_fn(repo_path) returns deploy_site_tool's result: a dict with
+    status "success" and live_url, a dict with status "error", or an error
+    string for configuration problems such as a missing token (not
+    retried). Errors are retried with exponential backoff only when the
+    dict says "retryable" (rate limits, 5xx and network errors); a rejected
+    token or request fails at once.
+
+    Requests for content that is already queued, running or deployed return
+    the existing Deployment instead of deploying again. Every status change
+    is written to the requesting users' state under "deploy" via
+    record_state(user_id, deploy_dict).
+    """
+
+    def __init__(self, deploy_fn, record_state=None, workers: int = DEPLOY_WORKERS,
+                 max_pending: int = DEPLOY_MAX_PENDING, max_attempts: int = DEPLOY_MAX_ATTEMPTS,
+                 retention: int = DEPLOY_RETENTION):
+        self.deploy_fn = deploy_fn
+        self.record_state = record_state
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retention = retention
+        self._deployments = OrderedDict()
+        self._by_key = {}
+        self._queue = None
+        self._tasks = []
+
+    def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.get_running_loop().create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @property
+    def pending(self) -> int:
+        return sum(1 for d in self._deployments.values() if not d.done)
+
+    def get(self, deploy_id: str):
+        return self._deployments.get(deploy_id)
+
+    async def enqueue(self, user_id: str, repo_path: str) -> Deployment:
+        """
+        Queue a deploy of repo_path for user_id, or join an identical one.
+        Raises DeployQueueFullError when too many deploys are in flight.
+        """
+        self.start()
+        key = await asyncio.to_thread(site_content_hash, repo_path)
+
+        existing = self._by_key.get(key)
+        if existing is not None and existing.status != "failed":
+            if user_id not in existing.user_ids:
+                existing.user_ids.append(user_id)
+            await self._record(existing, [user_id])
+            logger.info(f"Deploy for user {user_id} joined {existing.deploy_id} ({existing.status})")
+            return existing
+
+        if self.pending >= self.max_pending:
+            raise DeployQueueFullError(f"{self.pending} deployments already pending")
+
+        deployment = Deployment(repo_path, key)
+        deployment.user_ids.append(user_id)
+        self._deployments[deployment.deploy_id] = deployment
+        self._by_key[key] = deployment
+        self._evict()
+        await self._record(deployment)
+        self._queue.put_nowait(deployment)
+        return deployment
+
+    def _evict(self):
+        finished = [deploy_id for deploy_id, d in self._deployments.items() if d.done]
+        while len(self._deployments) > self.retention and finished:
+            deployment = self._deployments.pop(finished.pop(0))
+            if self._by_key.get(deployment.idempotency_key) is deployment:
+                del self._by_key[deployment.idempotency_key]
+
+    async def _record(self, deployment: Deployment, user_ids=None):
+        if self.record_state is None:
+            return
+        for user_id in user_ids or deployment.user_ids:
+            try:
+                await asyncio.to_thread(self.record_state, user_id, deployment.to_dict())
+            except Exception as e:
+                logger.warning(f"Could not record deploy state for user {user_id}: {e}")
+
+    def _retry_later(self, deployment: Deployment, delay: float):
+        # Re-queue after the delay instead of sleeping, so the worker stays free
+        deployment.next_attempt_at = time.time() + delay
+        asyncio.get_running_loop().call_later(delay, self._queue.put_nowait, deployment)
+
+    async def _worker(self, index: int):
+        while True:
+            deployment = await self._queue.get()
+            token = request_id_var.set(deployment.request_id)
+            try:
+                await self._attempt(deployment)
+            except Exception as e:
+                logger.error(f"Deploy worker {index} crashed on {deployment.deploy_id}: {e}")
+                self._finish(deployment, "failed", error=str(e))
+                await self._record(deployment)
+            finally:
+                request_id_var.reset(token)
+                self._queue.task_done()
+
+    def _finish(self, deployment: Deployment, status: str, error: str = None):
+        deployment.status = status
+        deployment.error = error
+        deployment.next_attempt_at = None
+        deployment.finished_at = time.time()
+        deployment._finished.set()
+
+    async def _attempt(self, deployment: Deployment):
+        deployment.status = "running"
+        deployment.attempts += 1
+        deployment.next_attempt_at = None
+        await self._record(deployment)
+
+        try:
+            result = await asyncio.to_thread(self.deploy_fn, deployment.repo_path)
+        except Exception as e:
+            result = {"status": "error", "message": str(e), "retryable": is_retryable(e)}
+        deployment.result = result
+
+        if isinstance(result, dict) and result.get("status") == "success":
+            deployment.live_url = result.get("live_url")
+            self._finish(deployment, "succeeded")
+            logger.info(f"Deploy {deployment.deploy_id} succeeded after {deployment.attempts} attempt(s)")
+        elif isinstance(result, str):
+            # deploy_site_tool reports configuration problems as plain strings
+            self._finish(deployment, "failed", error=result)
+            logger.error(f"Deploy {deployment.deploy_id} failed permanently: {result}")
+        elif not result.get("retryable"):
+            self._finish(deployment, "failed", error=result.get("message", "Deployment failed"))
+            logger.error(f"Deploy {deployment.deploy_id} failed permanently: {deployment.error}")
+        elif deployment.attempts >= self.max_attempts:
+            self._finish(deployment, "failed", error=result.get("message", "Deployment failed"))
+            logger.error(f"Deploy {deployment.deploy_id} failed after {deployment.attempts} attempts")
+        else:
+            delay = backoff_delay(deployment.attempts)
+            deployment.status = "retrying"
+            deployment.error = result.get("message", "Deployment failed")
+            logger.warning(
+                f"Deploy {deployment.deploy_id} attempt {deployment.attempts} failed "
+                f"({deployment.error}); retrying in {delay:.1f}s"
+            )
+            self._retry_later(deployment, delay)
+
+        await self._record(deployment)
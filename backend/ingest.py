@@ -0,0 +1,184 @@
+import os
+import re
+import time
+import shutil
+import hashlib
+import logging
+import zipfile
+import threading
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+# Own directory, so retention sweeps never touch anything else under uploads/
+UPLOAD_SPOOL_DIR = os.environ.get("UPLOAD_SPOOL_DIR", os.path.join("uploads", "spool"))
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", 10 * 1024 * 1024))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Seconds to keep an upload after it has been processed; 0 deletes it straight away
+UPLOAD_RETENTION = float(os.environ.get("UPLOAD_RETENTION", 0))
+# Minimum seconds between retention sweeps of UPLOAD_SPOOL_DIR
+UPLOAD_SWEEP_INTERVAL = 60
+# Files left behind by crashed requests are removed at startup once this old
+STALE_UPLOAD_AGE = 3600
+
+# Extension each sniffed type is stored under; extract_text dispatches on it
+FILE_EXTENSIONS = {"pdf": ".pdf", "docx": ".docx", "zip": ".zip"}
+
+# PDF readers accept the header anywhere in the first KB
+PDF_MAGIC = b"%PDF-"
+PDF_MAGIC_WINDOW = 1024
+ZIP_MAGIC = b"PK\x03\x04"
+
+
+class UploadTooLargeError(ValueError):
+    """The upload is bigger than UPLOAD_MAX_BYTES."""
+
+
+class UnsupportedFileTypeError(ValueError):
+    """The upload's content is neither a PDF nor a DOCX."""
+
+
+def sniff_file_type(head: bytes):
+    """'pdf', 'zip' (a DOCX candidate, confirmed once complete) or None, from the leading bytes."""
+    # Zip first: an uncompressed zip member can put "%PDF-" inside the first KB
+    if head.startswith(ZIP_MAGIC):
+        return "zip"
+    if PDF_MAGIC in head[:PDF_MAGIC_WINDOW]:
+        return "pdf"
+    return None
+
+
+def is_docx(path: str) -> bool:
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return "word/document.xml" in archive.namelist()
+    except zipfile.BadZipFile:
+        return False
+
+
+def safe_stem(filename: str) -> str:
+    """Filename without directories or extension, reduced to a safe character set."""
+    stem = os.path.splitext(os.path.basename(filename or ""))[0]
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", stem)[:80].strip("._") or "upload"
+
+
+class SpooledUpload:
+    """An upload written to disk, with everything learned while writing it."""
+
+    def __init__(self, path: str, digest: str, size: int, file_type: str, filename: str):
+        self.path = path
+        self.digest = digest
+        self.size = size
+        self.file_type = file_type
+        self.filename = filename
+
+
+async def ingest_upload(upload, user_id: str, upload_dir: str = UPLOAD_SPOOL_DIR,
+                        max_bytes: int = UPLOAD_MAX_BYTES, allow_archives: bool = False) -> SpooledUpload:
+    """
+    Stream a FastAPI UploadFile to a spool file in one pass: enforce the size
+    cap, hash with SHA-256 (the parse cache key) and sniff the type from the
+    first bytes. Rejected uploads leave nothing behind.
+
+    With allow_archives, zip files that aren't DOCX are accepted as "zip".
+    """
+    os.makedirs(upload_dir, exist_ok=True)
+    part_path = os.path.join(upload_dir, f".{uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    file_type = None
+
+    try:
+        with open(part_path, "wb") as spool:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"Upload is larger than the {max_bytes} byte limit")
+                if file_type is None:
+                    head += chunk
+                    if len(head) >= PDF_MAGIC_WINDOW:
+                        file_type = sniff_file_type(head)
+                        if file_type is None:
+                            raise UnsupportedFileTypeError("Only PDF and DOCX files are supported")
+                digest.update(chunk)
+                spool.write(chunk)
+
+        if file_type is None:
+            file_type = sniff_file_type(head)
+        if file_type == "zip" and is_docx(part_path):
+            file_type = "docx"
+        elif file_type == "zip" and not allow_archives:
+            file_type = None
+        if file_type is None:
+            raise UnsupportedFileTypeError(
+                "Only PDF, DOCX and zip files are supported" if allow_archives
+                else "Only PDF and DOCX files are supported"
+            )
+
+        path = os.path.join(upload_dir, f"{user_id}_{safe_stem(upload.filename)}{FILE_EXTENSIONS[file_type]}")
+        os.replace(part_path, path)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+
+    logger.info(f"Ingested {upload.filename} for user {user_id}: {file_type}, {size} bytes")
+    return SpooledUpload(path, digest.hexdigest(), size, file_type, upload.filename)
+
+
+_last_sweep = 0.0
+_sweep_lock = threading.Lock()
+
+
+def release_upload(path: str, retention: float = UPLOAD_RETENTION):
+    """
+    Called once an upload has been processed: deletes it now, or with a
+    retention period leaves it for sweep_uploads to collect later.
+    """
+    global _last_sweep
+    if retention <= 0:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        return
+
+    with _sweep_lock:
+        due = time.time() - _last_sweep >= UPLOAD_SWEEP_INTERVAL
+        if due:
+            _last_sweep = time.time()
+    if due:
+        sweep_uploads(retention=retention)
+
+
+def sweep_uploads(upload_dir: str = UPLOAD_SPOOL_DIR, retention: float = UPLOAD_RETENTION) -> int:
+    """Delete uploads and stale spool files older than the retention period."""
+    if not os.path.isdir(upload_dir):
+        return 0
+    cutoff = time.time() - max(retention, 0)
+    removed = 0
+    for name in os.listdir(upload_dir):
+        path = os.path.join(upload_dir, name)
+        try:
+            if os.path.getmtime(path) >= cutoff:
+                continue
+            if os.path.isdir(path):
+                # Per-batch working directories (see /batch/upload-cv)
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    if removed:
+        logger.info(f"Removed {removed} expired uploads from {upload_dir}")
+    return removed
+
+
+def sweep_stale_uploads(upload_dir: str = UPLOAD_SPOOL_DIR) -> int:
+    """Startup cleanup; never touches anything young enough to still be in flight."""
+    return sweep_uploads(upload_dir, retention=max(UPLOAD_RETENTION, STALE_UPLOAD_AGE))
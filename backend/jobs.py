@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import traceback
+from collections import OrderedDict
+from uuid import uuid4
+
+try:
+    from .pipeline import (
+        PIPELINE_STAGES,
+        file_digest,
+        load_cached_cv,
+        extract_stage,
+        parse_stage,
+        validate_stage,
+        enhance_stage,
+    )
+    from .ingest import release_upload
+except ImportError:
+    from pipeline import (
+        PIPELINE_STAGES,
+        file_digest,
+        load_cached_cv,
+        extract_stage,
+        parse_stage,
+        validate_stage,
+        enhance_stage,
+    )
+    from ingest import release_upload
+
+logger = logging.getLogger(__name__)
+
+# Number of finished jobs kept in memory for status polling
+JOB_RETENTION = int(os.environ.get("CV_JOB_RETENTION", 500))
+
+
+class Job:
+    """
+    A single CV processing run and its progress events.
+
+    Events are appended in order; listeners replay the history and then wait
+    for new events, so a client connecting late still sees every stage.
+    """
+
+    def __init__(self, user_id: str, file_path: str, enhancement_mode: str, digest: str = None):
+        self.job_id = str(uuid4())
+        self.user_id = user_id
+        self.file_path = file_path
+        self.digest = digest
+        self.enhancement_mode = enhancement_mode
+        self.status = "queued"
+        self.error = None
+        self.result = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.stages = {
+            stage: {"status": "pending", "duration_ms": None}
+            for stage in PIPELINE_STAGES
+        }
+        self.events = []
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def emit(self, event: str, data: dict):
+        self.events.append({"event": event, "data": data})
+        # Wake current listeners and arm a fresh event for the next wait
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def finish(self, status: str, error: str = None):
+        """Mark the job done and emit its final status event in one step, so no listener sees one without the other."""
+        self.status = status
+        self.error = error
+        self.finished_at = time.time()
+        self.emit("status", {"status": status, "error": error})
+
+    async def listen(self):
+        """Yield every event for this job, finishing once the job is done."""
+        index = 0
+        while True:
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.done:
+                return
+            await self._changed.wait()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "user_id": self.user_id,
+            "status": self.status,
+            "enhancement_mode": self.enhancement_mode,
+            "stages": self.stages,
+            "error": self.error,
+            "result": self.result,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """
+    Runs CV pipeline jobs stage by stage on a PipelinePool and tracks their
+    progress. The map stage runs through the workflow, so a job leaves the
+    same user state and checkpoint thread as /upload-cv.
+    """
+
+    def __init__(self, pool, workflow, retention: int = JOB_RETENTION):
+        self.pool = pool
+        self.workflow = workflow
+        self.retention = retention
+        self._jobs = OrderedDict()
+
+    def get(self, job_id: str):
+        return self._jobs.get(job_id)
+
+    def submit(self, user_id: str, file_path: str, enhancement_mode: str = "off", digest: str = None) -> Job:
+        """
+        Admit a new job and start it in the background.
+        Raises PipelineBusyError if the pool has no free slot. The upload at
+        file_path is released once the job finishes.
+        """
+        self.pool.admit()
+        job = Job(user_id, file_path, enhancement_mode, digest)
+        self._jobs[job.job_id] = job
+        self._evict()
+        job.emit("status", {"status": job.status})
+        asyncio.get_running_loop().create_task(self._run(job))
+        return job
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        while len(self._jobs) > self.retention and finished:
+            self._jobs.pop(finished.pop(0), None)
+
+    async def _run_stage(self, job: Job, stage: str, fn, *args):
+        return await self._track_stage(job, stage, self.pool.execute(fn, *args))
+
+    async def _track_stage(self, job: Job, stage: str, work):
+        job.stages[stage]["status"] = "running"
+        job.emit("stage", {"stage": stage, "status": "running"})
+        started = time.perf_counter()
+        try:
+            result = await work
+        except Exception:
+            job.stages[stage]["status"] = "failed"
+            job.stages[stage]["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            job.emit("stage", {"stage": stage, "status": "failed",
+                               "duration_ms": job.stages[stage]["duration_ms"]})
+            raise
+        job.stages[stage]["status"] = "done"
+        job.stages[stage]["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        job.emit("stage", {"stage": stage, "status": "done",
+                           "duration_ms": job.stages[stage]["duration_ms"]})
+        return result
+
+    async def _run(self, job: Job):
+        job.status = "running"
+        job.emit("status", {"status": job.status})
+        status, error = "failed", "Job was cancelled"
+        try:
+            logger.info(f"Job {job.job_id}: processing {job.file_path} for user {job.user_id}")
+            digest = job.digest or await self.pool.execute(file_digest, job.file_path)
+            cv_data = await asyncio.to_thread(load_cached_cv, digest)
+            if cv_data is None:
+                text = await self._run_stage(job, "extract", extract_stage, job.file_path, digest)
+                cv_data = await self._run_stage(job, "parse", parse_stage, text)
+                cv_data = await self._run_stage(job, "validate", validate_stage, cv_data, digest)
+            else:
+                for stage in ("extract", "parse", "validate"):
+                    job.stages[stage]["status"] = "cached"
+                    job.emit("stage", {"stage": stage, "status": "cached"})
+            cv_data = await self._run_stage(
+                job, "enhance", enhance_stage, cv_data, job.enhancement_mode, digest
+            )
+            # With cv_data given the workflow starts at map_portfolio, which
+            # stores the user state, and then pauses at confirm_cv
+            state = await self._track_stage(job, "map", self.workflow.run(
+                job.user_id,
+                cv_data=cv_data,
+                file_digest=digest,
+                enhancement_mode=job.enhancement_mode
+            ))
+
+            job.result = {
+                "user_id": job.user_id,
+                "cv_data": state["cv_data"],
+                "portfolio_data": state["portfolio_data"]
+            }
+            status, error = "succeeded", None
+            logger.info(f"Job {job.job_id}: completed for user {job.user_id}")
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {str(e)}")
+            logger.error(traceback.format_exc())
+            status, error = "failed", str(e)
+        finally:
+            self.pool.release()
+            try:
+                await asyncio.to_thread(release_upload, job.file_path)
+            finally:
+                # Status and the final event change together, after the last await
+                job.finish(status, error)
+
+
+def format_sse(event: dict) -> str:
+    """Encode a job event as a server-sent events frame."""
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", "llm_cache.sqlite3")
+LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", 7 * 24 * 3600))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", 20_000))
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "1") != "0"
+
+# Eviction runs after this many writes rather than on every one
+EVICT_EVERY = 100
+
+
+class LLMCache:
+    """
+    Persistent cache of LLM responses in a local SQLite file.
+
+    Entries are keyed on (model, temperature, system prompt, user prompt),
+    expire after `ttl` seconds, and the least recently used rows are
+    dropped once the table grows past `max_entries`.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: float = LLM_CACHE_TTL,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES, enabled: bool = LLM_CACHE_ENABLED):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = Counter()
+        self.misses = Counter()
+        self._conn = None
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def make_key(model: str, temperature, system_prompt: str, user_prompt: str) -> str:
+        raw = json.dumps([model, temperature, system_prompt, user_prompt], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, model: str = ""):
+        """Return the cached response text or None."""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute(
+                    "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row and now - row[1] <= self.ttl:
+                    conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                    conn.commit()
+                    self.hits[model] += 1
+                    return row[0]
+                if row:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    conn.commit()
+                self.misses[model] += 1
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache read failed: {e}")
+        return None
+
+    def put(self, key: str, model: str, response: str):
+        if not self.enabled or not response:
+            return
+
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, model, response, now, now)
+                )
+                conn.commit()
+                self._writes += 1
+                if self._writes % EVICT_EVERY == 0:
+                    self._evict(conn, now)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def _evict(self, conn, now: float):
+        conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,))
+        conn.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            "SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+        conn.commit()
+
+    def evict(self):
+        """Drop expired entries and trim the table to max_entries."""
+        with self._lock:
+            self._evict(self._connection(), time.time())
+
+    def stats(self) -> dict:
+        with self._lock:
+            models = {}
+            for model in set(self.hits) | set(self.misses):
+                hits, misses = self.hits[model], self.misses[model]
+                models[model] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0
+                }
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+            return {
+                "enabled": self.enabled,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+                "models": models
+            }
+
+
+llm_cache = LLMCache()
+
+
+def cache_key_for(llm, system_prompt: str, user_prompt: str):
+    """(key, model name) for a LangChain chat model and prompt pair."""
+    model = str(getattr(llm, "model", "") or getattr(llm, "model_name", ""))
+    temperature = getattr(llm, "temperature", None)
+    return LLMCache.make_key(model, temperature, system_prompt, user_prompt), model
@@ -1,38 +1,207 @@
 # llm_enhancer.py
 
-from langchain_ollama import ChatOllama
 from langchain_core.messages import HumanMessage, SystemMessage
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import os
+import json
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+import weakref
+from collections import Counter
+from contextlib import contextmanager
+
+try:
+    from .resources import lazy_resource
+    from .prompt import build_batch_enhancement_prompt
+    from .schema_validator import extract_json_block
+    from .llm_cache import llm_cache, cache_key_for
+    from .metrics import metrics, record_llm_call
+except ImportError:
+    from resources import lazy_resource
+    from prompt import build_batch_enhancement_prompt
+    from schema_validator import extract_json_block
+    from llm_cache import llm_cache, cache_key_for
+    from metrics import metrics, record_llm_call
+
+logger = logging.getLogger(__name__)
+
+# Concurrent enhancer settings
+LLM_ENHANCE_CONCURRENCY = int(os.environ.get("LLM_ENHANCE_CONCURRENCY", 4))
+LLM_CALL_TIMEOUT = float(os.environ.get("LLM_CALL_TIMEOUT", 60))
+
+
+def build_llm():
+    from langchain_ollama import ChatOllama
+
+    # Controlled creativity
+    return ChatOllama(
+        model="llama3:8b",
+        temperature=0.3
+    )
 
-# Controlled creativity
-llm = ChatOllama(
-    model="llama3:8b",
-    temperature=0.3
-)
 
+@lazy_resource("enhancer_llm")
+def get_llm():
+    return build_llm()
 
-def _call_llm(system_prompt: str, user_prompt: str) -> str:
-    """
-    Internal safe LLM caller.
-    Always returns plain stripped text.
-    Never returns JSON.
-    """
-    response = llm.invoke([
+
+# The async HTTP client inside a chat model binds to the event loop it is
+# first used on, and every enhance_portfolio_content_concurrent call runs
+# its own loop; async calls get a client per loop instead of the shared one.
+_loop_llms = weakref.WeakKeyDictionary()
+_loop_llms_lock = threading.Lock()
+
+
+def get_async_llm():
+    """Chat model for the running event loop, built on first use in that loop."""
+    loop = asyncio.get_running_loop()
+    with _loop_llms_lock:
+        llm = _loop_llms.get(loop)
+        if llm is None:
+            llm = _loop_llms[loop] = build_llm()
+        return llm
+
+
+def __getattr__(name):
+    # `llm` used to be built at import time; keep it reachable lazily
+    if name == "llm":
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _messages(system_prompt: str, user_prompt: str) -> list:
+    return [
         SystemMessage(content=system_prompt),
         HumanMessage(content=user_prompt)
-    ])
+    ]
+
+
+# Usage counters for the enhancement run in progress (see track_enhancement)
+_current_usage = contextvars.ContextVar("enhancement_usage", default=None)
+_stats_lock = threading.Lock()
+ENHANCEMENT_STATS = {}
+
+
+def _record_usage(system_prompt: str, user_prompt: str, response):
+    usage = _current_usage.get()
+    if usage is None:
+        return
+    meta = getattr(response, "usage_metadata", None) or {}
+    usage["llm_calls"] += 1
+    usage["prompt_chars"] += len(system_prompt) + len(user_prompt)
+    usage["input_tokens"] += meta.get("input_tokens", 0)
+    usage["output_tokens"] += meta.get("output_tokens", 0)
+
+
+@contextmanager
+def track_enhancement(mode: str):
+    """
+    Accumulate LLM calls, prompt size, token usage and latency for one
+    enhancement run into ENHANCEMENT_STATS[mode].
+    """
+    usage = Counter()
+    token = _current_usage.set(usage)
+    started = time.perf_counter()
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+        usage["latency_ms"] += round((time.perf_counter() - started) * 1000)
+        usage["runs"] += 1
+        with _stats_lock:
+            ENHANCEMENT_STATS.setdefault(mode, Counter()).update(usage)
+        logger.info(f"Enhancement ({mode}): {dict(usage)}")
+
+
+def enhancement_stats() -> dict:
+    """Totals and per-run averages for each enhancement mode."""
+    with _stats_lock:
+        report = {}
+        for mode, totals in ENHANCEMENT_STATS.items():
+            runs = totals["runs"] or 1
+            report[mode] = {
+                "totals": dict(totals),
+                "per_run": {k: round(v / runs, 1) for k, v in totals.items() if k != "runs"}
+            }
+        return report
+
+
+def _cached_response(llm, system_prompt: str, user_prompt: str):
+    """(cache key, model, cached text or None) for a prompt pair."""
+    key, model = cache_key_for(llm, system_prompt, user_prompt)
+    cached = llm_cache.get(key, model)
+    if cached is not None:
+        usage = _current_usage.get()
+        if usage is not None:
+            usage["cache_hits"] += 1
+    return key, model, cached
+
+
+def _call_llm(system_prompt: str, user_prompt: str, parse=None):
+    """
+    Internal safe LLM caller, backed by the persistent LLM cache.
+
+    Without `parse`, returns the reply as stripped text and caches it.
+    With `parse`, returns parse(text) instead (e.g. a dict decoded from a
+    JSON reply). The raw text is still what gets cached, but only when parse
+    accepts it with a truthy result. A cached entry that parse rejects is
+    treated as a miss, so a malformed reply is retried rather than served
+    from the cache.
+    """
+    llm = get_llm()
+    key, model, cached = _cached_response(llm, system_prompt, user_prompt)
+    if cached is not None:
+        result = parse(cached) if parse else cached
+        if result:
+            record_llm_call("enhancer", cached=True)
+            return result
+
+    with metrics.timer("llm_call_duration_seconds", caller="enhancer"):
+        response = llm.invoke(_messages(system_prompt, user_prompt))
+    record_llm_call("enhancer", response)
+    _record_usage(system_prompt, user_prompt, response)
+
+    return _store_reply(key, model, response.content.strip(), parse)
+
 
-    return response.content.strip()
+def _store_reply(key: str, model: str, text: str, parse=None):
+    result = parse(text) if parse else text
+    if result or not parse:
+        llm_cache.put(key, model, text)
+    return result
 
 
+async def _acall_llm(system_prompt: str, user_prompt: str, parse=None):
+    """Async counterpart of _call_llm."""
+    llm = get_async_llm()
+    key, model, cached = _cached_response(llm, system_prompt, user_prompt)
+    if cached is not None:
+        result = parse(cached) if parse else cached
+        if result:
+            record_llm_call("enhancer", cached=True)
+            return result
+
+    with metrics.timer("llm_call_duration_seconds", caller="enhancer"):
+        response = await llm.ainvoke(_messages(system_prompt, user_prompt))
+    record_llm_call("enhancer", response)
+    _record_usage(system_prompt, user_prompt, response)
+
+    return _store_reply(key, model, response.content.strip(), parse)
+
+
+# Each *_prompts builder returns (system_prompt, user_prompt), or None when
+# there is nothing worth sending to the model.
+
 # ---------------------------------------------------
 # 1️⃣ SUMMARY ENHANCEMENT
 # ---------------------------------------------------
 
-def enhance_summary(summary: str) -> str:
+def summary_prompts(summary: str) -> Optional[Tuple[str, str]]:
     if not summary or len(summary.strip()) < 10:
-        return summary
+        return None
 
     system_prompt = """
 You are a professional resume writer.
@@ -51,16 +220,24 @@ Rewrite this professional summary:
 {summary}
 """
 
-    return _call_llm(system_prompt, user_prompt)
+    return system_prompt, user_prompt
+
+
+def enhance_summary(summary: str) -> str:
+    prompts = summary_prompts(summary)
+    if prompts is None:
+        return summary
+
+    return _call_llm(*prompts)
 
 
 # ---------------------------------------------------
 # 2️⃣ EXPERIENCE BULLET IMPROVEMENT
 # ---------------------------------------------------
 
-def enhance_experience(role: str, company: str, bullets: List[str]) -> List[str]:
+def experience_prompts(role: str, company: str, bullets: List[str]) -> Optional[Tuple[str, str]]:
     if not bullets:
-        return bullets
+        return None
 
     system_prompt = """
 You are an expert resume optimizer.
@@ -86,25 +263,36 @@ Bullets:
 {bullet_text}
 """
 
-    improved_text = _call_llm(system_prompt, user_prompt)
+    return system_prompt, user_prompt
 
-    # Split back into bullet list
-    improved_bullets = [
+
+def split_bullets(improved_text: str) -> List[str]:
+    """Split LLM output back into a bullet list."""
+    return [
         line.strip("• ").strip()
         for line in improved_text.split("\n")
         if line.strip()
     ]
 
-    return improved_bullets
+
+def enhance_experience(role: str, company: str, bullets: List[str]) -> List[str]:
+    prompts = experience_prompts(role, company, bullets)
+    if prompts is None:
+        return bullets
+
+    improved_text = _call_llm(*prompts)
+
+    # Split back into bullet list
+    return split_bullets(improved_text)
 
 
 # ---------------------------------------------------
 # 3️⃣ HERO TAGLINE GENERATION
 # ---------------------------------------------------
 
-def generate_tagline(name: str, skills: List[str]) -> str:
+def tagline_prompts(name: str, skills: List[str]) -> Optional[Tuple[str, str]]:
     if not skills:
-        return ""
+        return None
 
     top_skills = ", ".join(skills[:5])
 
@@ -126,16 +314,24 @@ Name: {name}
 Skills: {top_skills}
 """
 
-    return _call_llm(system_prompt, user_prompt)
+    return system_prompt, user_prompt
+
+
+def generate_tagline(name: str, skills: List[str]) -> str:
+    prompts = tagline_prompts(name, skills)
+    if prompts is None:
+        return ""
+
+    return _call_llm(*prompts)
 
 
 # ---------------------------------------------------
 # 4️⃣ PROJECT SHORT DESCRIPTION
 # ---------------------------------------------------
 
-def enhance_project(title: str, tech_stack: List[str], description: List[str]) -> str:
+def project_prompts(title: str, tech_stack: List[str], description: List[str]) -> Optional[Tuple[str, str]]:
     if not description:
-        return ""
+        return None
 
     techs = ", ".join(tech_stack) if tech_stack else "Not specified"
     full_desc = " ".join(description)
@@ -161,7 +357,15 @@ Full Description:
 {full_desc}
 """
 
-    return _call_llm(system_prompt, user_prompt)
+    return system_prompt, user_prompt
+
+
+def enhance_project(title: str, tech_stack: List[str], description: List[str]) -> str:
+    prompts = project_prompts(title, tech_stack, description)
+    if prompts is None:
+        return ""
+
+    return _call_llm(*prompts)
 
 
 # ---------------------------------------------------
@@ -204,4 +408,216 @@ def enhance_portfolio_content(cv_data: Dict) -> Dict:
         enhanced.get("skills", [])
     )
 
-    return enhanced
\ No newline at end of file
+    return enhanced
+
+
+# ---------------------------------------------------
+# 6️⃣ CONCURRENT ENHANCEMENT PIPELINE
+# ---------------------------------------------------
+
+async def enhance_portfolio_content_async(
+    cv_data: Dict,
+    concurrency: int = LLM_ENHANCE_CONCURRENCY,
+    timeout: float = LLM_CALL_TIMEOUT
+) -> Dict:
+    """
+    Same output as enhance_portfolio_content, but all LLM calls are sent
+    concurrently (at most `concurrency` at a time, each bounded by
+    `timeout` seconds). A call that fails or times out keeps the original
+    text for that field.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(prompts, original, postprocess=None, empty=None):
+        # `empty` mirrors what the sequential helpers return when they skip the call
+        if prompts is None:
+            return original if empty is None else empty
+        async with semaphore:
+            try:
+                text = await asyncio.wait_for(_acall_llm(*prompts), timeout)
+            except Exception as e:
+                logger.warning(f"LLM enhancement call failed, keeping original text: {e!r}")
+                return original
+        return postprocess(text) if postprocess else text
+
+    enhanced = cv_data.copy()
+    # Copy entries so the caller's cv_data is left untouched
+    experience = [dict(exp) for exp in cv_data.get("experience", [])]
+    projects = [dict(proj) for proj in cv_data.get("projects", [])]
+    if "experience" in cv_data:
+        enhanced["experience"] = experience
+    if "projects" in cv_data:
+        enhanced["projects"] = projects
+
+    summary = cv_data.get("summary", "")
+    tasks = [run(summary_prompts(summary), summary)]
+    tasks += [
+        run(
+            experience_prompts(exp.get("role", ""), exp.get("company", ""), exp.get("description", [])),
+            exp.get("description", []),
+            split_bullets
+        )
+        for exp in experience
+    ]
+    tasks += [
+        run(
+            project_prompts(proj.get("title", ""), proj.get("tech_stack", []), proj.get("description", [])),
+            proj.get("short_description", ""),
+            empty=""
+        )
+        for proj in projects
+    ]
+    tasks.append(run(
+        tagline_prompts(cv_data.get("name", ""), cv_data.get("skills", [])),
+        cv_data.get("tagline", ""),
+        empty=""
+    ))
+
+    results = await asyncio.gather(*tasks)
+
+    enhanced["summary"] = results[0]
+    offset = 1
+    for exp, description in zip(experience, results[offset:offset + len(experience)]):
+        exp["description"] = description
+    offset += len(experience)
+    for proj, short_description in zip(projects, results[offset:offset + len(projects)]):
+        proj["short_description"] = short_description
+    enhanced["tagline"] = results[-1]
+
+    return enhanced
+
+
+def enhance_portfolio_content_concurrent(cv_data: Dict, **kwargs) -> Dict:
+    """Blocking wrapper around enhance_portfolio_content_async for worker threads/processes."""
+    return asyncio.run(enhance_portfolio_content_async(cv_data, **kwargs))
+
+
+# ---------------------------------------------------
+# 7️⃣ BATCHED SINGLE-PROMPT ENHANCEMENT
+# ---------------------------------------------------
+
+BATCH_SYSTEM_PROMPT = """
+You rewrite resume content and reply with JSON only.
+"""
+
+
+def _parse_batch_response(text: str) -> Dict:
+    try:
+        data = json.loads(extract_json_block(text))
+    except Exception as e:
+        logger.warning(f"Batched enhancement returned invalid JSON: {e}")
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _entries_by_id(items) -> Dict:
+    entries = {}
+    if isinstance(items, list):
+        for item in items:
+            if isinstance(item, dict) and isinstance(item.get("id"), int):
+                entries[item["id"]] = item
+    return entries
+
+
+def enhance_portfolio_content_batched(cv_data: Dict) -> Dict:
+    """
+    Same output as enhance_portfolio_content using one LLM call for the
+    whole CV. Sections (or individual entries) missing or malformed in the
+    response fall back to the per-section helpers.
+    """
+    enhanced = cv_data.copy()
+    experience = [dict(exp) for exp in cv_data.get("experience", [])]
+    projects = [dict(proj) for proj in cv_data.get("projects", [])]
+    if "experience" in cv_data:
+        enhanced["experience"] = experience
+    if "projects" in cv_data:
+        enhanced["projects"] = projects
+
+    summary = cv_data.get("summary", "")
+    name = cv_data.get("name", "")
+    skills = cv_data.get("skills", [])
+
+    # Only send what the per-section helpers would have sent
+    want_summary = summary_prompts(summary) is not None
+    want_tagline = tagline_prompts(name, skills) is not None
+    exp_ids = [i for i, exp in enumerate(experience) if exp.get("description")]
+    proj_ids = [i for i, proj in enumerate(projects) if proj.get("description")]
+
+    payload = {
+        "summary": summary if want_summary else "",
+        "experience": [
+            {
+                "id": i,
+                "role": experience[i].get("role", ""),
+                "company": experience[i].get("company", ""),
+                "bullets": experience[i].get("description", [])
+            }
+            for i in exp_ids
+        ],
+        "projects": [
+            {
+                "id": i,
+                "title": projects[i].get("title", ""),
+                "tech_stack": projects[i].get("tech_stack", []),
+                "description": " ".join(projects[i].get("description", []))
+            }
+            for i in proj_ids
+        ]
+    }
+    if want_tagline:
+        payload["tagline_request"] = {"name": name, "skills": skills[:5]}
+
+    response = {}
+    if want_summary or want_tagline or exp_ids or proj_ids:
+        try:
+            response = _call_llm(
+                BATCH_SYSTEM_PROMPT, build_batch_enhancement_prompt(payload), parse=_parse_batch_response
+            )
+        except Exception as e:
+            logger.warning(f"Batched enhancement call failed, falling back per section: {e!r}")
+
+    # Summary
+    new_summary = response.get("summary")
+    if not want_summary:
+        enhanced["summary"] = summary
+    elif isinstance(new_summary, str) and new_summary.strip():
+        enhanced["summary"] = new_summary.strip()
+    else:
+        enhanced["summary"] = enhance_summary(summary)
+
+    # Experience bullets
+    exp_results = _entries_by_id(response.get("experience"))
+    for i in exp_ids:
+        exp = experience[i]
+        bullets = exp_results.get(i, {}).get("bullets")
+        if isinstance(bullets, list) and bullets and all(isinstance(b, str) for b in bullets):
+            exp["description"] = [b.strip("• ").strip() for b in bullets if b.strip()]
+        else:
+            exp["description"] = enhance_experience(
+                exp.get("role", ""), exp.get("company", ""), exp.get("description", [])
+            )
+
+    # Project short descriptions
+    proj_results = _entries_by_id(response.get("projects"))
+    for i, proj in enumerate(projects):
+        if i not in proj_ids:
+            proj["short_description"] = ""
+            continue
+        short_description = proj_results.get(i, {}).get("short_description")
+        if isinstance(short_description, str) and short_description.strip():
+            proj["short_description"] = short_description.strip()
+        else:
+            proj["short_description"] = enhance_project(
+                proj.get("title", ""), proj.get("tech_stack", []), proj.get("description", [])
+            )
+
+    # Tagline
+    tagline = response.get("tagline")
+    if not want_tagline:
+        enhanced["tagline"] = ""
+    elif isinstance(tagline, str) and tagline.strip():
+        enhanced["tagline"] = tagline.strip()
+    else:
+        enhanced["tagline"] = generate_tagline(name, skills)
+
+    return enhanced
@@ -1,8 +1,12 @@
 import os
+import json
+import time
+import asyncio
 import shutil
 import traceback
 import logging
-from typing import Optional
+from typing import List, Optional
+from contextlib import aclosing
 from uuid import uuid4
 from dotenv import load_dotenv
 
@@ -17,36 +21,81 @@ if not load_dotenv():
 
 from fastapi import FastAPI, UploadFile, File, HTTPException, Body
 from fastapi.middleware.cors import CORSMiddleware
-from langgraph.graph import StateGraph
+from fastapi.responses import StreamingResponse, JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 
 try:
-    from .utils import extract_text, parse_cv
-    from .mapping import map_to_portfolio
-    from .llm_enhancer import enhance_portfolio_content
+    from .pipeline import (
+        PipelinePool,
+        PipelineBusyError,
+        ENHANCEMENT_MODES,
+        parse_cache,
+    )
+    from .llm_enhancer import enhancement_stats
+    from .llm_cache import llm_cache
+    from .jobs import JobManager, format_sse
+    from .pdf_extract import ExtractionBudgetError, shutdown_page_pool
+    from .resources import warm_up_from_env
+    from .ingest import (
+        UPLOAD_SPOOL_DIR,
+        UPLOAD_MAX_BYTES,
+        UploadTooLargeError,
+        UnsupportedFileTypeError,
+        ingest_upload,
+        release_upload,
+        sweep_stale_uploads,
+    )
+    from .deploy_queue import DeployQueue, DeployQueueFullError
+    from .workflow import WorkflowRunner, build_workflow, node_timings
+    from .metrics import metrics, request_id_var, install_request_id_logging, REQUEST_ID_HEADER
+    from .batch import (
+        BATCH_MAX_FILES, BATCH_MAX_ARCHIVE_BYTES, BatchError, extract_archive, arun_batch,
+        shutdown_batch_executor,
+    )
     from .tools import (
-        parse_cv_tool,
         store_user_state_tool,
+        update_user_state_tool,
         retrieve_user_state_tool,
-        generate_site_tool,
-        preview_site_tool,
-        update_site_tool,
         deploy_site_tool
     )
 except ImportError:
-    from utils import extract_text, parse_cv
-    from mapping import map_to_portfolio
-    from llm_enhancer import enhance_portfolio_content
+    from pipeline import (
+        PipelinePool,
+        PipelineBusyError,
+        ENHANCEMENT_MODES,
+        parse_cache,
+    )
+    from llm_enhancer import enhancement_stats
+    from llm_cache import llm_cache
+    from jobs import JobManager, format_sse
+    from pdf_extract import ExtractionBudgetError, shutdown_page_pool
+    from resources import warm_up_from_env
+    from ingest import (
+        UPLOAD_SPOOL_DIR,
+        UPLOAD_MAX_BYTES,
+        UploadTooLargeError,
+        UnsupportedFileTypeError,
+        ingest_upload,
+        release_upload,
+        sweep_stale_uploads,
+    )
+    from deploy_queue import DeployQueue, DeployQueueFullError
+    from workflow import WorkflowRunner, build_workflow, node_timings
+    from metrics import metrics, request_id_var, install_request_id_logging, REQUEST_ID_HEADER
+    from batch import (
+        BATCH_MAX_FILES, BATCH_MAX_ARCHIVE_BYTES, BatchError, extract_archive, arun_batch,
+        shutdown_batch_executor,
+    )
     from tools import (
-        parse_cv_tool,
         store_user_state_tool,
+        update_user_state_tool,
         retrieve_user_state_tool,
-        generate_site_tool,
-        preview_site_tool,
-        update_site_tool,
         deploy_site_tool
     )
 
+# Prefix every log line with the id of the request that produced it
+install_request_id_logging()
+
 app = FastAPI(title="Portfolio Agent API")
 
 # Enable CORS for frontend integration
@@ -58,54 +107,138 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# LangGraph Setup
-graph = StateGraph(state_schema=dict)
-
-graph.add_node("parse_cv", lambda state: {"cv_data": parse_cv_tool.invoke(state["file_path"])})
-graph.add_node("map_portfolio", lambda state: {"portfolio_data": map_to_portfolio(state["cv_data"])})
-graph.add_node("confirm_cv", lambda state: state)
-graph.add_node("generate_site", lambda state: {"site": {"repo_path": generate_site_tool.invoke({
-    "portfolio_data": state["portfolio_data"],
-    "theme": state.get("theme", "modern")
-})}})
-graph.add_node("preview_site", lambda state: {"preview": preview_site_tool.invoke({"repo_path": state["site"]["repo_path"]})})
-graph.add_node("edit_site", lambda state: {"preview": update_site_tool.invoke({"repo_path": state["site"]["repo_path"], "updates": state["updates"]})})
-graph.add_node("deploy_site", lambda state: {"deployment": deploy_site_tool.invoke({"repo_path": state["site"]["repo_path"]})})
-
-graph.set_entry_point("parse_cv")
-graph.add_edge("parse_cv", "map_portfolio")
-graph.add_edge("map_portfolio", "confirm_cv")
-
-# Note: Conditional edges in LangGraph usually require a function that returns the next node name
-def check_confirmation(state):
-    return "generate_site" if state.get("confirmed") else "confirm_cv"
-
-graph.add_conditional_edges(
-    "confirm_cv",
-    check_confirmation,
-    {
-        "generate_site": "generate_site",
-        "confirm_cv": "confirm_cv"
-    }
+# Worker pool for the blocking extract -> parse -> enhance -> map pipeline
+pipeline_pool = PipelinePool()
+
+# How long POST /deploy waits for the result before answering 202
+DEPLOY_WAIT_TIMEOUT = float(os.environ.get("DEPLOY_WAIT_TIMEOUT", 120))
+
+# Background Vercel deploys with retries; progress is mirrored into user state
+deploy_queue = DeployQueue(
+    deploy_fn=lambda repo_path: deploy_site_tool.invoke({"repo_path": repo_path}),
+    record_state=lambda user_id, deploy: update_user_state_tool.invoke({
+        "user_id": user_id,
+        "fields": {"deploy": deploy}
+    })
 )
 
-graph.add_edge("generate_site", "preview_site")
-graph.add_edge("preview_site", "edit_site")
-graph.add_edge("edit_site", "preview_site")
-graph.add_edge("preview_site", "deploy_site")
 
-# Compile graph (optional, but good practice)
-# runnable = graph.compile()
+@app.on_event("startup")
+def warm_up_resources():
+    # Build shared models before any process pool forks (see WARM_UP_RESOURCES)
+    warm_up_from_env()
+
+
+@app.on_event("startup")
+async def start_deploy_queue():
+    deploy_queue.start()
+
+
+@app.on_event("shutdown")
+def shutdown_pipeline_pool():
+    pipeline_pool.shutdown(wait=False)
+    shutdown_batch_executor(wait=False)
+    shutdown_page_pool(wait=False)
+
+
+@app.on_event("shutdown")
+async def stop_deploy_queue():
+    await deploy_queue.stop()
+
+# LangGraph workflow: parse_cv -> map_portfolio -> confirm_cv -> generate_site -> preview/edit/deploy.
+# Compiled once at startup with a SQLite checkpointer; each user is a thread
+# that resumes from its last completed node (see workflow.py).
+workflow = WorkflowRunner(build_workflow(pipeline_pool, deploy_queue))
+
+# Background /jobs/upload-cv runs; their map stage goes through the workflow
+job_manager = JobManager(pipeline_pool, workflow)
+
+
+@app.on_event("startup")
+async def start_workflow():
+    await workflow.start()
+
+
+@app.on_event("shutdown")
+async def stop_workflow():
+    await workflow.stop()
 
 class StoreStateRequest(BaseModel):
     user_id: str
     state: dict
 
 
-# Temporary directory for uploads
-UPLOAD_DIR = "uploads"
-if not os.path.exists(UPLOAD_DIR):
-    os.makedirs(UPLOAD_DIR)
+# Uploads are spooled into UPLOAD_SPOOL_DIR and removed after processing (see ingest.py)
+os.makedirs(UPLOAD_SPOOL_DIR, exist_ok=True)
+
+UPLOAD_PATHS = ("/upload-cv", "/jobs/upload-cv")
+# Allowance for multipart boundaries and headers on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+@app.middleware("http")
+async def reject_oversized_uploads(request, call_next):
+    """Refuse uploads whose declared length is over the cap before the body is read."""
+    if request.method == "POST" and request.url.path in UPLOAD_PATHS:
+        length = request.headers.get("content-length", "")
+        if length.isdigit() and int(length) > UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"Upload is larger than the {UPLOAD_MAX_BYTES} byte limit"}
+            )
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def trace_requests(request, call_next):
+    """
+    Tag the request with an id (the caller's X-Request-ID, or a new one),
+    echo it back and record the latency under the route template. For
+    streaming responses the latency covers the time to the first byte.
+    """
+    request_id = request.headers.get(REQUEST_ID_HEADER) or uuid4().hex[:16]
+    token = request_id_var.set(request_id)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers[REQUEST_ID_HEADER] = request_id
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.observe(
+            "http_request_duration_seconds",
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status
+        )
+        if status >= 500:
+            metrics.inc("errors_total", operation="http_request", error=str(status))
+        request_id_var.reset(token)
+
+
+def cache_samples():
+    """Parse and LLM cache counters, read at scrape time."""
+    for tier, stats in parse_cache.stats()["tiers"].items():
+        labels = {"cache": "parse", "tier": tier}
+        yield "cache_hits_total", "counter", labels, stats["hits"]
+        yield "cache_misses_total", "counter", labels, stats["misses"]
+        yield "cache_hit_ratio", "gauge", labels, stats["hit_rate"]
+    for model, stats in llm_cache.stats()["models"].items():
+        labels = {"cache": "llm", "tier": model}
+        yield "cache_hits_total", "counter", labels, stats["hits"]
+        yield "cache_misses_total", "counter", labels, stats["misses"]
+        yield "cache_hit_ratio", "gauge", labels, stats["hit_rate"]
+
+
+metrics.add_collector(cache_samples)
+
+
+@app.on_event("startup")
+def clean_up_uploads():
+    sweep_stale_uploads()
 
 
 @app.post("/store-state")
@@ -127,53 +260,210 @@ async def store_state(payload: StoreStateRequest):
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=str(e))
 
+async def save_upload(file: UploadFile, user_id: str):
+    """Spool an upload to disk, mapping rejected files to 413/415."""
+    try:
+        return await ingest_upload(file, user_id)
+    except UploadTooLargeError as e:
+        logger.warning(f"Rejecting upload for user {user_id}: {str(e)}")
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedFileTypeError as e:
+        logger.warning(f"Rejecting upload for user {user_id}: {str(e)}")
+        raise HTTPException(status_code=415, detail=str(e))
+
+def check_enhancement_mode(enhancement_mode: str):
+    if enhancement_mode != "off" and enhancement_mode not in ENHANCEMENT_MODES:
+        allowed = ", ".join(["off", *ENHANCEMENT_MODES])
+        raise HTTPException(status_code=400, detail=f"enhancement_mode must be one of: {allowed}")
+
 @app.post("/upload-cv")
 async def upload_cv(file: UploadFile = File(...), enhancement_mode: str = "off"):
+    check_enhancement_mode(enhancement_mode)
     user_id = str(uuid4())
-    file_path = os.path.join(UPLOAD_DIR, f"{user_id}_{file.filename}")
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    upload = await save_upload(file, user_id)
     
     try:
         logger.info(f"Processing upload for user {user_id}: {file.filename} (Enhancement: {enhancement_mode})")
         
-        # 1. PDF/DOCX Extraction
-        text = extract_text(file_path)
-        if not text.strip():
-            raise ValueError("Empty CV text extracted")
-            
-        # 2. NLP Extractor + LLM Refinement + Schema Validator
-        cv_data = parse_cv(text)
-        
-        # 3. Optional LLM Enhancement
-        if enhancement_mode == "on":
-            logger.info(f"Applying LLM enhancement for user {user_id}")
-            cv_data = enhance_portfolio_content(cv_data)
-        
-        # 4. Portfolio Mapper
-        portfolio_data = map_to_portfolio(cv_data)
+        # parse_cv and map_portfolio run in the worker pool and store the user state;
+        # the run then pauses at confirm_cv until /generate-site
+        pipeline_pool.admit()
+        try:
+            result = await workflow.run(
+                user_id,
+                file_path=upload.path,
+                file_digest=upload.digest,
+                enhancement_mode=enhancement_mode
+            )
+        finally:
+            pipeline_pool.release()
         
         logger.info(f"Successfully processed CV for user {user_id}")
         
-        # Store both raw CV data and mapped portfolio data
-        store_user_state_tool.invoke({
-            "user_id": user_id, 
-            "state": {
-                "cv_data": cv_data, 
-                "portfolio_data": portfolio_data,
-                "file_path": file_path
-            }
-        })
-        
         return {
             "user_id": user_id, 
-            "cv_data": cv_data,
-            "portfolio_data": portfolio_data
+            "cv_data": result["cv_data"],
+            "portfolio_data": result["portfolio_data"]
         }
+    except PipelineBusyError as e:
+        logger.warning(f"Rejecting upload for user {user_id}: {str(e)}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    except ExtractionBudgetError as e:
+        logger.warning(f"Rejecting upload for user {user_id}: {str(e)}")
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         logger.error(f"Error processing CV for user {user_id}: {str(e)}")
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        release_upload(upload.path)
+
+@app.post("/jobs/upload-cv", status_code=202)
+async def submit_cv_job(file: UploadFile = File(...), enhancement_mode: str = "off"):
+    """
+    Queue a CV for background processing and return a job id immediately.
+    Progress is available from /jobs/{job_id} and /jobs/{job_id}/events.
+    """
+    check_enhancement_mode(enhancement_mode)
+    user_id = str(uuid4())
+    upload = await save_upload(file, user_id)
+    try:
+        job = job_manager.submit(user_id, upload.path, enhancement_mode, digest=upload.digest)
+    except PipelineBusyError as e:
+        release_upload(upload.path)
+        logger.warning(f"Rejecting CV job for user {user_id}: {str(e)}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+
+    return {
+        "job_id": job.job_id,
+        "user_id": user_id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.job_id}",
+        "events_url": f"/jobs/{job.job_id}/events"
+    }
+
+@app.post("/batch/upload-cv")
+async def batch_upload_cv(files: List[UploadFile] = File(...), store: bool = True):
+    """
+    Parse many CVs in one request: any mix of PDF/DOCX files and zip
+    archives of them, spread across the shared batch process pool (see
+    batch.py). Each batch holds one pipeline slot until its stream ends, so
+    a full pipeline answers 429 here as it does for /upload-cv.
+
+    Streams one JSON line per CV as soon as it finishes; a file that fails
+    becomes an error line rather than failing the batch. With store=true
+    every parsed CV is saved as a new user, as /upload-cv would.
+    """
+    batch_id = str(uuid4())
+    try:
+        pipeline_pool.admit()
+    except PipelineBusyError as e:
+        logger.warning(f"Rejecting batch {batch_id}: {str(e)}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+
+    work_dir = os.path.join(UPLOAD_SPOOL_DIR, f"batch-{batch_id}")
+    labels = {}
+    rejected = []
+
+    try:
+        os.makedirs(work_dir)
+        for index, file in enumerate(files):
+            try:
+                upload = await ingest_upload(
+                    file, f"{index:05d}", work_dir,
+                    max_bytes=BATCH_MAX_ARCHIVE_BYTES, allow_archives=True
+                )
+                if upload.file_type == "zip":
+                    members_dir = os.path.join(work_dir, f"{index:05d}")
+                    os.makedirs(members_dir)
+                    members = await asyncio.to_thread(extract_archive, upload.path, members_dir)
+                    for path in members:
+                        labels[path] = f"{file.filename}:{os.path.basename(path)[6:]}"
+                elif upload.size > UPLOAD_MAX_BYTES:
+                    raise UploadTooLargeError(f"Upload is larger than the {UPLOAD_MAX_BYTES} byte limit")
+                else:
+                    labels[upload.path] = file.filename
+            except (UploadTooLargeError, UnsupportedFileTypeError, BatchError) as e:
+                rejected.append({"source": file.filename, "status": "error",
+                                 "error": str(e), "error_type": type(e).__name__})
+
+        if len(labels) > BATCH_MAX_FILES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Batch holds {len(labels)} CVs, more than the {BATCH_MAX_FILES} file limit"
+            )
+    except BaseException:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        pipeline_pool.release()
+        raise
+
+    logger.info(f"Batch {batch_id}: {len(labels)} CVs queued, {len(rejected)} rejected")
+
+    async def stream():
+        try:
+            for record in rejected:
+                yield json.dumps(record) + "\n"
+            # aclosing: a disconnect cancels the CVs that haven't started yet
+            async with aclosing(arun_batch(list(labels))) as records:
+                async for record in records:
+                    record["source"] = labels[record.pop("source")]
+                    record.pop("index", None)
+                    if store and record["status"] == "ok":
+                        record["user_id"] = str(uuid4())
+                        await asyncio.to_thread(store_user_state_tool.invoke, {
+                            "user_id": record["user_id"],
+                            "state": {
+                                "cv_data": record["cv_data"],
+                                "portfolio_data": record["portfolio_data"],
+                                "source": record["source"]
+                            }
+                        })
+                    yield json.dumps(record) + "\n"
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            pipeline_pool.release()
+            logger.info(f"Batch {batch_id} finished")
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.get("/jobs/{job_id}")
+async def get_cv_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}/events")
+async def stream_cv_job(job_id: str):
+    """Server-sent events stream of per-stage progress for a job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        async for event in job.listen():
+            yield format_sse(event)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/parse-cache/stats")
+async def parse_cache_stats():
+    """Hit/miss counters for the content-addressed CV parse cache."""
+    return parse_cache.stats()
+
+@app.get("/enhancement/stats")
+async def get_enhancement_stats():
+    """LLM calls, prompt size, tokens and latency per enhancement mode."""
+    return enhancement_stats()
+
+@app.get("/llm-cache/stats")
+async def get_llm_cache_stats():
+    """Hit/miss counters for the persistent LLM response cache."""
+    return llm_cache.stats()
 
 @app.post("/generate-site")
 async def generate_site(
@@ -207,38 +497,113 @@ async def generate_site(
     if portfolio_data is None:
         raise HTTPException(status_code=404, detail="portfolio_data not found in stored state")
 
-    repo_path = generate_site_tool.invoke({
-        "portfolio_data": portfolio_data,
-        "theme": theme
-    })
-    
-    site = {"repo_path": repo_path}
-    
-    # Update state with site info
-    state["site"] = site
-    store_user_state_tool.invoke({"user_id": user_id, "state": state})
-    
-    preview = preview_site_tool.invoke({"repo_path": repo_path})
-    return preview
+    # The stored state is authoritative (the frontend may have edited it), so
+    # it is passed in; parse/map are skipped and generation counts as confirmation
+    result = await workflow.run(
+        user_id,
+        cv_data=cv_data,
+        portfolio_data=portfolio_data,
+        theme=theme,
+        confirmed=True,
+        action="generate"
+    )
+    return result["preview"]
 
 @app.post("/edit-site")
 async def edit_site(user_id: str, updates: dict):
     state = retrieve_user_state_tool.invoke(user_id)
     if "error" in state or "site" not in state:
         raise HTTPException(status_code=404, detail="Site or user state not found")
-    
-    repo_path = state["site"]["repo_path"]
-    update_result = update_site_tool.invoke({"repo_path": repo_path, "updates": updates})
-    preview = preview_site_tool.invoke({"repo_path": repo_path})
-    return preview
+
+    try:
+        result = await workflow.run(
+            user_id,
+            portfolio_data=state.get("portfolio_data") or state.get("portfolioData"),
+            site=state["site"],
+            updates=updates,
+            action="edit"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {**result["preview"], "rebuilt_sections": result["rebuilt_sections"]}
 
 @app.post("/deploy")
-async def deploy(user_id: str):
+async def deploy(user_id: str, wait: bool = True):
+    """
+    Queue a deploy of the user's site.
+
+    By default waits (without blocking other requests) for the result and
+    returns it like before; if it takes longer than DEPLOY_WAIT_TIMEOUT, or
+    wait=false, answers 202 with a status_url to poll instead.
+    """
     state = retrieve_user_state_tool.invoke(user_id)
     if "error" in state or "site" not in state:
         raise HTTPException(status_code=404, detail="Site or user state not found")
-    
-    return deploy_site_tool.invoke({"repo_path": state["site"]["repo_path"]})
+
+    try:
+        result = await workflow.run(
+            user_id,
+            portfolio_data=state.get("portfolio_data") or state.get("portfolioData"),
+            site=state["site"],
+            action="deploy"
+        )
+    except DeployQueueFullError as e:
+        logger.warning(f"Rejecting deploy for user {user_id}: {str(e)}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    deployment = deploy_queue.get(result["deployment"]["deploy_id"])
+
+    # Content that was already deployed answers immediately, even with wait=false
+    if deployment.done or (wait and await deployment.wait(DEPLOY_WAIT_TIMEOUT)):
+        if deployment.status == "succeeded":
+            return {"status": "success", "live_url": deployment.live_url, "deploy_id": deployment.deploy_id}
+        return {"status": "error", "message": deployment.error, "deploy_id": deployment.deploy_id}
+
+    return JSONResponse(status_code=202, content={
+        **deployment.to_dict(),
+        "status_url": f"/deployments/{deployment.deploy_id}"
+    })
+
+@app.get("/deployments/{deploy_id}")
+async def get_deployment(deploy_id: str):
+    deployment = deploy_queue.get(deploy_id)
+    if deployment is None:
+        raise HTTPException(status_code=404, detail="Deployment not found")
+    return deployment.to_dict()
+
+@app.get("/deploy/status")
+async def get_deploy_status(user_id: str):
+    """Latest deploy recorded for a user; survives restarts via the state store."""
+    state = retrieve_user_state_tool.invoke(user_id)
+    if "error" in state or "deploy" not in state:
+        raise HTTPException(status_code=404, detail="No deployment recorded for this user")
+    return state["deploy"]
+
+@app.get("/metrics")
+async def get_metrics():
+    """Latency histograms, LLM usage, cache and error counters in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/workflow/stats")
+async def get_workflow_stats():
+    """Per-node wall-clock timings of the LangGraph workflow since startup."""
+    return node_timings.snapshot()
+
+@app.get("/workflow/{user_id}")
+async def get_workflow_state(user_id: str):
+    """Where a user's workflow thread stands and how long each node last took."""
+    snapshot = await workflow.snapshot(user_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="No workflow run for this user")
+    values = snapshot.values
+    return {
+        "user_id": user_id,
+        "next": list(snapshot.next),
+        "confirmed": bool(values.get("confirmed")),
+        "site": values.get("site"),
+        "deployment": values.get("deployment"),
+        "node_timings": values.get("node_timings", {})
+    }
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,186 @@
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+METRICS_PREFIX = "portfolio_"
+# Latency buckets in seconds, from a fast parse sub-stage up to a slow deploy
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+LOG_FORMAT = "%(levelname)s:%(name)s:[%(request_id)s] %(message)s"
+
+# Set per HTTP request; asyncio tasks and asyncio.to_thread inherit it
+request_id_var = contextvars.ContextVar("request_id", default="-")
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp every log record with the request id of the code that emitted it."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+def install_request_id_logging(fmt: str = LOG_FORMAT):
+    """Add the request id to every record handled by the root logger's handlers."""
+    for handler in logging.getLogger().handlers:
+        handler.addFilter(RequestIdFilter())
+        handler.setFormatter(logging.Formatter(fmt))
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """
+    In-process counters and latency histograms rendered in the Prometheus
+    text format for GET /metrics.
+
+    Values live in the process that records them: with
+    CV_PIPELINE_EXECUTOR=process, stages that run in pool workers are not
+    visible here. Collectors added with add_collector are called at render
+    time for values that are already tracked elsewhere (cache hit counts).
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS, prefix: str = METRICS_PREFIX):
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series["buckets"][i] += 1
+                    break
+            series["sum"] += seconds
+            series["count"] += 1
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Observe the block's duration; exceptions also count towards errors_total."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            # e.g. operation="parse_stage:skills" for parse_stage_duration_seconds{stage="skills"}
+            operation = ":".join([name.removesuffix("_duration_seconds"), *map(str, labels.values())])
+            self.inc("errors_total", operation=operation, error=type(e).__name__)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed(self, name: str, **labels):
+        """Decorator form of timer()."""
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def add_collector(self, collector):
+        """collector() yields (name, kind, labels, value) samples at render time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        families = {}
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                families.setdefault((name, "counter"), []).append(
+                    f"{self.prefix}{name}{_format_labels(labels)} {_format_value(value)}"
+                )
+            for (name, labels), series in self._histograms.items():
+                lines = families.setdefault((name, "histogram"), [])
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["buckets"]):
+                    cumulative += count
+                    le = (("le", _format_value(float(bound))),)
+                    lines.append(f"{self.prefix}{name}_bucket{_format_labels(labels, le)} {cumulative}")
+                lines.append(f"{self.prefix}{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {series['count']}")
+                lines.append(f"{self.prefix}{name}_sum{_format_labels(labels)} {_format_value(series['sum'])}")
+                lines.append(f"{self.prefix}{name}_count{_format_labels(labels)} {series['count']}")
+
+        for collector in self._collectors:
+            try:
+                for name, kind, labels, value in collector():
+                    families.setdefault((name, kind), []).append(
+                        f"{self.prefix}{name}{_format_labels(_label_key(labels))} {_format_value(value)}"
+                    )
+            except Exception as e:
+                logger.warning(f"Metrics collector {collector} failed: {str(e)}")
+
+        out = []
+        for (name, kind), lines in sorted(families.items()):
+            help_text = self._help.get(name, (kind, ""))[1]
+            if help_text:
+                out.append(f"# HELP {self.prefix}{name} {help_text}")
+            out.append(f"# TYPE {self.prefix}{name} {kind}")
+            out.extend(lines)
+        return "\n".join(out) + "\n"
+
+
+metrics = Metrics()
+
+for _name, _kind, _help in (
+    ("http_request_duration_seconds", "histogram", "API request latency by route and status."),
+    ("parse_stage_duration_seconds", "histogram", "utils.parse_cv sub-stage latency."),
+    ("workflow_node_duration_seconds", "histogram", "LangGraph workflow node latency."),
+    ("tool_duration_seconds", "histogram", "Latency of structure_resume, generate_site and deploy_site."),
+    ("llm_call_duration_seconds", "histogram", "Latency of LLM requests that missed the cache."),
+    ("llm_calls_total", "counter", "LLM requests by caller and whether the response cache served them."),
+    ("llm_tokens_total", "counter", "LLM tokens by caller and direction."),
+    ("errors_total", "counter", "Errors by operation and exception type."),
+):
+    metrics.describe(_name, _kind, _help)
+
+
+def record_llm_call(caller: str, response=None, cached: bool = False):
+    """Count one LLM request and, for cache misses, its token usage."""
+    metrics.inc("llm_calls_total", caller=caller, cached=str(cached).lower())
+    meta = getattr(response, "usage_metadata", None) or {}
+    if meta.get("input_tokens"):
+        metrics.inc("llm_tokens_total", meta["input_tokens"], caller=caller, direction="input")
+    if meta.get("output_tokens"):
+        metrics.inc("llm_tokens_total", meta["output_tokens"], caller=caller, direction="output")
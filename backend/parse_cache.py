@@ -0,0 +1,157 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+PARSE_CACHE_DIR = os.environ.get("PARSE_CACHE_DIR", "parse_cache")
+PARSE_CACHE_MAX_BYTES = int(os.environ.get("PARSE_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+PARSE_CACHE_ENABLED = os.environ.get("PARSE_CACHE_ENABLED", "1") != "0"
+
+# Extracted text, parse_cv output and enhanced output are cached separately
+CACHE_TIERS = ("text", "parsed", "enhanced")
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    Content-addressed on-disk cache for CV pipeline outputs.
+
+    Entries are JSON files keyed by the SHA-256 of the uploaded bytes plus a
+    pipeline version tag, so bumping the version invalidates stale results.
+    Reads refresh the file mtime and eviction removes the least recently
+    used entries once the directory grows past `max_bytes`.
+    """
+
+    def __init__(self, directory: str = PARSE_CACHE_DIR, max_bytes: int = PARSE_CACHE_MAX_BYTES,
+                 version: str = "1", enabled: bool = PARSE_CACHE_ENABLED):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.version = version
+        self.enabled = enabled
+        self.hits = Counter()
+        self.misses = Counter()
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _path(self, tier: str, key: str) -> str:
+        if tier not in CACHE_TIERS:
+            raise ValueError(f"Unknown cache tier: {tier}")
+        return os.path.join(self.directory, tier, key[:2], f"{key}-v{self.version}.json")
+
+    def get(self, tier: str, key: str):
+        """Return the cached value or None, counting the hit or miss."""
+        if not self.enabled or not key:
+            return None
+
+        path = self._path(tier, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses[tier] += 1
+            return None
+
+        with self._lock:
+            self.hits[tier] += 1
+        return value
+
+    def put(self, tier: str, key: str, value):
+        if not self.enabled or not key:
+            return
+
+        path = self._path(tier, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file and rename so readers never see partial JSON
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write parse cache entry {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+            over_budget = self._current_size() > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def _entries(self):
+        entries = []
+        for root, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if not filename.endswith(".json"):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _current_size(self) -> int:
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        return self._size
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            self._size = total
+        if removed:
+            logger.info(f"Evicted {removed} parse cache entries ({total} bytes remain)")
+
+    def stats(self) -> dict:
+        with self._lock:
+            tiers = {}
+            for tier in CACHE_TIERS:
+                hits, misses = self.hits[tier], self.misses[tier]
+                lookups = hits + misses
+                tiers[tier] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": round(hits / lookups, 3) if lookups else 0.0
+                }
+            return {
+                "enabled": self.enabled,
+                "version": self.version,
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "tiers": tiers
+            }
@@ -0,0 +1,145 @@
+import os
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pdfplumber
+
+try:
+    # Ships with pdfplumber; used for the text-only fast path
+    import pypdfium2
+except ImportError:
+    pypdfium2 = None
+
+logger = logging.getLogger(__name__)
+
+# Kept free of spaCy/LLM imports so page workers start quickly.
+
+PDF_MAX_BYTES = int(os.environ.get("PDF_MAX_BYTES", 20 * 1024 * 1024))
+PDF_MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", 30))
+PDF_MAX_CHARS = int(os.environ.get("PDF_MAX_CHARS", 200_000))
+PDF_EXTRACT_WORKERS = int(os.environ.get("PDF_EXTRACT_WORKERS", min(4, os.cpu_count() or 1)))
+# Documents shorter than this are read in-process; pool overhead isn't worth it
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", 4))
+# "pdfplumber" (layout-aware) or "pdfium" (text-only fast path)
+PDF_TEXT_BACKEND = os.environ.get("PDF_TEXT_BACKEND", "pdfplumber").lower()
+
+_page_pool = None
+_page_pool_lock = threading.Lock()
+
+
+class ExtractionBudgetError(ValueError):
+    """Raised when a document exceeds the configured extraction budget."""
+
+
+def _get_page_pool():
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = ProcessPoolExecutor(max_workers=PDF_EXTRACT_WORKERS)
+        return _page_pool
+
+
+def shutdown_page_pool(wait: bool = True):
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is not None:
+            _page_pool.shutdown(wait=wait, cancel_futures=True)
+            _page_pool = None
+
+
+def page_count(file_path: str, backend: str = PDF_TEXT_BACKEND) -> int:
+    if backend == "pdfium" and pypdfium2:
+        pdf = pypdfium2.PdfDocument(file_path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+
+def extract_page_range(file_path: str, start: int, end: int, backend: str = PDF_TEXT_BACKEND) -> list:
+    """
+    Extract text for pages [start, end).
+    Module-level so it can run in a worker process; each call opens its own handle.
+    """
+    texts = []
+    if backend == "pdfium" and pypdfium2:
+        pdf = pypdfium2.PdfDocument(file_path)
+        try:
+            for index in range(start, min(end, len(pdf))):
+                textpage = pdf[index].get_textpage()
+                texts.append(textpage.get_text_range().replace("\r\n", "\n").replace("\r", "\n"))
+                textpage.close()
+        finally:
+            pdf.close()
+        return texts
+
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages[start:end]:
+            texts.append(page.extract_text() or "")
+    return texts
+
+
+def iter_pdf_pages(file_path: str, max_pages: int = PDF_MAX_PAGES, workers: int = None,
+                   backend: str = PDF_TEXT_BACKEND):
+    """
+    Yield page texts in document order.
+
+    Long documents are split into batches of `workers` pages that are
+    extracted concurrently in a process pool, so callers can stop consuming
+    (and no further batches are scheduled) as soon as they have enough text.
+    `workers` defaults to PDF_EXTRACT_WORKERS, read at call time so batch
+    workers (which already run one file per core) can turn it down.
+    """
+    if workers is None:
+        workers = PDF_EXTRACT_WORKERS
+    size = os.path.getsize(file_path)
+    if size > PDF_MAX_BYTES:
+        raise ExtractionBudgetError(
+            f"PDF is {size} bytes, larger than the {PDF_MAX_BYTES} byte limit"
+        )
+
+    total = page_count(file_path, backend)
+    if total > max_pages:
+        logger.warning(f"{file_path} has {total} pages, only the first {max_pages} are read")
+        total = max_pages
+
+    if workers <= 1 or total < PDF_PARALLEL_MIN_PAGES:
+        for start in range(total):
+            yield from extract_page_range(file_path, start, start + 1, backend)
+        return
+
+    pool = _get_page_pool()
+    for batch_start in range(0, total, workers):
+        batch_end = min(batch_start + workers, total)
+        futures = [
+            pool.submit(extract_page_range, file_path, page, page + 1, backend)
+            for page in range(batch_start, batch_end)
+        ]
+        for future in futures:
+            yield from future.result()
+
+
+def extract_pdf_text(file_path: str, max_pages: int = PDF_MAX_PAGES, max_chars: int = PDF_MAX_CHARS,
+                     workers: int = None, backend: str = PDF_TEXT_BACKEND,
+                     stop_when=None) -> str:
+    """
+    Extract PDF text within a page/character budget.
+
+    `stop_when(page_text)` is called after each page and may return True to
+    end extraction early (e.g. once every needed section has been seen).
+    """
+    parts = []
+    chars = 0
+    for page_text in iter_pdf_pages(file_path, max_pages, workers, backend):
+        parts.append(page_text)
+        chars += len(page_text) + 1
+        if chars >= max_chars:
+            logger.warning(f"{file_path} reached the {max_chars} character budget")
+            break
+        if stop_when and stop_when(page_text):
+            break
+
+    return "\n".join(parts)[:max_chars]
@@ -0,0 +1,255 @@
+import os
+import asyncio
+import logging
+import threading
+import time
+import contextvars
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+try:
+    from .utils import extract_text, parse_cv, validate_cv_data
+    from .mapping import map_to_portfolio
+    from .llm_enhancer import (
+        enhance_portfolio_content_concurrent,
+        enhance_portfolio_content_batched,
+        track_enhancement,
+    )
+    from .parse_cache import ParseCache, hash_file
+    from .skill_aliases import alias_table_version
+    from . import pdf_extract
+except ImportError:
+    from utils import extract_text, parse_cv, validate_cv_data
+    from mapping import map_to_portfolio
+    from llm_enhancer import (
+        enhance_portfolio_content_concurrent,
+        enhance_portfolio_content_batched,
+        track_enhancement,
+    )
+    from parse_cache import ParseCache, hash_file
+    from skill_aliases import alias_table_version
+    import pdf_extract
+
+logger = logging.getLogger(__name__)
+
+# Execution mode for the extract -> parse -> enhance -> map pipeline.
+# "thread" keeps a single process (spaCy/pdfplumber release the GIL for much
+# of their work), "process" spreads CVs across cores at the cost of loading
+# the models once per worker process.
+PIPELINE_EXECUTOR = os.environ.get("CV_PIPELINE_EXECUTOR", "thread").lower()
+PIPELINE_WORKERS = int(os.environ.get("CV_PIPELINE_WORKERS", os.cpu_count() or 2))
+# Maximum number of CVs admitted at once (running + waiting for a worker).
+PIPELINE_MAX_PENDING = int(os.environ.get("CV_PIPELINE_MAX_PENDING", PIPELINE_WORKERS * 4))
+
+
+def init_worker_process():
+    """Initializer for pipeline worker processes."""
+    # Each worker already handles one CV per core; nested page pools would oversubscribe
+    pdf_extract.PDF_EXTRACT_WORKERS = 1
+
+
+class PipelineBusyError(RuntimeError):
+    """Raised when the pipeline queue is full and a new CV cannot be admitted."""
+
+
+# Stage names reported to progress listeners, in execution order.
+PIPELINE_STAGES = ("extract", "parse", "validate", "enhance", "map")
+
+# "on" fans the per-section LLM calls out concurrently, "batched" rewrites
+# the whole CV in a single prompt.
+ENHANCEMENT_MODES = {
+    "on": enhance_portfolio_content_concurrent,
+    "batched": enhance_portfolio_content_batched,
+}
+
+# Send the fragments the parser is unsure of (bad role/date splits, tech
+# stack lines in descriptions, ...) to the LLM after parsing. Off by default;
+# well-formatted CVs make no LLM call even when on.
+PARSE_REFINEMENT = os.environ.get("CV_PARSE_REFINEMENT", "off").lower() in ("1", "on", "true")
+
+# Bump whenever extraction, parsing or enhancement output changes so cached
+# results from older code are no longer served. The skill alias table is
+# part of the key, so editing it needs no bump.
+PIPELINE_VERSION = "5"
+
+
+def cache_version() -> str:
+    version = f"{PIPELINE_VERSION}-skills.{alias_table_version()}"
+    return f"{version}-refined" if PARSE_REFINEMENT else version
+
+
+parse_cache = ParseCache(version=cache_version())
+
+
+def file_digest(file_path: str):
+    """Content hash used as the parse cache key, or None when caching is off."""
+    return hash_file(file_path) if parse_cache.enabled else None
+
+
+def extract_stage(file_path: str, digest: str = None) -> str:
+    """PDF/DOCX extraction."""
+    text = parse_cache.get("text", digest)
+    if text is not None:
+        return text
+
+    text = extract_text(file_path)
+    if not text.strip():
+        raise ValueError("Empty CV text extracted")
+    parse_cache.put("text", digest, text)
+    return text
+
+
+def load_cached_cv(digest: str = None):
+    """Validated parse_cv output for a previously seen file, if cached."""
+    return parse_cache.get("parsed", digest)
+
+
+def parse_stage(text: str) -> dict:
+    """NLP extractor (plus low-confidence refinement if enabled), without schema validation."""
+    return parse_cv(text, validate=False, refine=PARSE_REFINEMENT)
+
+
+def validate_stage(cv_data: dict, digest: str = None) -> dict:
+    """Schema validator; caches the validated result under `digest`."""
+    cv_data = validate_cv_data(cv_data)
+    parse_cache.put("parsed", digest, cv_data)
+    return cv_data
+
+
+def enhance_stage(cv_data: dict, enhancement_mode: str = "off", digest: str = None) -> dict:
+    """Optional LLM enhancement; a no-op when enhancement is off."""
+    enhance = ENHANCEMENT_MODES.get(enhancement_mode)
+    if enhance is None:
+        return cv_data
+
+    key = f"{digest}-{enhancement_mode}" if digest else None
+    enhanced = parse_cache.get("enhanced", key)
+    if enhanced is not None:
+        return enhanced
+
+    logger.info(f"Applying LLM enhancement ({enhancement_mode})")
+    with track_enhancement(enhancement_mode):
+        enhanced = enhance(cv_data)
+    parse_cache.put("enhanced", key, enhanced)
+    return enhanced
+
+
+def map_stage(cv_data: dict) -> dict:
+    """Portfolio mapper."""
+    return map_to_portfolio(cv_data)
+
+
+def _timed(on_stage, stage, fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    if on_stage:
+        on_stage(stage, (time.perf_counter() - started) * 1000)
+    return result
+
+
+def parse_cv_file(file_path: str, enhancement_mode: str = "off", on_stage=None,
+                  digest: str = None) -> dict:
+    """
+    Extract, parse, validate and enhance a CV; everything but the mapping.
+    Extract, parse and validate are skipped when the parsed result is cached.
+    """
+    if digest is None:
+        digest = file_digest(file_path)
+
+    cv_data = load_cached_cv(digest)
+    if cv_data is None:
+        text = _timed(on_stage, "extract", extract_stage, file_path, digest)
+        cv_data = _timed(on_stage, "parse", parse_stage, text)
+        cv_data = _timed(on_stage, "validate", validate_stage, cv_data, digest)
+    return _timed(on_stage, "enhance", enhance_stage, cv_data, enhancement_mode, digest)
+
+
+def process_cv_file(file_path: str, enhancement_mode: str = "off", on_stage=None,
+                    digest: str = None) -> dict:
+    """
+    Run the full CV pipeline synchronously.
+    Module-level so it can be pickled into a process pool.
+
+    `on_stage(stage, duration_ms)` is called after each stage that runs;
+    extract, parse and validate are skipped when the parsed result is cached.
+    """
+    cv_data = parse_cv_file(file_path, enhancement_mode, on_stage, digest)
+    portfolio_data = _timed(on_stage, "map", map_stage, cv_data)
+
+    return {"cv_data": cv_data, "portfolio_data": portfolio_data}
+
+
+class PipelinePool:
+    """
+    Bounded worker pool that runs blocking pipeline work off the event loop.
+
+    Admission is capped at `max_pending`; once that many calls are in flight
+    further submissions fail fast with PipelineBusyError instead of queueing
+    without limit.
+    """
+
+    def __init__(self, mode: str = PIPELINE_EXECUTOR, workers: int = PIPELINE_WORKERS,
+                 max_pending: int = PIPELINE_MAX_PENDING):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unsupported pipeline executor: {mode}")
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                logger.info(f"Starting {self.mode} pipeline pool with {self.workers} workers")
+                if self.mode == "process":
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, initializer=init_worker_process
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="cv-pipeline"
+                    )
+            return self._executor
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def admit(self):
+        """Reserve a pipeline slot, raising PipelineBusyError if none is free."""
+        if not self._slots.acquire(blocking=False):
+            raise PipelineBusyError(
+                f"CV pipeline is at capacity ({self.max_pending} in flight), retry later"
+            )
+        self._in_flight += 1
+
+    def release(self):
+        """Return a slot reserved with admit()."""
+        self._in_flight -= 1
+        self._slots.release()
+
+    async def execute(self, fn, *args, **kwargs):
+        """Run `fn(*args, **kwargs)` in the pool without admission control."""
+        loop = asyncio.get_running_loop()
+        call = partial(fn, *args, **kwargs)
+        if self.mode == "thread":
+            # Carry the caller's context (request id) into the worker thread
+            call = partial(contextvars.copy_context().run, call)
+        return await loop.run_in_executor(self._get_executor(), call)
+
+    async def run(self, fn, *args, **kwargs):
+        """Run `fn(*args, **kwargs)` in the pool, rejecting it if the queue is full."""
+        self.admit()
+        try:
+            return await self.execute(fn, *args, **kwargs)
+        finally:
+            self.release()
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
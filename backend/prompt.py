@@ -1,3 +1,6 @@
+import json
+
+
 def build_refinement_prompt(parsed_json: dict) -> str:
     return f"""
 You are a strict resume data normalizer.
@@ -11,7 +14,7 @@ STRICT RULES
 -------------------------
 
 1. DO NOT invent new information.
-2. DO NOT add new skills.
+2. DO NOT add, rename or merge skills (they are already normalized).
 3. DO NOT add new companies.
 4. DO NOT modify dates unless clearly embedded in a field.
 5. DO NOT guess missing values.
@@ -32,11 +35,6 @@ You MAY:
 - Extract start_date and end_date if embedded inside role field.
 - Clean role titles by removing date text from them.
 - Split tech stack lines into list items.
-- Remove duplicate skills.
-- Normalize known equivalents:
-    - "RESTful API" → "REST"
-    - "HTML5" → "HTML"
-    - "CSS3" → "CSS"
 - Remove obvious formatting artifacts.
 - Move tech stack lines out of description into tech_stack array.
 
@@ -92,4 +90,111 @@ INPUT JSON
 OUTPUT
 -------------------------
 Return ONLY valid JSON.
-"""
\ No newline at end of file
+"""
+
+def build_batch_enhancement_prompt(payload: dict) -> str:
+    return f"""
+You are a professional resume writer and technical copywriter.
+
+Rewrite ALL of the resume content below in a single response.
+
+-------------------------
+STRICT RULES
+-------------------------
+
+1. DO NOT invent experience, metrics, achievements or technologies.
+2. DO NOT exaggerate.
+3. Preserve original meaning.
+4. Professional tone.
+5. Return STRICTLY VALID JSON.
+6. Do NOT include explanations, markdown or text outside JSON.
+
+-------------------------
+TASKS
+-------------------------
+
+- "summary": rewrite the professional summary, concise (3–4 sentences).
+  Return "" if the input summary is empty.
+- "experience": for every entry, improve its bullets with strong action
+  verbs, each bullet under 25 words. Keep the same "id".
+- "projects": for every entry, write a 30–40 word short description.
+  Keep the same "id".
+- "tagline": if "tagline_request" is present, write a hero tagline of
+  max 15 words, pipe-separated, no fake titles, no buzzword spam.
+  Otherwise return "".
+
+-------------------------
+EXPECTED JSON SCHEMA
+-------------------------
+
+{{
+  "summary": string,
+  "experience": [
+    {{ "id": int, "bullets": list }}
+  ],
+  "projects": [
+    {{ "id": int, "short_description": string }}
+  ],
+  "tagline": string
+}}
+
+-------------------------
+INPUT JSON
+-------------------------
+
+{json.dumps(payload, indent=2, ensure_ascii=False)}
+
+-------------------------
+OUTPUT
+-------------------------
+Return ONLY valid JSON.
+"""
+
+def build_fragment_refinement_prompt(fragments: list) -> str:
+    return f"""
+You are a strict resume data normalizer.
+
+Each fragment below is one part of a parsed resume that the parser was
+unsure about, with the issues it noticed. Fix ONLY those issues.
+
+-------------------------
+STRICT RULES
+-------------------------
+
+1. DO NOT invent new information; only move or split existing text.
+2. DO NOT add, remove or rename keys.
+3. DO NOT guess missing values; leave them as "" or [].
+4. If unsure, return the fragment's data unchanged.
+5. Return STRICTLY VALID JSON, no explanations or markdown.
+
+-------------------------
+ALLOWED OPERATIONS
+-------------------------
+
+- Move dates embedded in a role or title into start_date / end_date.
+- Move a company name embedded in the role into company.
+- Move tech stack lines out of description into tech_stack as list items.
+- Split a contact line into email, phone and location.
+- Remove obvious formatting artifacts.
+
+-------------------------
+EXPECTED JSON SCHEMA
+-------------------------
+
+{{
+  "fragments": [
+    {{ "id": int, "data": object with the same keys as the input fragment }}
+  ]
+}}
+
+-------------------------
+INPUT FRAGMENTS
+-------------------------
+
+{json.dumps(fragments, indent=2, ensure_ascii=False)}
+
+-------------------------
+OUTPUT
+-------------------------
+Return ONLY valid JSON.
+"""
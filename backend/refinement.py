@@ -0,0 +1,221 @@
+import os
+import re
+import copy
+import json
+import logging
+from typing import Dict, List, Tuple
+
+try:
+    from .prompt import build_fragment_refinement_prompt
+    from .schema_validator import ANY, compile_schema, extract_json_block
+    from .llm_cache import llm_cache, cache_key_for
+    from .metrics import metrics, record_llm_call
+    from .cv_document import YEAR_RE, is_tech_stack_line
+except ImportError:
+    from prompt import build_fragment_refinement_prompt
+    from schema_validator import ANY, compile_schema, extract_json_block
+    from llm_cache import llm_cache, cache_key_for
+    from metrics import metrics, record_llm_call
+    from cv_document import YEAR_RE, is_tech_stack_line
+
+logger = logging.getLogger(__name__)
+
+# Fragments scoring below this are sent to the LLM; clean ones never are
+REFINE_CONFIDENCE_THRESHOLD = float(os.environ.get("REFINE_CONFIDENCE_THRESHOLD", 0.7))
+
+MONTH_RE = re.compile(r"\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s*'?\d{2,4}\b", re.IGNORECASE)
+WORD_RE = re.compile(r"\w+")
+
+
+def _has_tech_stack_line(lines) -> bool:
+    return any(isinstance(line, str) and is_tech_stack_line(line.lower()) for line in lines)
+
+
+def score_experience(exp: dict) -> Tuple[float, List[str]]:
+    """Confidence in one structure_experience entry, with the reasons it was lowered."""
+    penalties = []
+    role = exp.get("role") or ""
+    if MONTH_RE.search(role) or YEAR_RE.search(role):
+        penalties.append((0.4, "role contains dates"))
+    if len(role.split()) > 8:
+        penalties.append((0.3, "role looks like a sentence"))
+    if not exp.get("company"):
+        penalties.append((0.3, "company is empty"))
+    if not exp.get("start_date") and not exp.get("end_date"):
+        penalties.append((0.2, "no dates"))
+    if "duration" in exp:
+        penalties.append((0.2, "dates on a separate line were not split"))
+    if any(len(exp.get(key) or "") > 25 for key in ("start_date", "end_date")):
+        penalties.append((0.3, "date fields hold more than a date"))
+    if _has_tech_stack_line(exp.get("description") or []):
+        penalties.append((0.3, "tech stack line left in description"))
+    return _score(penalties)
+
+
+def score_project(proj: dict) -> Tuple[float, List[str]]:
+    """Confidence in one structure_projects entry."""
+    penalties = []
+    title = proj.get("title") or ""
+    if len(title.split()) > 12 or (title.endswith(".") and len(title.split()) > 6):
+        penalties.append((0.4, "title looks like a description"))
+    if " | " in title and not proj.get("tech_stack"):
+        penalties.append((0.3, "tech stack embedded in title"))
+    if not proj.get("description"):
+        penalties.append((0.2, "description is empty"))
+    if _has_tech_stack_line(proj.get("description") or []):
+        penalties.append((0.3, "tech stack line left in description"))
+    return _score(penalties)
+
+
+def score_contact(contact: dict) -> Tuple[float, List[str]]:
+    """Confidence in extract_contact_details output."""
+    penalties = []
+    location = contact.get("location") or ""
+    if "@" in location or "|" in location or re.search(r"\d{5,}", location):
+        penalties.append((0.4, "location holds other contact details"))
+    phone = contact.get("phone") or ""
+    if phone and len(re.sub(r"\D", "", phone)) < 8:
+        penalties.append((0.3, "phone is too short"))
+    if any(not re.match(r"(https?://)?[\w.-]+\.\w+(/\S*)?$", link.strip()) for link in contact.get("links") or []):
+        penalties.append((0.3, "links contain non-URL text"))
+    return _score(penalties)
+
+
+def _score(penalties) -> Tuple[float, List[str]]:
+    return round(max(0.0, 1.0 - sum(p for p, _ in penalties)), 2), [reason for _, reason in penalties]
+
+
+def score_cv(cv_data: dict) -> List[dict]:
+    """Every experience, project and contact fragment with its confidence and reasons."""
+    fragments = []
+    for section, scorer in (("experience", score_experience), ("projects", score_project)):
+        for index, item in enumerate(cv_data.get(section) or []):
+            if isinstance(item, dict):
+                confidence, reasons = scorer(item)
+                fragments.append({"section": section, "index": index,
+                                  "confidence": confidence, "reasons": reasons})
+    if isinstance(cv_data.get("contact"), dict):
+        confidence, reasons = score_contact(cv_data["contact"])
+        fragments.append({"section": "contact", "index": None, "confidence": confidence, "reasons": reasons})
+    return fragments
+
+
+def _get_fragment(cv_data: dict, fragment: dict):
+    if fragment["index"] is None:
+        return cv_data[fragment["section"]]
+    return cv_data[fragment["section"]][fragment["index"]]
+
+
+def fragment_schema(original: dict):
+    """A refined fragment must keep the original's keys, with lists of strings where it had lists."""
+    return compile_schema({key: [str] if isinstance(value, list) else ANY for key, value in original.items()})
+
+
+def _words(value) -> set:
+    if isinstance(value, str):
+        return set(WORD_RE.findall(value.lower()))
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, list):
+        return set().union(*map(_words, value)) if value else set()
+    return set()
+
+
+def invents_content(original, refined) -> bool:
+    """True if the refined fragment contains any word token that isn't in the original."""
+    return not _words(refined) <= _words(original)
+
+
+def parse_reply(response_text: str):
+    """The reply's "fragments" list, or None if the reply isn't the expected JSON."""
+    try:
+        data = json.loads(extract_json_block(response_text))
+    except ValueError as e:
+        logger.warning(f"Refinement returned invalid JSON: {e}")
+        return None
+    replies = data.get("fragments") if isinstance(data, dict) else None
+    return replies if isinstance(replies, list) else None
+
+
+def _merge(cv_data: dict, sent: List[dict], replies: list) -> int:
+    """Put valid refined fragments back into cv_data; returns how many were applied."""
+    applied = 0
+    by_id = {reply.get("id"): reply.get("data") for reply in replies if isinstance(reply, dict)}
+    for fragment_id, fragment in enumerate(sent):
+        refined = by_id.get(fragment_id)
+        if refined is None:
+            continue
+        original = _get_fragment(cv_data, fragment)
+        errors = []
+        fragment_schema(original)(refined, f"$.{fragment['section']}", errors)
+        if errors:
+            logger.warning(f"Dropping refined {fragment['section']} fragment: {errors[0]}")
+            continue
+        if invents_content(original, refined):
+            logger.warning(f"Dropping refined {fragment['section']} fragment: it adds new text")
+            continue
+        if fragment["index"] is None:
+            cv_data[fragment["section"]] = refined
+        else:
+            cv_data[fragment["section"]][fragment["index"]] = refined
+        applied += 1
+    return applied
+
+
+def _call_llm(llm, prompt: str):
+    """
+    Parsed reply (see parse_reply) for the prompt, from the LLM cache or the
+    model. A reply is only cached once it parses, so a malformed one is
+    retried next time rather than served from the cache.
+    """
+    cache_key, model = cache_key_for(llm, "", prompt)
+    cached = llm_cache.get(cache_key, model)
+    if cached is not None:
+        replies = parse_reply(cached)
+        if replies is not None:
+            record_llm_call("refinement", cached=True)
+            return replies
+
+    with metrics.timer("llm_call_duration_seconds", caller="refinement"):
+        response = llm.invoke(prompt)
+    record_llm_call("refinement", response)
+    content = response.content if hasattr(response, "content") else str(response)
+    replies = parse_reply(content)
+    if replies is not None:
+        llm_cache.put(cache_key, model, content)
+    return replies
+
+
+def refine_low_confidence(cv_data: dict, llm, threshold: float = REFINE_CONFIDENCE_THRESHOLD) -> Dict:
+    """
+    Send only the fragments of a parsed CV that score below `threshold` to
+    the LLM, in one prompt, and merge the valid answers back. A CV where
+    everything scores well costs no LLM call at all.
+
+    `cv_data` itself is never modified.
+    """
+    low = [f for f in score_cv(cv_data) if f["confidence"] < threshold]
+    if not low:
+        return cv_data
+
+    refined = copy.deepcopy(cv_data)
+    payload = [
+        {"id": fragment_id, "section": f["section"], "issues": f["reasons"], "data": _get_fragment(cv_data, f)}
+        for fragment_id, f in enumerate(low)
+    ]
+    prompt = build_fragment_refinement_prompt(payload)
+
+    try:
+        replies = _call_llm(llm, prompt)
+    except Exception as e:
+        logger.warning(f"Refinement LLM call failed, keeping parser output: {e}")
+        return cv_data
+    if replies is None:
+        return cv_data
+
+    applied = _merge(refined, low, replies)
+    logger.info(
+        f"Refined {applied} of {len(low)} low-confidence fragments "
+        f"({len(prompt)} prompt chars)"
+    )
+    return refined
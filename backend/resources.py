@@ -0,0 +1,88 @@
+import os
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated resource names to build at startup ("all" for every one).
+# Empty by default so the API starts fast and each resource loads on first use.
+WARM_UP_RESOURCES = os.environ.get("WARM_UP_RESOURCES", "")
+
+
+class ResourceRegistry:
+    """
+    Process-wide registry of expensive shared objects (spaCy pipeline, LLM
+    clients, skill index).
+
+    Modules register a factory under a name; the object is built on first
+    `get()` and shared by every caller in the process afterwards. Building
+    resources in `warm_up()` before a process pool forks lets the workers
+    share the loaded models copy-on-write instead of loading their own.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._load_times = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory):
+        with self._lock:
+            self._factories[name] = factory
+
+    def get(self, name: str):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            # Another thread may have built it while we waited for the lock
+            if name not in self._instances:
+                if name not in self._factories:
+                    raise KeyError(f"Unknown resource: {name}")
+                started = time.perf_counter()
+                self._instances[name] = self._factories[name]()
+                self._load_times[name] = round((time.perf_counter() - started) * 1000, 1)
+                logger.info(f"Loaded resource '{name}' in {self._load_times[name]} ms")
+            return self._instances[name]
+
+    def warm_up(self, names=None):
+        """Build the named resources (all registered ones by default)."""
+        for name in names or list(self._factories):
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.warning(f"Failed to warm up resource '{name}': {e}")
+
+    def loaded(self) -> dict:
+        """Names of built resources and how long each took to build, in ms."""
+        return dict(self._load_times)
+
+
+registry = ResourceRegistry()
+
+
+def lazy_resource(name: str):
+    """
+    Register the decorated factory and replace it with a getter that
+    returns the shared instance.
+    """
+    def decorator(factory):
+        registry.register(name, factory)
+
+        def getter():
+            return registry.get(name)
+
+        getter.__name__ = factory.__name__
+        getter.__doc__ = factory.__doc__
+        return getter
+
+    return decorator
+
+
+def warm_up_from_env():
+    names = [n.strip() for n in WARM_UP_RESOURCES.split(",") if n.strip()]
+    if not names:
+        return
+    registry.warm_up(None if "all" in names else names)
@@ -1,6 +1,11 @@
 import json
+import logging
+from typing import Callable, List, NamedTuple
+
 from prompt import build_refinement_prompt
 
+logger = logging.getLogger(__name__)
+
 EXPECTED_SCHEMA = {
     "name": str,
     "contact": dict,
@@ -14,6 +19,99 @@ EXPECTED_SCHEMA = {
 
 import re
 
+# Declarative schema for parser and LLM output, compiled once by compile_schema:
+#   a type        -> isinstance check
+#   a dict        -> exactly these keys, each value checked against its schema
+#   [item_schema] -> a list whose items all match item_schema
+#   ANY           -> anything
+ANY = object
+
+CV_SCHEMA = {
+    "name": str,
+    "contact": {"email": ANY, "phone": ANY, "links": ANY, "location": ANY},
+    "summary": str,
+    "skills": list,
+    "education": list,
+    "experience": [{
+        "role": ANY, "company": ANY, "start_date": ANY,
+        "end_date": ANY, "description": list, "tech_stack": list
+    }],
+    "projects": [{"title": ANY, "description": list, "tech_stack": list}],
+    "certifications": list
+}
+
+
+class SchemaError(NamedTuple):
+    path: str
+    expected: str
+    actual: str
+
+    def __str__(self):
+        return f"{self.path}: expected {self.expected}, got {self.actual}"
+
+
+def _type_name(value) -> str:
+    return type(value).__name__
+
+
+def compile_schema(schema) -> Callable:
+    """
+    Turn a declarative schema into a check(value, path, errors) function that
+    appends SchemaErrors; all schema walking happens here, once.
+    """
+    if schema is ANY:
+        return lambda value, path, errors: None
+
+    if isinstance(schema, type):
+        expected = schema.__name__
+
+        def check_type(value, path, errors):
+            if not isinstance(value, schema):
+                errors.append(SchemaError(path, expected, _type_name(value)))
+        return check_type
+
+    if isinstance(schema, list):
+        check_item = compile_schema(schema[0])
+
+        def check_list(value, path, errors):
+            if not isinstance(value, list):
+                errors.append(SchemaError(path, "list", _type_name(value)))
+                return
+            for index, item in enumerate(value):
+                check_item(item, f"{path}[{index}]", errors)
+        return check_list
+
+    if isinstance(schema, dict):
+        keys = frozenset(schema)
+        fields = [(key, compile_schema(sub)) for key, sub in schema.items()]
+
+        def check_dict(value, path, errors):
+            if not isinstance(value, dict):
+                errors.append(SchemaError(path, "dict", _type_name(value)))
+                return
+            if value.keys() != keys:
+                for key in sorted(keys - value.keys()):
+                    errors.append(SchemaError(f"{path}.{key}", "key", "missing"))
+                for key in sorted(value.keys() - keys, key=str):
+                    errors.append(SchemaError(f"{path}.{key}", "no such key", _type_name(value[key])))
+            for key, check in fields:
+                if key in value:
+                    check(value[key], f"{path}.{key}", errors)
+        return check_dict
+
+    raise TypeError(f"Unsupported schema node: {schema!r}")
+
+
+_check_cv = compile_schema(CV_SCHEMA)
+
+
+def validate_cv_dict(data) -> List[SchemaError]:
+    """Check a CV dict against CV_SCHEMA without serializing it; [] when valid."""
+    errors = []
+    _check_cv(data, "$", errors)
+    return errors
+
+
 def extract_json_block(text: str) -> str:
     """
     Robustly extract JSON from LLM output.
@@ -43,6 +141,9 @@ def validate_schema(llm_output: str, original_json: dict) -> dict:
     """
     Validates LLM output against strict schema.
     If validation fails, returns original_json.
+
+    Parser output that is already a dict should go through validate_cv_dict;
+    the JSON extraction here is only needed for raw LLM text.
     """
     
     if isinstance(llm_output, dict):
@@ -54,61 +155,14 @@ def validate_schema(llm_output: str, original_json: dict) -> dict:
         try:
             data = json.loads(cleaned_output)
         except Exception as e:
-            print(f"❌ Invalid JSON from LLM: {e}. Falling back.")
-            print(f"Snippet: {cleaned_output[:100]}...")
+            logger.warning(f"Invalid JSON from LLM: {e}. Falling back. Snippet: {cleaned_output[:100]}...")
             return original_json
 
-    # 1️⃣ Top-level key check
-    if set(data.keys()) != set(EXPECTED_SCHEMA.keys()):
-        print("❌ Schema keys mismatch. Falling back.")
+    errors = validate_cv_dict(data)
+    if errors:
+        logger.warning(f"LLM output failed schema validation, falling back: {'; '.join(map(str, errors[:5]))}")
         return original_json
 
-    # 2️⃣ Type validation
-    for key, expected_type in EXPECTED_SCHEMA.items():
-        if not isinstance(data[key], expected_type):
-            print(f"❌ Type mismatch in field: {key}")
-            return original_json
-
-    # 3️⃣ Contact validation
-    if not isinstance(data["contact"], dict):
-        return original_json
-
-    required_contact_keys = {"email", "phone", "links", "location"}
-    if set(data["contact"].keys()) != required_contact_keys:
-        print("❌ Contact structure invalid.")
-        return original_json
-
-    # 4️⃣ Experience structure validation
-    for exp in data["experience"]:
-        required_exp_keys = {
-            "role", "company", "start_date",
-            "end_date", "description", "tech_stack"
-        }
-
-        if set(exp.keys()) != required_exp_keys:
-            print("❌ Experience schema mismatch.")
-            return original_json
-
-        if not isinstance(exp["description"], list):
-            return original_json
-
-        if not isinstance(exp["tech_stack"], list):
-            return original_json
-
-    # 5️⃣ Projects structure validation
-    for proj in data["projects"]:
-        required_proj_keys = {"title", "description", "tech_stack"}
-
-        if set(proj.keys()) != required_proj_keys:
-            print("❌ Project schema mismatch.")
-            return original_json
-
-        if not isinstance(proj["description"], list):
-            return original_json
-
-        if not isinstance(proj["tech_stack"], list):
-            return original_json
-
     return data
 
 def guard_against_hallucinated_skills(cleaned_json, original_json):
@@ -0,0 +1,422 @@
+import os
+import re
+import json
+import html
+import hashlib
+import logging
+import threading
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the generated markup changes
+RENDERER_VERSION = "1"
+
+DEFAULT_THEME = "modern"
+
+# Theme-specific class tokens, substituted into the templates at compile time
+THEME_STYLES = {
+    "modern": {
+        "primary_chip": "bg-indigo-100 text-indigo-700",
+        "secondary_chip": "bg-gray-100 text-gray-600",
+        "accent_text": "text-indigo-500",
+        "accent_border": "border-indigo-500",
+        "tech_chip": "bg-indigo-50 text-indigo-600",
+        "card_border": "border-gray-200 dark:border-gray-800",
+    },
+    "minimal": {
+        "primary_chip": "bg-neutral-900 text-white",
+        "secondary_chip": "bg-neutral-100 text-neutral-700",
+        "accent_text": "text-neutral-500",
+        "accent_border": "border-neutral-900",
+        "tech_chip": "bg-neutral-100 text-neutral-700",
+        "card_border": "border-neutral-200",
+    },
+    "dark": {
+        "primary_chip": "bg-indigo-500/20 text-indigo-300",
+        "secondary_chip": "bg-slate-800 text-slate-300",
+        "accent_text": "text-indigo-400",
+        "accent_border": "border-indigo-400",
+        "tech_chip": "bg-slate-800 text-indigo-300",
+        "card_border": "border-slate-800",
+    },
+}
+
+# Page sections in document order
+SECTIONS = ("hero", "about", "skills", "experience", "projects", "contact")
+
+# portfolio_data keys each section is rendered from
+SECTION_DATA_KEYS = {
+    "hero": ("hero",),
+    "about": ("about",),
+    "skills": ("skills_section",),
+    "experience": ("experience_timeline",),
+    "projects": ("projects_section",),
+    "contact": ("contact_section", "hero"),
+}
+
+# Sidecar written next to index.html describing how it was rendered
+MANIFEST_NAME = "site.json"
+
+_SECTION_BLOCK = re.compile(r"<!-- section:(\w+) -->.*?<!-- /section:\1 -->", re.DOTALL)
+_TITLE = re.compile(r"<title>.*?</title>", re.DOTALL)
+
+
+class Markup(str):
+    """A string that is already safe HTML and must not be escaped again."""
+
+
+def escape(value) -> str:
+    if isinstance(value, Markup):
+        return value
+    if value is None:
+        return ""
+    return html.escape(str(value), quote=True)
+
+
+def safe_url(url) -> str:
+    """Only allow http(s)/mailto links; anything else renders as an empty href."""
+    url = str(url or "").strip()
+    if re.match(r"^(https?://|mailto:)", url, re.IGNORECASE):
+        return url
+    return ""
+
+
+_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class Template:
+    """
+    A template compiled once into alternating literal chunks and field names.
+    Rendering is a single list join; every value is HTML-escaped unless it
+    is Markup.
+    """
+
+    def __init__(self, source: str):
+        parts = _PLACEHOLDER.split(source)
+        self.literals = parts[0::2]
+        self.fields = parts[1::2]
+
+    def render(self, **values) -> Markup:
+        out = [self.literals[0]]
+        for field, literal in zip(self.fields, self.literals[1:]):
+            out.append(escape(values.get(field, "")))
+            out.append(literal)
+        return Markup("".join(out))
+
+
+PAGE_SOURCE = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{ title }}</title>
+    <script src="https://cdn.tailwindcss.com"></script>
+    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&display=swap" rel="stylesheet">
+    <style>
+        body { font-family: 'Inter', sans-serif; transition: all 0.3s ease; }
+        .modern-theme { background: #f8fafc; color: #1e293b; }
+        .dark-theme { background: #0f172a; color: #f8fafc; }
+        .minimal-theme { background: #ffffff; color: #171717; }
+        .gradient-text { background: linear-gradient(135deg, #6366f1 0%, #a855f7 100%); -webkit-background-clip: text; -webkit-text-fill-color: transparent; }
+    </style>
+</head>
+<body class="[[theme]]-theme">
+    <div class="max-w-4xl mx-auto px-6 py-20">
+{{ body }}
+    </div>
+</body>
+</html>
+"""
+
+SECTION_SOURCES = {
+    "hero": """
+        <header class="mb-20">
+            <h1 class="text-6xl font-bold mb-6 gradient-text">{{ name }}</h1>
+            <p class="text-xl opacity-80">{{ tagline }}</p>
+        </header>
+""",
+    "about": """
+        <section class="mb-20">
+            <h2 class="text-2xl font-bold mb-6 border-b pb-2 opacity-90">About</h2>
+            <p class="text-lg opacity-80 leading-relaxed">{{ summary }}</p>
+        </section>
+""",
+    "skills": """
+        <section class="mb-20">
+            <h2 class="text-2xl font-bold mb-6 border-b pb-2 opacity-90">Skills</h2>
+            <div class="flex flex-wrap gap-2">
+                {{ skills }}
+            </div>
+        </section>
+""",
+    "experience": """
+        <section class="mb-20">
+            <h2 class="text-2xl font-bold mb-6 border-b pb-2 opacity-90">Experience</h2>
+            <div class="space-y-10">
+                {{ items }}
+            </div>
+        </section>
+""",
+    "projects": """
+        <section class="mb-20">
+            <h2 class="text-2xl font-bold mb-6 border-b pb-2 opacity-90">Projects</h2>
+            <div class="grid md:grid-cols-2 gap-6">
+                {{ items }}
+            </div>
+        </section>
+""",
+    "contact": """
+        <footer class="pt-20 border-t [[card_border]] text-center opacity-60">
+            <div class="flex flex-wrap justify-center gap-4 mb-4">{{ links }}</div>
+            <p>&copy; {{ name }}. All rights reserved.</p>
+        </footer>
+""",
+}
+
+FRAGMENT_SOURCES = {
+    "primary_skill": '<span class="px-3 py-1 [[primary_chip]] rounded-full text-sm font-medium">{{ skill }}</span> ',
+    "secondary_skill": '<span class="px-3 py-1 [[secondary_chip]] rounded-full text-sm font-medium">{{ skill }}</span> ',
+    "experience_item": """
+            <div class="border-l-2 [[accent_border]] pl-6 mb-10">
+                <h3 class="text-xl font-bold">{{ role }}</h3>
+                <p class="[[accent_text]] font-medium">{{ company }}</p>
+                <p class="text-sm opacity-60 mb-4">{{ period }}</p>
+                <ul class="list-disc pl-5 space-y-2 opacity-80">
+                    {{ highlights }}
+                </ul>
+            </div>""",
+    "highlight": "<li>{{ text }}</li>",
+    "project_item": """
+            <div class="p-6 rounded-xl border [[card_border]] hover:shadow-lg transition-shadow">
+                <h3 class="text-xl font-bold mb-2">{{ title }}</h3>
+                <p class="text-sm opacity-70 mb-4">{{ description }}</p>
+                <div class="flex flex-wrap gap-1">
+                    {{ tech }}
+                </div>
+            </div>""",
+    "tech": '<span class="text-xs [[tech_chip]] px-2 py-0.5 rounded">{{ tech }}</span> ',
+    "contact_link": '<a class="hover:underline" href="{{ href }}">{{ label }}</a>',
+}
+
+
+def normalize_theme(theme: str) -> str:
+    if theme in THEME_STYLES:
+        return theme
+    logger.warning(f"Unknown theme '{theme}', falling back to {DEFAULT_THEME}")
+    return DEFAULT_THEME
+
+
+@lru_cache(maxsize=None)
+def get_theme_templates(theme: str) -> dict:
+    """Compile (once per theme) the page skeleton, section and fragment templates."""
+    styles = dict(THEME_STYLES[theme], theme=theme)
+
+    def compile_source(source):
+        return Template(re.sub(r"\[\[(\w+)\]\]", lambda m: styles[m.group(1)], source))
+
+    templates = {name: compile_source(src) for name, src in SECTION_SOURCES.items()}
+    templates.update({name: compile_source(src) for name, src in FRAGMENT_SOURCES.items()})
+    templates["page"] = compile_source(PAGE_SOURCE)
+    return templates
+
+
+def _join(template: Template, values, field: str) -> Markup:
+    return Markup("".join(template.render(**{field: v}) for v in values))
+
+
+def render_section(name: str, portfolio_data: dict, theme: str = DEFAULT_THEME) -> Markup:
+    """Render one page section from its slice of portfolio_data."""
+    t = get_theme_templates(normalize_theme(theme))
+    hero = portfolio_data.get("hero", {}) or {}
+
+    if name == "hero":
+        return t["hero"].render(name=hero.get("name", ""), tagline=hero.get("tagline", ""))
+
+    if name == "about":
+        return t["about"].render(summary=(portfolio_data.get("about", {}) or {}).get("summary", ""))
+
+    if name == "skills":
+        skills = portfolio_data.get("skills_section", {}) or {}
+        chips = Markup(
+            _join(t["primary_skill"], skills.get("primary_skills", []), "skill")
+            + _join(t["secondary_skill"], skills.get("secondary_skills", []), "skill")
+        )
+        return t["skills"].render(skills=chips)
+
+    if name == "experience":
+        items = Markup("".join(
+            t["experience_item"].render(
+                role=exp.get("role", ""),
+                company=exp.get("company", ""),
+                period=exp.get("period", ""),
+                highlights=_join(t["highlight"], exp.get("highlights", []), "text"),
+            )
+            for exp in portfolio_data.get("experience_timeline", [])
+        ))
+        return t["experience"].render(items=items)
+
+    if name == "projects":
+        items = Markup("".join(
+            t["project_item"].render(
+                title=proj.get("title", ""),
+                description=proj.get("short_description", ""),
+                tech=_join(t["tech"], proj.get("tech_stack", []), "tech"),
+            )
+            for proj in portfolio_data.get("projects_section", [])
+        ))
+        return t["projects"].render(items=items)
+
+    if name == "contact":
+        contact = portfolio_data.get("contact_section", {}) or {}
+        links = []
+        if contact.get("email"):
+            links.append(("Email", f"mailto:{contact['email']}"))
+        for key, label in (("linkedin", "LinkedIn"), ("github", "GitHub"), ("portfolio", "Website")):
+            if safe_url(contact.get(key)):
+                links.append((label, contact[key]))
+        links_html = Markup("".join(
+            t["contact_link"].render(href=safe_url(href), label=label) for label, href in links
+        ))
+        return t["contact"].render(links=links_html, name=hero.get("name", ""))
+
+    raise ValueError(f"Unknown section: {name}")
+
+
+def section_fingerprint(name: str, portfolio_data: dict, theme: str) -> str:
+    """Hash of everything a section's markup depends on."""
+    data = {key: portfolio_data.get(key) for key in SECTION_DATA_KEYS[name]}
+    raw = json.dumps([RENDERER_VERSION, theme, name, data], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def render_marked_section(name: str, portfolio_data: dict, theme: str) -> Markup:
+    """A section wrapped in comment markers so it can be patched in place later."""
+    return Markup(
+        f"<!-- section:{name} -->{render_section(name, portfolio_data, theme)}<!-- /section:{name} -->"
+    )
+
+
+def page_title(portfolio_data: dict) -> str:
+    return (portfolio_data.get("hero", {}) or {}).get("name", "My Portfolio") or "My Portfolio"
+
+
+def render_site(portfolio_data: dict, theme: str = DEFAULT_THEME) -> str:
+    """Render the complete index.html for a portfolio."""
+    theme = normalize_theme(theme)
+    body = Markup("".join(render_marked_section(name, portfolio_data, theme) for name in SECTIONS))
+    return get_theme_templates(theme)["page"].render(title=page_title(portfolio_data), body=body)
+
+
+def write_site(index_path: str, portfolio_data: dict, theme: str = DEFAULT_THEME):
+    """
+    Render straight into index_path, one section at a time, and record a
+    manifest of section fingerprints for incremental updates.
+    """
+    theme = normalize_theme(theme)
+    page = get_theme_templates(theme)["page"]
+    # The page skeleton is "<head...>{{ title }}...{{ body }}..."; stream its literals around the sections
+    title_index = page.fields.index("title")
+    body_index = page.fields.index("body")
+    with open(index_path, "w", encoding="utf-8") as f:
+        for i, literal in enumerate(page.literals):
+            f.write(literal)
+            if i == title_index:
+                f.write(escape(page_title(portfolio_data)))
+            elif i == body_index:
+                for name in SECTIONS:
+                    f.write(render_marked_section(name, portfolio_data, theme))
+
+    write_manifest(os.path.dirname(index_path), portfolio_data, theme)
+
+
+def write_manifest(repo_path: str, portfolio_data: dict, theme: str):
+    manifest = {
+        "renderer_version": RENDERER_VERSION,
+        "theme": theme,
+        "fingerprints": {name: section_fingerprint(name, portfolio_data, theme) for name in SECTIONS},
+        "portfolio_data": portfolio_data,
+    }
+    _atomic_write(os.path.join(repo_path, MANIFEST_NAME), json.dumps(manifest))
+
+
+def read_manifest(repo_path: str):
+    path = os.path.join(repo_path, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _atomic_write(path: str, content: str):
+    # Unique per thread: concurrent renders of one site must not share a temp file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def merge_updates(portfolio_data: dict, updates: dict) -> dict:
+    """
+    Apply structured edits to a copy of portfolio_data. Dict sections (hero,
+    about, skills_section, contact_section) are merged field by field; list
+    sections and scalars are replaced.
+    """
+    merged = dict(portfolio_data)
+    for key, value in updates.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = {**merged[key], **value}
+        else:
+            merged[key] = value
+    return merged
+
+
+def update_site(repo_path: str, portfolio_data: dict, theme: str = None) -> list:
+    """
+    Re-render only the sections whose portfolio_data slice changed since
+    the last render and patch index.html in place.
+
+    Falls back to a full render when there is no usable manifest (sites
+    generated before incremental rendering, a renderer upgrade, or a theme
+    change). Returns the names of the sections that were rebuilt.
+    """
+    index_path = os.path.join(repo_path, "index.html")
+    manifest = read_manifest(repo_path)
+    theme = normalize_theme(theme or (manifest or {}).get("theme", DEFAULT_THEME))
+
+    if (
+        manifest is None
+        or manifest.get("renderer_version") != RENDERER_VERSION
+        or manifest.get("theme") != theme
+        or not os.path.exists(index_path)
+    ):
+        write_site(index_path, portfolio_data, theme)
+        return list(SECTIONS)
+
+    old_prints = manifest.get("fingerprints", {})
+    new_prints = {name: section_fingerprint(name, portfolio_data, theme) for name in SECTIONS}
+    changed = [name for name in SECTIONS if old_prints.get(name) != new_prints[name]]
+    if not changed:
+        return []
+
+    with open(index_path, "r", encoding="utf-8") as f:
+        page = f.read()
+
+    found = set(_SECTION_BLOCK.findall(page))
+    if not set(changed) <= found:
+        # Markers missing (hand-edited page); rebuild everything
+        write_site(index_path, portfolio_data, theme)
+        return list(SECTIONS)
+
+    rendered = {name: render_marked_section(name, portfolio_data, theme) for name in changed}
+    page = _SECTION_BLOCK.sub(
+        lambda m: rendered.get(m.group(1), m.group(0)),
+        page
+    )
+    if "hero" in changed:
+        page = _TITLE.sub(lambda m: f"<title>{escape(page_title(portfolio_data))}</title>", page, count=1)
+
+    _atomic_write(index_path, page)
+    write_manifest(repo_path, portfolio_data, theme)
+    return changed
@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import argparse
+import threading
+from collections import Counter
+
+try:
+    from .site_renderer import RENDERER_VERSION, normalize_theme, read_manifest, update_site, write_site
+    from .state_store import get_state_store
+except ImportError:
+    from site_renderer import RENDERER_VERSION, normalize_theme, read_manifest, update_site, write_site
+    from state_store import get_state_store
+
+logger = logging.getLogger(__name__)
+
+GENERATED_SITES_DIR = os.environ.get("GENERATED_SITES_DIR", "generated_sites")
+# Unreferenced sites younger than this are kept, so a site rendered just
+# before its user state is written isn't collected in between
+SITE_GC_MIN_AGE = float(os.environ.get("SITE_GC_MIN_AGE", 3600))
+
+
+def site_key(portfolio_data: dict, theme: str) -> str:
+    """Content address of a rendered site."""
+    raw = json.dumps([RENDERER_VERSION, normalize_theme(theme), portfolio_data], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def _is_complete(repo_path: str) -> bool:
+    return os.path.exists(os.path.join(repo_path, "index.html")) and read_manifest(repo_path) is not None
+
+
+def _tmp_path(repo_path: str) -> str:
+    # Unique per thread: pool workers may build the same site at once
+    return f"{repo_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _touch(repo_path: str):
+    """Mark a reused site as recently handed out, so min_age protects it from GC."""
+    try:
+        os.utime(repo_path)
+    except OSError:
+        pass
+
+
+def _publish(tmp_path: str, repo_path: str):
+    """Move a fully written site into place; if another writer won the race, keep theirs."""
+    try:
+        os.rename(tmp_path, repo_path)
+    except OSError:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        if not _is_complete(repo_path):
+            raise
+
+
+def get_or_create_site(portfolio_data: dict, theme: str, sites_dir: str = GENERATED_SITES_DIR):
+    """
+    Return (repo_path, created). Identical portfolio_data/theme pairs map to
+    the same folder, which is only rendered the first time.
+    """
+    repo_path = os.path.join(sites_dir, site_key(portfolio_data, theme))
+    if _is_complete(repo_path):
+        _touch(repo_path)
+        return repo_path, False
+
+    os.makedirs(sites_dir, exist_ok=True)
+    tmp_path = _tmp_path(repo_path)
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    write_site(os.path.join(tmp_path, "index.html"), portfolio_data, normalize_theme(theme))
+    _publish(tmp_path, repo_path)
+    return repo_path, True
+
+
+def derive_site(repo_path: str, portfolio_data: dict, theme: str = None, sites_dir: str = GENERATED_SITES_DIR):
+    """
+    Copy-on-write edit: produce the site for the edited portfolio_data
+    without touching repo_path, which other users may share.
+
+    The copy is patched incrementally (only changed sections re-render).
+    Returns (new_repo_path, rebuilt_sections).
+    """
+    manifest = read_manifest(repo_path) or {}
+    theme = normalize_theme(theme or manifest.get("theme", "modern"))
+    new_path = os.path.join(sites_dir, site_key(portfolio_data, theme))
+    if _is_complete(new_path):
+        _touch(new_path)
+        return new_path, []
+
+    os.makedirs(sites_dir, exist_ok=True)
+    tmp_path = _tmp_path(new_path)
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    if os.path.isdir(repo_path):
+        shutil.copytree(repo_path, tmp_path)
+    else:
+        os.makedirs(tmp_path)
+    rebuilt = update_site(tmp_path, portfolio_data, theme)
+    _publish(tmp_path, new_path)
+    return new_path, rebuilt
+
+
+def site_name(repo_path: str) -> str:
+    """Folder name of a stored repo_path, written with either separator style."""
+    return repo_path.replace("\\", "/").rstrip("/").rsplit("/", 1)[-1]
+
+
+def site_refcounts(store=None) -> Counter:
+    """Number of user states pointing at each site folder name."""
+    store = store or get_state_store()
+    counts = Counter()
+    for _, state in store.iter_states():
+        repo_path = (state.get("site") or {}).get("repo_path")
+        if repo_path:
+            counts[site_name(repo_path)] += 1
+    return counts
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def collect_garbage(sites_dir: str = GENERATED_SITES_DIR, store=None,
+                    min_age: float = SITE_GC_MIN_AGE, dry_run: bool = False) -> dict:
+    """Remove site folders that no user state references."""
+    if not os.path.isdir(sites_dir):
+        return {"removed": [], "kept": 0, "freed_bytes": 0}
+
+    refs = site_refcounts(store)
+    now = time.time()
+    removed, kept, freed = [], 0, 0
+    for name in sorted(os.listdir(sites_dir)):
+        path = os.path.join(sites_dir, name)
+        if not os.path.isdir(path):
+            continue
+        if refs.get(name) or now - os.path.getmtime(path) < min_age:
+            kept += 1
+            continue
+        freed += _dir_size(path)
+        removed.append(name)
+        if not dry_run:
+            shutil.rmtree(path, ignore_errors=True)
+
+    logger.info(f"Site GC {'(dry run) ' if dry_run else ''}removed {len(removed)} folders, kept {kept}")
+    return {"removed": removed, "kept": kept, "freed_bytes": freed}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Generated site storage maintenance.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    gc = subparsers.add_parser("gc", help="Delete site folders no user state references.")
+    gc.add_argument("--dir", default=GENERATED_SITES_DIR, help="Generated sites directory.")
+    gc.add_argument("--min-age", type=float, default=SITE_GC_MIN_AGE, help="Keep folders newer than this (seconds).")
+    gc.add_argument("--dry-run", action="store_true", help="Only report what would be removed.")
+
+    subparsers.add_parser("refs", help="Show how many users reference each site.")
+
+    args = parser.parse_args()
+
+    if args.command == "gc":
+        print(json.dumps(collect_garbage(args.dir, min_age=args.min_age, dry_run=args.dry_run), indent=2))
+    elif args.command == "refs":
+        print(json.dumps(site_refcounts(), indent=2))
@@ -0,0 +1,113 @@
+import re
+import json
+import hashlib
+from typing import Dict, Iterable, List, Optional
+
+# Characters ignored when comparing skill names: "Node.js", "NodeJS" and
+# "node js" are one skill. "+" and "#" are kept so C, C++ and C# stay apart.
+_FOLD_RE = re.compile(r"[\s.\-_/]+")
+
+# Variant spelling -> canonical name. Canonical names should be
+# skills_master.json spellings; these win over the database, so "HTML5"
+# becomes "HTML" even though both are listed there. Spellings that differ
+# only in case, spaces, dots, hyphens or slashes ("Jira", "CI CD",
+# "React.js") already share a fold_skill key and don't belong here.
+SKILL_ALIASES = {
+    "RESTful API": "REST",
+    "RESTful APIs": "REST",
+    "RESTful": "REST",
+    "REST API": "REST",
+    "REST APIs": "REST",
+    "HTML5": "HTML",
+    "CSS3": "CSS",
+    "JS": "JavaScript",
+    "ES6": "JavaScript",
+    "TS": "TypeScript",
+    "Golang": "Go",
+    "Node": "Node.js",
+    "ReactJS": "React",
+    "Vue": "Vue.js",
+    "Express": "Express.js",
+    "Angular.js": "Angular",
+    "Tailwind": "Tailwind CSS",
+    "Postgres": "PostgreSQL",
+    "Mongo": "MongoDB",
+    "MS SQL": "SQL Server",
+    "K8s": "Kubernetes",
+    "Amazon Web Services": "AWS",
+    "Google Cloud Platform": "Google Cloud",
+    "GCP": "Google Cloud",
+    "Microsoft Azure": "Azure",
+    "ML": "Machine Learning",
+    "DL": "Deep Learning",
+    "Natural Language Processing": "NLP",
+    "sklearn": "Scikit-learn",
+    "TF": "TensorFlow",
+    "LLMs": "LLM",
+    "Large Language Models": "LLM",
+    "Microservice": "Microservices",
+    "WebSocket": "WebSockets",
+    "JSON Web Token": "JWT",
+    "JSON Web Tokens": "JWT",
+    "OAuth2": "OAuth",
+    "OAuth 2.0": "OAuth",
+}
+
+
+def alias_table_version() -> str:
+    """Short hash of SKILL_ALIASES, for cache keys of output that went through it."""
+    raw = json.dumps(SKILL_ALIASES, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:8]
+
+
+def fold_skill(name: str) -> str:
+    """Case- and punctuation-insensitive key for a skill name."""
+    return _FOLD_RE.sub("", name.strip().lower())
+
+
+class SkillCanonicalizer:
+    """
+    Precomputed skill name index.
+
+    Maps the folded form of every database spelling and alias to one
+    canonical name, so normalizing a skill is a single dict lookup instead
+    of an LLM round-trip. Database order is preserved: the first spelling
+    of a folded key (skills_master.json before the extended term list) is
+    canonical, unless SKILL_ALIASES says otherwise.
+    """
+
+    def __init__(self, skills: Iterable[str], aliases: Dict[str, str] = SKILL_ALIASES):
+        self.index: Dict[str, str] = {}
+        for skill in skills:
+            skill = skill.strip()
+            if skill:
+                self.index.setdefault(fold_skill(skill), skill)
+
+        for alias, canonical in aliases.items():
+            # Resolve through the index so aliases follow database spellings
+            self.index[fold_skill(alias)] = self.index.get(fold_skill(canonical), canonical)
+
+    def __len__(self):
+        return len(self.index)
+
+    def lookup(self, name: str) -> Optional[str]:
+        """Canonical name for a known skill, or None."""
+        return self.index.get(fold_skill(name))
+
+    def canonical(self, name: str) -> str:
+        """Canonical name for a known skill; unknown ones are returned stripped."""
+        return self.index.get(fold_skill(name)) or name.strip()
+
+    def normalize(self, names: Iterable[str]) -> List[str]:
+        """Canonicalize a skill list, dropping blanks and duplicates, first occurrence order."""
+        result = []
+        seen = set()
+        for name in names:
+            if not isinstance(name, str) or not name.strip():
+                continue
+            skill = self.canonical(name)
+            key = fold_skill(skill)
+            if key not in seen:
+                seen.add(key)
+                result.append(skill)
+        return result
@@ -0,0 +1,142 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+
+def _is_word_char(c: str) -> bool:
+    # Mirrors the `\w` class used by the regex `\b` the matcher replaces
+    return c.isalnum() or c == "_"
+
+
+def _at_boundary(text: str, pos: int) -> bool:
+    """Same rule as regex `\\b`: word-ness differs on either side of `pos`."""
+    left = pos > 0 and _is_word_char(text[pos - 1])
+    right = pos < len(text) and _is_word_char(text[pos])
+    return left != right
+
+
+class SkillMatcher:
+    """
+    Precompiled skill matcher.
+
+    Builds an Aho-Corasick automaton over the lowercased skill names so every
+    skill (including overlapping ones like "CSS" inside "Tailwind CSS") is
+    found in a single pass over the text, with the same word-boundary rules
+    as `re.search(rf"\\b{skill}\\b")`. A lowercase hash index serves exact
+    lookups for items listed in a skills section.
+    """
+
+    def __init__(self, skills: Iterable[str], exact_case: Iterable[str] = (),
+                 lookup_only: Iterable[str] = ()):
+        # lowercase pattern -> every spelling in database order; the first
+        # spelling is the canonical one returned by lookup()/find()
+        self.spellings: Dict[str, List[str]] = {}
+        for skill in skills:
+            skill = skill.strip()
+            if skill:
+                self.spellings.setdefault(skill.lower(), []).append(skill)
+
+        # Terms only recognised by lookup(), never searched for in free text
+        self.lookup_spellings: Dict[str, str] = {}
+        for skill in lookup_only:
+            skill = skill.strip()
+            if skill:
+                self.lookup_spellings.setdefault(skill.lower(), skill)
+
+        self.patterns = list(self.spellings)
+        # Patterns whose every spelling is in exact_case only match in that
+        # case ("LESS" the language, not "less" the word)
+        exact_case = set(exact_case)
+        self._exact = [all(s in exact_case for s in self.spellings[p]) for p in self.patterns]
+        self._build_automaton()
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def _build_automaton(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for pid, pattern in enumerate(self.patterns):
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append(pid)
+
+        # Breadth-first pass to set failure links and merge outputs
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def lookup(self, item: str) -> Optional[str]:
+        """Return the canonical spelling of `item` if it is a known skill."""
+        key = item.strip().lower()
+        spellings = self.spellings.get(key)
+        return spellings[0] if spellings else self.lookup_spellings.get(key)
+
+    def pattern_counts(self, text: str) -> Counter:
+        """
+        Count non-overlapping, word-bounded occurrences of every pattern in
+        one scan of `text` (matched case-insensitively, except exact-case
+        patterns).
+        """
+        original = text
+        text = text.lower()
+        # Lowercasing a few non-ASCII characters changes the length; exact-case
+        # checks need offsets that line up with the original
+        check_case = len(text) == len(original)
+        exact = self._exact
+        counts = Counter()
+        last_end = {}
+        goto, fail, out = self._goto, self._fail, self._out
+        patterns = self.patterns
+        node = 0
+
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+
+            end = i + 1
+            for pid in out[node]:
+                start = end - len(patterns[pid])
+                if start < last_end.get(pid, 0):
+                    continue
+                if exact[pid] and check_case and original[start:end] not in self.spellings[patterns[pid]]:
+                    continue
+                if _at_boundary(text, start) and _at_boundary(text, end):
+                    counts[pid] += 1
+                    last_end[pid] = end
+
+        return counts
+
+    def find(self, text: str) -> List[str]:
+        """Canonical spellings of all skills present in `text`."""
+        return [self.spellings[self.patterns[pid]][0] for pid in self.pattern_counts(text)]
+
+    def frequencies(self, text: str) -> Dict[str, int]:
+        """Occurrence counts for every database spelling present in `text`."""
+        result = {}
+        for pid, count in self.pattern_counts(text).items():
+            for spelling in self.spellings[self.patterns[pid]]:
+                result[spelling] = count
+        return result
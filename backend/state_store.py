@@ -0,0 +1,277 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+from abc import ABC, abstractmethod
+
+logger = logging.getLogger(__name__)
+
+# "sqlite" (default) or "json" for the original one-file-per-user layout
+STATE_STORE_BACKEND = os.environ.get("STATE_STORE_BACKEND", "sqlite").lower()
+STATE_DB_PATH = os.environ.get("STATE_DB_PATH", "user_states.sqlite3")
+USER_STATE_DIR = "user_states"
+
+
+class StateStore(ABC):
+    """
+    Persistence for per-user CV/portfolio state.
+
+    A state is a JSON-serialisable dict; `update` merges top-level fields so
+    callers that only change one part of the state (e.g. `site`) don't have
+    to read and rewrite the rest.
+    """
+
+    @abstractmethod
+    def get(self, user_id: str):
+        """Return the stored state, or None if the user is unknown."""
+
+    @abstractmethod
+    def put(self, user_id: str, state: dict):
+        """Replace the whole state."""
+
+    @abstractmethod
+    def update(self, user_id: str, fields: dict) -> dict:
+        """Set the given top-level fields, creating the state if needed; returns the merged state."""
+
+    @abstractmethod
+    def delete(self, user_id: str):
+        """Remove the user's state if it exists."""
+
+    @abstractmethod
+    def iter_states(self):
+        """Yield (user_id, state) for every stored user."""
+
+
+class JsonFileStateStore(StateStore):
+    """One `{user_id}.json` file per user, written atomically."""
+
+    def __init__(self, directory: str = USER_STATE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _path(self, user_id: str) -> str:
+        return os.path.join(self.directory, f"{user_id}.json")
+
+    def _lock_for(self, user_id: str):
+        with self._locks_guard:
+            return self._locks.setdefault(user_id, threading.Lock())
+
+    def _write(self, user_id: str, state: dict):
+        path = self._path(user_id)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    def get(self, user_id: str):
+        path = self._path(user_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def put(self, user_id: str, state: dict):
+        with self._lock_for(user_id):
+            self._write(user_id, state)
+
+    def update(self, user_id: str, fields: dict) -> dict:
+        with self._lock_for(user_id):
+            state = self.get(user_id) or {}
+            state.update(fields)
+            self._write(user_id, state)
+            return state
+
+    def delete(self, user_id: str):
+        with self._lock_for(user_id):
+            if os.path.exists(self._path(user_id)):
+                os.remove(self._path(user_id))
+
+    def iter_states(self):
+        for filename in sorted(os.listdir(self.directory)):
+            if filename.endswith(".json"):
+                user_id = filename[:-len(".json")]
+                state = self.get(user_id)
+                if state is not None:
+                    yield user_id, state
+
+
+class SqliteStateStore(StateStore):
+    """
+    SQLite-backed store in WAL mode.
+
+    Each top-level field is its own row, so partial updates only rewrite
+    the fields that changed, and readers never block on a writer. Users
+    missing from the database are imported on first read from `legacy_dir`
+    (the old JSON files), so switching backends needs no downtime.
+    """
+
+    def __init__(self, path: str = STATE_DB_PATH, legacy_dir: str = USER_STATE_DIR):
+        self.path = path
+        self.legacy_dir = legacy_dir
+        self._local = threading.local()
+        self._init_schema()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._conn()
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                user_id TEXT PRIMARY KEY,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_users_updated_at ON users (updated_at);
+            CREATE TABLE IF NOT EXISTS user_state_fields (
+                user_id TEXT NOT NULL,
+                field TEXT NOT NULL,
+                value TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (user_id, field)
+            );
+            """
+        )
+
+    def _write_fields(self, conn, user_id: str, fields: dict, replace: bool):
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO users (user_id, created_at, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET updated_at = excluded.updated_at",
+                (user_id, now, now)
+            )
+            if replace:
+                conn.execute("DELETE FROM user_state_fields WHERE user_id = ?", (user_id,))
+            conn.executemany(
+                "INSERT INTO user_state_fields (user_id, field, value, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(user_id, field) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                [(user_id, field, json.dumps(value), now) for field, value in fields.items()]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _read(self, conn, user_id: str):
+        rows = conn.execute(
+            "SELECT field, value FROM user_state_fields WHERE user_id = ?", (user_id,)
+        ).fetchall()
+        if not rows:
+            exists = conn.execute("SELECT 1 FROM users WHERE user_id = ?", (user_id,)).fetchone()
+            return {} if exists else None
+        return {field: json.loads(value) for field, value in rows}
+
+    def _import_legacy(self, user_id: str):
+        if not self.legacy_dir:
+            return None
+        path = os.path.join(self.legacy_dir, f"{user_id}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            state = json.load(f)
+        self._write_fields(self._conn(), user_id, state, replace=True)
+        logger.info(f"Imported legacy state file for user {user_id}")
+        return state
+
+    def get(self, user_id: str):
+        state = self._read(self._conn(), user_id)
+        if state is None:
+            state = self._import_legacy(user_id)
+        return state
+
+    def put(self, user_id: str, state: dict):
+        self._write_fields(self._conn(), user_id, state, replace=True)
+
+    def update(self, user_id: str, fields: dict) -> dict:
+        # Pull in a legacy JSON state first so its other fields survive the merge
+        self.get(user_id)
+        self._write_fields(self._conn(), user_id, fields, replace=False)
+        return self.get(user_id)
+
+    def delete(self, user_id: str):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM user_state_fields WHERE user_id = ?", (user_id,))
+        conn.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
+        conn.execute("COMMIT")
+
+    def iter_states(self):
+        conn = self._conn()
+        user_ids = [row[0] for row in conn.execute("SELECT user_id FROM users ORDER BY updated_at")]
+        for user_id in user_ids:
+            state = self._read(conn, user_id)
+            if state is not None:
+                yield user_id, state
+
+        # Legacy JSON users not imported yet are still stored users
+        if self.legacy_dir and os.path.isdir(self.legacy_dir):
+            known = set(user_ids)
+            for user_id, state in JsonFileStateStore(self.legacy_dir).iter_states():
+                if user_id not in known:
+                    yield user_id, state
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_state_store() -> StateStore:
+    """Process-wide store selected by STATE_STORE_BACKEND."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            if STATE_STORE_BACKEND == "json":
+                _store = JsonFileStateStore(USER_STATE_DIR)
+            elif STATE_STORE_BACKEND == "sqlite":
+                _store = SqliteStateStore(STATE_DB_PATH, USER_STATE_DIR)
+            else:
+                raise ValueError(f"Unsupported state store backend: {STATE_STORE_BACKEND}")
+        return _store
+
+
+def migrate_json_states(source_dir: str, target: StateStore, overwrite: bool = False) -> dict:
+    """Copy every `{user_id}.json` in source_dir into target."""
+    migrated, skipped, failed = 0, 0, 0
+    for user_id, state in JsonFileStateStore(source_dir).iter_states():
+        try:
+            if not overwrite and isinstance(target, SqliteStateStore) \
+                    and target._read(target._conn(), user_id) is not None:
+                skipped += 1
+                continue
+            target.put(user_id, state)
+            migrated += 1
+        except Exception as e:
+            logger.error(f"Failed to migrate state for user {user_id}: {e}")
+            failed += 1
+    return {"migrated": migrated, "skipped": skipped, "failed": failed}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="User state store maintenance.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate = subparsers.add_parser("migrate", help="Import user_states/*.json into SQLite.")
+    migrate.add_argument("--source", default=USER_STATE_DIR, help="Directory of JSON state files.")
+    migrate.add_argument("--db", default=STATE_DB_PATH, help="Target SQLite database.")
+    migrate.add_argument("--overwrite", action="store_true", help="Replace users already in the database.")
+
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        result = migrate_json_states(args.source, SqliteStateStore(args.db, legacy_dir=None), args.overwrite)
+        print(json.dumps(result, indent=2))
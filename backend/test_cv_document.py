@@ -0,0 +1,30 @@
+import utils
+from cv_document import CVDocument
+
+# Usage: python -m pytest test_cv_document.py
+
+CV = """Jane Doe
+EXPERIENCE
+Backend Engineer
+Acme
+• Built APIs
+PROJECTS
+Portfolio Builder
+• Generates sites from CVs
+Technologies: React, Node
+TECH STACK
+Pulumi, Deno, HTMX
+EDUCATION
+B.Sc. Computer Science
+"""
+
+
+def test_tech_stack_header_starts_a_skills_section():
+    doc = CVDocument(CV)
+    assert doc.section_text("SKILLS") == ["Pulumi, Deno, HTMX"]
+    # A "Technologies: ..." label line stays inside its project
+    assert "Technologies: React, Node" in doc.section_text("PROJECTS")
+
+
+def test_skills_listed_under_tech_stack_header_are_extracted():
+    assert {"Pulumi", "Deno", "HTMX"} <= set(utils.extract_skills(CV))
@@ -1,37 +1,83 @@
-import requests
-import os
-import base64
-import json
-from dotenv import load_dotenv
-
-load_dotenv()
-
-token = os.environ.get('VERCEL_TOKEN')
-repo_path = 'generated_sites/b029f0dd-21c4-4c89-acfc-54b8419e8a2f'
-files_payload = []
-
-f_path = os.path.join(repo_path, 'index.html')
-with open(f_path, 'rb') as f:
-    content = f.read()
-    files_payload.append({
-        'file': 'index.html',
-        'data': base64.b64encode(content).decode('utf-8'),
-        'encoding': 'base64'
-    })
-
-payload = {
-    'name': 'test-deploy',
-    'files': files_payload,
-    'projectSettings': {
-        'framework': None
-    }
-}
-
-headers = {
-    'Authorization': f'Bearer {token}',
-    'Content-Type': 'application/json'
-}
-
-resp = requests.post('https://api.vercel.com/v13/deployments', headers=headers, json=payload)
-print(f"Status: {resp.status_code}")
-print(f"Response: {json.dumps(resp.json(), indent=2)}")
+import asyncio
+
+import pytest
+
+from deploy_queue import DeployQueue
+from vercel_deploy import DeployError, VercelClient
+from vercel_stub import start_stub_server
+
+# Usage: python -m pytest test_deploy.py
+# Deploys a small site to a local fake of the Vercel API; see vercel_stub.py
+# for running the backend against the stub by hand.
+
+
+@pytest.fixture
+def stub():
+    server, base_url = start_stub_server()
+    yield base_url
+    server.shutdown()
+
+
+@pytest.fixture
+def site(tmp_path):
+    (tmp_path / "index.html").write_text("<h1>Ada</h1>")
+    (tmp_path / "style.css").write_text("h1 { color: teal; }")
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "app.js").write_text("console.log('hi');")
+    return str(tmp_path)
+
+
+def test_redeploy_uploads_nothing(stub, site):
+    client = VercelClient("stub-token", base_url=stub)
+
+    first = client.deploy(site, "test-deploy")
+    assert first["files"] == 3
+    assert first["uploaded"] == 3
+
+    second = client.deploy(site, "test-deploy")
+    assert second["uploaded"] == 0
+    assert second["deployment_id"] != first["deployment_id"]
+
+    stats = client.session.get(f"{stub}/_stub/stats").json()
+    assert stats["uploads"] == 3
+    assert stats["deployments"] == 2
+
+
+def test_changed_file_is_the_only_upload(stub, site, tmp_path):
+    client = VercelClient("stub-token", base_url=stub)
+    client.deploy(site, "test-deploy")
+
+    (tmp_path / "index.html").write_text("<h1>Ada Lovelace</h1>")
+    assert client.deploy(site, "test-deploy")["uploaded"] == 1
+
+
+def test_server_error_is_retryable(site):
+    server, base_url = start_stub_server(fail_deployments=1)
+    try:
+        with pytest.raises(DeployError) as excinfo:
+            VercelClient("stub-token", base_url=base_url).deploy(site, "test-deploy")
+    finally:
+        server.shutdown()
+    assert excinfo.value.status == 500
+    assert excinfo.value.retryable
+
+
+def test_rejected_deploy_is_not_retried(site):
+    attempts = []
+
+    def deploy_fn(repo_path):
+        attempts.append(repo_path)
+        return {"status": "error", "message": "Forbidden", "retryable": False}
+
+    async def scenario():
+        queue = DeployQueue(deploy_fn)
+        try:
+            deployment = await queue.enqueue("ada", site)
+            await deployment.wait(5)
+            return deployment
+        finally:
+            await queue.stop()
+
+    deployment = asyncio.run(scenario())
+    assert deployment.status == "failed"
+    assert attempts == [site]
@@ -0,0 +1,42 @@
+import asyncio
+
+import llm_enhancer
+from llm_cache import llm_cache
+
+# Usage: python -m pytest test_llm_enhancer.py
+
+
+class LoopBoundLLM:
+    """Fake chat model that, like an httpx-backed client, only works on the first loop it ran on."""
+
+    def __init__(self):
+        self.loop = None
+
+    async def ainvoke(self, messages):
+        loop = asyncio.get_running_loop()
+        if self.loop is None:
+            self.loop = loop
+        elif self.loop is not loop:
+            raise RuntimeError("Event loop is closed")
+        return type("Response", (), {"content": "ENHANCED", "usage_metadata": None})()
+
+
+CV = {
+    "name": "Ada",
+    "summary": "Engineer who builds and measures things.",
+    "skills": ["Python"],
+    "experience": [{"role": "Engineer", "company": "X", "description": ["Built things"]}],
+    "projects": [{"title": "P", "tech_stack": [], "description": ["Did a project"]}],
+}
+
+
+def test_concurrent_enhancement_runs_twice(monkeypatch):
+    monkeypatch.setattr(llm_enhancer, "build_llm", LoopBoundLLM)
+    monkeypatch.setattr(llm_cache, "enabled", False)
+
+    for _ in range(2):
+        enhanced = llm_enhancer.enhance_portfolio_content_concurrent(CV)
+        assert enhanced["summary"] == "ENHANCED"
+        assert enhanced["experience"][0]["description"] == ["ENHANCED"]
+        assert enhanced["projects"][0]["short_description"] == "ENHANCED"
+        assert enhanced["tagline"] == "ENHANCED"
@@ -0,0 +1,79 @@
+import json
+
+import refinement
+from llm_cache import LLMCache, llm_cache
+
+# Usage: python -m pytest test_refinement.py
+
+
+class FakeLLM:
+    model = "fake"
+    temperature = 0
+
+    def __init__(self, *replies):
+        # One reply per call; dicts are sent as JSON, strings as they are
+        self.replies = list(replies)
+        self.prompts = []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        reply = self.replies[min(len(self.prompts), len(self.replies)) - 1]
+        content = reply if isinstance(reply, str) else json.dumps(reply)
+        return type("Response", (), {"content": content, "usage_metadata": None})()
+
+
+EXPERIENCE = {
+    "role": "Backend Engineer Acme Jan 2020 - Mar 2022", "company": "", "start_date": "", "end_date": "",
+    "description": ["Built APIs", "Tech Stack: Python, JavaScript"], "tech_stack": [],
+}
+FIXED = {
+    "role": "Backend Engineer", "company": "Acme", "start_date": "Jan 2020", "end_date": "Mar 2022",
+    "description": ["Built APIs"], "tech_stack": ["Python", "JavaScript"],
+}
+
+
+def refine(reply_data, monkeypatch):
+    monkeypatch.setattr(llm_cache, "enabled", False)
+    cv = {"experience": [dict(EXPERIENCE)], "projects": []}
+    llm = FakeLLM({"fragments": [{"id": 0, "data": reply_data}]})
+    return refinement.refine_low_confidence(cv, llm), llm
+
+
+def test_well_formatted_cv_makes_no_call(monkeypatch):
+    cv = {"experience": [dict(FIXED)], "projects": []}
+    llm = FakeLLM({})
+    assert refinement.refine_low_confidence(cv, llm) is cv
+    assert llm.prompts == []
+
+
+def test_reply_that_only_moves_text_is_merged(monkeypatch):
+    refined, llm = refine(FIXED, monkeypatch)
+    assert len(llm.prompts) == 1
+    assert refined["experience"][0] == FIXED
+
+
+def test_reply_that_adds_a_technology_is_dropped(monkeypatch):
+    # "Java" is part of "JavaScript" but is not in the fragment
+    refined, _ = refine(dict(FIXED, tech_stack=["Python", "JavaScript", "Java"]), monkeypatch)
+    assert refined["experience"][0] == EXPERIENCE
+
+
+def test_reply_that_adds_an_employer_next_to_a_known_word_is_dropped(monkeypatch):
+    refined, _ = refine(dict(FIXED, company="Acme API"), monkeypatch)
+    assert refined["experience"][0] == EXPERIENCE
+
+
+def test_malformed_reply_is_not_cached(monkeypatch, tmp_path):
+    monkeypatch.setattr(refinement, "llm_cache", LLMCache(path=str(tmp_path / "llm_cache.sqlite3")))
+    llm = FakeLLM("Sure! Here is the JSON: {\"fragments\": [", {"fragments": [{"id": 0, "data": FIXED}]})
+
+    first = refinement.refine_low_confidence({"experience": [dict(EXPERIENCE)], "projects": []}, llm)
+    assert first["experience"][0] == EXPERIENCE
+
+    second = refinement.refine_low_confidence({"experience": [dict(EXPERIENCE)], "projects": []}, llm)
+    assert len(llm.prompts) == 2
+    assert second["experience"][0] == FIXED
+
+    # The valid reply was cached, so a third run makes no call
+    refinement.refine_low_confidence({"experience": [dict(EXPERIENCE)], "projects": []}, llm)
+    assert len(llm.prompts) == 2
@@ -0,0 +1,25 @@
+import utils
+
+# Usage: python -m pytest test_skill_matcher.py
+
+
+def test_prose_does_not_produce_skills():
+    text = (
+        "Education\n"
+        "B.Tech. in Computer Science and Engineering\n"
+        "Summary\n"
+        "I spent less time on data mining than on computer programming, "
+        "which made me go further.\n"
+    )
+    assert utils.extract_skills(text) == []
+
+
+def test_skills_section_still_matches_extended_terms():
+    text = "Skills\nPython, data mining, LESS, R, Haskell\n"
+    skills = utils.extract_skills(text)
+    assert {"Python", "data mining", "LESS", "R", "Haskell"} <= set(skills)
+
+
+def test_exact_case_terms_match_in_free_text():
+    text = "Experience\nBuilt stylesheets in LESS and services in Go and Haskell.\n"
+    assert {"LESS", "Go", "Haskell"} <= set(utils.extract_skills(text))
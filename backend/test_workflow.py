@@ -0,0 +1,66 @@
+import asyncio
+
+import workflow
+from workflow import WorkflowRunner, build_workflow
+
+# Usage: python -m pytest test_workflow.py
+
+
+class FakePool:
+    """Stands in for PipelinePool and records which pipeline functions ran."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def execute(self, fn, *args):
+        self.calls.append(fn.__name__)
+        if fn is workflow.parse_cv_file:
+            return {"name": "Ada", "skills": ["Python"]}
+        return {"hero": {"name": "Ada"}}
+
+
+class FakeStateTool:
+    def __init__(self):
+        self.saved = []
+
+    def invoke(self, payload):
+        self.saved.append(payload)
+        return {"status": "success", "user_id": payload["user_id"]}
+
+
+def run(runner, *calls):
+    async def scenario():
+        try:
+            return [await runner.run(user_id, **inputs) for user_id, inputs in calls]
+        finally:
+            await runner.stop()
+    return asyncio.run(scenario())
+
+
+def test_same_user_resumes_without_parsing(tmp_path, monkeypatch):
+    state_tool = FakeStateTool()
+    monkeypatch.setattr(workflow, "update_user_state_tool", state_tool)
+    pool = FakePool()
+    runner = WorkflowRunner(build_workflow(pool, None), str(tmp_path / "checkpoints.sqlite3"))
+
+    first, second = run(
+        runner,
+        ("ada", {"file_path": "uploads/ada.pdf", "file_digest": "abc123"}),
+        ("ada", {}),
+    )
+
+    assert pool.calls == ["parse_cv_file", "map_stage"]
+    assert second["portfolio_data"] == first["portfolio_data"]
+    assert set(second["node_timings"]) == {"parse_cv", "map_portfolio", "confirm_cv"}
+
+
+def test_stored_state_keeps_digest_not_upload_path(tmp_path, monkeypatch):
+    state_tool = FakeStateTool()
+    monkeypatch.setattr(workflow, "update_user_state_tool", state_tool)
+    runner = WorkflowRunner(build_workflow(FakePool(), None), str(tmp_path / "checkpoints.sqlite3"))
+
+    run(runner, ("ada", {"file_path": "uploads/ada.pdf", "file_digest": "abc123"}))
+
+    fields = state_tool.saved[0]["fields"]
+    assert "file_path" not in fields
+    assert fields["file_digest"] == "abc123"
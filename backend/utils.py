@@ -3,9 +3,9 @@ from io import BytesIO
 import re
 import pdfplumber
 import requests
-import spacy
 import json
-from collections import Counter
+import time
+import logging
 
 try:
     import docx
@@ -13,35 +13,141 @@ except ImportError:
     docx = None
 
 try:
-    from schema_validator import validate_schema, refine_with_validation
+    from schema_validator import validate_schema, validate_cv_dict, refine_with_validation
 except ImportError:
     try:
-        from .schema_validator import validate_schema, refine_with_validation
+        from .schema_validator import validate_schema, validate_cv_dict, refine_with_validation
     except ImportError:
         validate_schema = None
+        validate_cv_dict = None
         refine_with_validation = None
 
 try:
-    from langchain_ollama import ChatOllama
+    from skill_matcher import SkillMatcher
+    from skill_aliases import SkillCanonicalizer
+    from pdf_extract import extract_pdf_text, ExtractionBudgetError
+    from resources import lazy_resource
+    from metrics import metrics
+    from cv_document import CVDocument, as_document, as_doc_lines, section_type
+    from cv_document import is_section_header, normalize_text  # noqa: F401 (re-exported; they lived here)
+    from refinement import refine_low_confidence
 except ImportError:
-    from langchain_community.chat_models import ChatOllama
+    from .skill_matcher import SkillMatcher
+    from .skill_aliases import SkillCanonicalizer
+    from .pdf_extract import extract_pdf_text, ExtractionBudgetError
+    from .resources import lazy_resource
+    from .metrics import metrics
+    from .cv_document import CVDocument, as_document, as_doc_lines, section_type
+    from .cv_document import is_section_header, normalize_text  # noqa: F401 (re-exported; they lived here)
+    from .refinement import refine_low_confidence
 
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Initialize LLM for refinement (using Ollama)
-llm = ChatOllama(model="llama3:8b", temperature=0)
+logger = logging.getLogger(__name__)
+
+SPACY_MODEL = os.environ.get("SPACY_MODEL", "en_core_web_sm")
+# Only NER is used (extract_name); skipping the other pipes speeds up both
+# loading and every nlp() call.
+SPACY_EXCLUDED_PIPES = ["tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+
+
+@lazy_resource("refinement_llm")
+def get_llm():
+    """LLM for refinement (using Ollama)."""
+    try:
+        from langchain_ollama import ChatOllama
+    except ImportError:
+        from langchain_community.chat_models import ChatOllama
+    return ChatOllama(model="llama3:8b", temperature=0)
+
+
+@lazy_resource("spacy_nlp")
+def get_nlp():
+    """spaCy pipeline with only the components extract_name needs."""
+    import spacy
+    return spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDED_PIPES)
 
-nlp = spacy.load("en_core_web_sm")
 
 def load_json(path):
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
-TECH_SKILL_DATABASE = load_json(r"C:\Users\Sanish Bhagat\project\Portfolio-Agent\backend\data\skills\skills_master.json")
+def load_skill_terms(path):
+    """Load a newline-separated skill list, skipping blank lines."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SKILLS_MASTER_PATH = os.environ.get(
+    "SKILLS_MASTER_PATH", os.path.join(BASE_DIR, "data", "skills", "skills_master.json")
+)
+SKILLS_DB_PATH = os.environ.get(
+    "SKILLS_DB_PATH", os.path.join(BASE_DIR, "..", "skills_db.txt")
+)
+
+
+@lazy_resource("tech_skill_database")
+def get_tech_skill_database():
+    return load_json(SKILLS_MASTER_PATH)
+
+
+@lazy_resource("skill_db_terms")
+def get_skill_db_terms():
+    return load_skill_terms(SKILLS_DB_PATH)
+
+
+def build_skill_matcher(database, extra_terms=()):
+    """
+    Compile every database skill into one matcher.
+    Category order is preserved so skills_master.json spellings win over
+    the extended term list.
+
+    The extended list reads like prose in places, so its all-lowercase
+    phrases ("computer science", "data mining") are only accepted as items
+    of a skills section, and its other terms ("LESS", "Haskell") plus very
+    short database skills ("R", "Go") must appear in the listed case.
+    """
+    skills = [skill for category in database.values() for skill in category]
+    extra_terms = [term.strip() for term in extra_terms if term.strip()]
+    scanned = [term for term in extra_terms if term != term.lower()]
+    listed_only = [term for term in extra_terms if term == term.lower()]
+    exact_case = scanned + [skill for skill in skills if len(skill) <= 2]
+    return SkillMatcher(skills + scanned, exact_case=exact_case, lookup_only=listed_only)
+
+
+@lazy_resource("skill_matcher")
+def get_skill_matcher():
+    return build_skill_matcher(get_tech_skill_database(), get_skill_db_terms())
+
+
+@lazy_resource("skill_canonicalizer")
+def get_skill_canonicalizer():
+    database = get_tech_skill_database()
+    return SkillCanonicalizer([skill for category in database.values() for skill in category] + get_skill_db_terms())
+
+
+# Former module-level globals, now built on first access
+_LAZY_GLOBALS = {
+    "llm": get_llm,
+    "nlp": get_nlp,
+    "TECH_SKILL_DATABASE": get_tech_skill_database,
+    "SKILL_DB_TERMS": get_skill_db_terms,
+    "SKILL_MATCHER": get_skill_matcher,
+    "SKILL_CANONICALIZER": get_skill_canonicalizer,
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_GLOBALS:
+        return _LAZY_GLOBALS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 REQUEST_HEADERS = {
@@ -57,25 +163,56 @@ def extract_text_from_pdf(url):
         return ""
     
     try:
-        text = ""
+        page_texts = []
         with pdfplumber.open(BytesIO(response.content)) as pdf:
             for page in pdf.pages:
                 page_text = page.extract_text()
                 if page_text:
-                    text += page_text + "\n"
-        return text.strip()
+                    page_texts.append(page_text)
+        return "\n".join(page_texts).strip()
     except Exception as e:
         print(f"Warning: failed to parse PDF from {url}: {e}")
         return ""
 
 
+# Sections parse_cv reads content from. With PDF_STOP_AT_SECTIONS, PDF
+# extraction stops early once each of them has been seen and closed by a
+# following header. Off by default: name, contact and the global skill scan
+# read the whole text, so a later page can still change the output.
+EXTRACT_REQUIRED_SECTIONS = {"EXPERIENCE", "PROJECTS", "EDUCATION", "SKILLS", "CERTIFICATIONS", "SUMMARY"}
+PDF_STOP_AT_SECTIONS = os.environ.get("PDF_STOP_AT_SECTIONS", "0") == "1"
+
+
+def sections_complete_tracker(required=EXTRACT_REQUIRED_SECTIONS):
+    """
+    Build a per-page callback for extract_pdf_text that returns True once
+    every required section has been followed by another section header.
+    """
+    closed = set()
+    current = [None]
+
+    def on_page(page_text):
+        for line in page_text.split("\n"):
+            stripped = line.strip()
+            if not stripped:
+                continue
+            kind = section_type(stripped)
+            if kind is None:
+                continue
+            if current[0] in required:
+                closed.add(current[0])
+            current[0] = kind
+        return closed >= required
+
+    return on_page
+
+
 def extract_text(file_path):
     text = ""
     try:
         if file_path.lower().endswith(".pdf"):
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    text += (page.extract_text() or "") + "\n"
+            stop_when = sections_complete_tracker() if PDF_STOP_AT_SECTIONS else None
+            text = extract_pdf_text(file_path, stop_when=stop_when)
         elif file_path.lower().endswith(".docx"):
             if docx:
                 doc = docx.Document(file_path)
@@ -84,6 +221,8 @@ def extract_text(file_path):
                 print("Warning: python-docx not installed")
         else:
             print(f"Warning: Unsupported file type: {file_path}")
+    except ExtractionBudgetError:
+        raise
     except Exception as e:
         print(f"Error extracting text from {file_path}: {e}")
     
@@ -97,8 +236,9 @@ def extract_name(text):
     1. Spacy NER (PERSON label)
     2. Capitalized words at the very top (fallback)
     """
+    cv = as_document(text)
     # Try first 300 characters for NER
-    doc = nlp(text[:300])
+    doc = get_nlp()(cv.text[:300])
     
     for ent in doc.ents:
         if ent.label_ == "PERSON":
@@ -109,7 +249,7 @@ def extract_name(text):
                 return candidate
 
     # Fallback heuristic: first few non-empty lines
-    lines = text.split("\n")[:8]
+    lines = cv.raw_lines[:8]
     for i, line in enumerate(lines):
         clean = line.strip()
         if not clean:
@@ -121,7 +261,7 @@ def extract_name(text):
              return clean
 
         # Skip common non-name headers
-        if any(keyword in clean.lower() for keyword in ["resume", "cv", "curriculum", "contact", "email", "phone", "profile"]):
+        if any(keyword in cv.raw_lower[i] for keyword in ["resume", "cv", "curriculum", "contact", "email", "phone", "profile"]):
             continue
             
         # Look for 2-3 capitalized words
@@ -135,21 +275,22 @@ def extract_name(text):
 
 
 def extract_contact_details(text):
-    email = re.findall(r"[\w\.-]+@[\w\.-]+\.\w+", text)
-    phone = re.findall(r"\+?\d[\d\-\s]{8,}\d", text)
+    doc = as_document(text)
+    email = re.findall(r"[\w\.-]+@[\w\.-]+\.\w+", doc.text)
+    phone = re.findall(r"\+?\d[\d\-\s]{8,}\d", doc.text)
 
-    links = re.findall(r"https?://[^\s]+", text)
+    links = re.findall(r"https?://[^\s]+", doc.text)
 
     # LinkedIn / GitHub detection
-    for line in text.split("\n"):
-        if "linkedin.com" in line.lower():
-            links.append(line.strip())
-        if "github.com" in line.lower():
-            links.append(line.strip())
+    for line in doc.lines:
+        if "linkedin.com" in line.lower:
+            links.append(line.text)
+        if "github.com" in line.lower:
+            links.append(line.text)
 
     # Basic location heuristic
     location = ""
-    for line in text.split("\n")[:15]:
+    for line in doc.raw_lines[:15]:
         if "," in line and any(c.isalpha() for c in line):
             location = line.strip()
             break
@@ -161,6 +302,10 @@ def extract_contact_details(text):
         "location": location
     }
 
+BULLET_MARKER_RE = re.compile(r'^[\s]*[•\-\*–]\s*')
+# Category label in front of a skills line: "Languages: Python, Java"
+SKILL_LABEL_RE = re.compile(r"^[^:,]{1,40}:\s*")
+
 COMMON_SKILLS = [
     "Python", "Java", "C++", "JavaScript", "React", "Node.js",
     "MongoDB", "MySQL", "PostgreSQL", "Docker", "AWS",
@@ -176,36 +321,20 @@ def extract_skills(text):
     1. Look for explicit skills section and parse items
     2. Global database search (fallback)
     """
+    doc = as_document(text)
     found_skills = set()
+    matcher = get_skill_matcher()
     
-    # Try to find a dedicated skills section
-    skills_keywords = [r"SKILLS", r"TECHNOLOGIES", r"TECH STACK", r"SKILLS USED"]
-    lines = text.split("\n")
-    
-    in_skills_section = False
-    skills_text = ""
-    
-    for line in lines:
-        stripped = line.strip()
-        if not stripped:
-            continue
-            
-        # Check if line looks like a header
-        if any(re.match(rf"^{kw}$", stripped.upper()) for kw in skills_keywords):
-            in_skills_section = True
-            continue
-            
-        # If in section, collect content until next section
-        if in_skills_section:
-            if is_section_header(stripped) != "OTHER":
-                in_skills_section = False
-                break
-            skills_text += stripped + ", "
+    # Items listed in the skills section(s), without "Languages:"-style labels
+    skills_text = "\n".join(
+        SKILL_LABEL_RE.sub("", BULLET_MARKER_RE.sub("", line.text)) for line in doc.section("SKILLS")
+    )
 
     # If we found a skills section, try to split by commas/bullets
     if skills_text:
-        # Split by comma, bullet, vertical bar, or newline (since we joined with ", " but raw might have newlines)
-        raw_items = re.split(r"[,•|\-\n]", skills_text)
+        # Split by comma, bullet, vertical bar, semicolon, newline or a spaced dash
+        # (a bare hyphen is part of names like "Gen-AI" or "MS-Excel")
+        raw_items = re.split(r"[,•|;\n]|\s[-–]\s", skills_text)
         for item in raw_items:
             item_clean = item.strip()
             if not item_clean:
@@ -215,14 +344,10 @@ def extract_skills(text):
             # Skills usually aren't long sentences
             if len(item_clean.split()) <= 4:
                 # Check for exact matches in database first
-                matched = False
-                for category in TECH_SKILL_DATABASE.values():
-                    for db_skill in category:
-                        if db_skill.lower() == item_clean.lower():
-                            found_skills.add(db_skill)
-                            matched = True
-                            break
-                    if matched: break
+                db_skill = matcher.lookup(item_clean)
+                matched = db_skill is not None
+                if matched:
+                    found_skills.add(db_skill)
                 
                 # If not matched but looks like a technical term (capitalized or short)
                 if not matched and (2 <= len(item_clean) <= 20):
@@ -231,19 +356,16 @@ def extract_skills(text):
                     if any(c.isupper() for c in item_clean) or len(item_clean.split()) == 1:
                         found_skills.add(item_clean)
 
-    # Global database search as fallback/supplement
-    text_lower = text.lower()
-    for category in TECH_SKILL_DATABASE.values():
-        for skill in category:
-            # Avoid re-adding if already found
-            if any(s.lower() == skill.lower() for s in found_skills):
-                continue
-                
-            pattern = rf"\b{re.escape(skill.lower())}\b"
-            if re.search(pattern, text_lower):
-                found_skills.add(skill)
+    # Global database search as fallback/supplement (single pass over the text)
+    found_lower = {s.lower() for s in found_skills}
+    for skill in matcher.find(doc.text):
+        # Avoid re-adding if already found
+        if skill.lower() not in found_lower:
+            found_skills.add(skill)
+            found_lower.add(skill.lower())
 
-    return sorted(list(found_skills))
+    # "HTML5"/"HTML", "RESTful API"/"REST" etc. collapse to one canonical name
+    return sorted(get_skill_canonicalizer().normalize(sorted(found_skills)))
 
 
 
@@ -256,8 +378,10 @@ def extract_education(text):
     - year (last year in the duration)
     - duration (human‑readable range like "2018 - 2022")
     """
-    text = normalize_text(text)
-    lines = text.split("\n")
+    doc = as_document(text)
+    # Only the education section when the CV has one, so degrees named in
+    # project or experience lines aren't picked up
+    lines = doc.section("EDUCATION") if doc.has_section("EDUCATION") else doc.lines
     education_entries = []
 
     degree_keywords = [
@@ -266,9 +390,8 @@ def extract_education(text):
     ]
 
     for i, line in enumerate(lines):
-        lower = line.lower()
-        if any(deg in lower for deg in degree_keywords):
-            degree_line = line.strip()
+        if any(deg in line.lower for deg in degree_keywords):
+            degree_line = line.text
 
             # Try to infer institution from surrounding lines
             institution = ""
@@ -285,18 +408,18 @@ def extract_education(text):
 
             # Prefer previous line as institution if it looks like one
             if i - 1 >= 0:
-                prev_line = lines[i - 1].strip()
+                prev_line = lines[i - 1].text
                 if looks_like_institution(prev_line):
                     institution = prev_line
 
             # Fallback to next line (existing behaviour) if needed
             if not institution and i + 1 < len(lines):
-                next_line = lines[i + 1].strip()
+                next_line = lines[i + 1].text
                 if looks_like_institution(next_line):
                     institution = next_line
 
             # Collect years from current + neighbour line for duration
-            neighbour = lines[i + 1] if i + 1 < len(lines) else ""
+            neighbour = lines[i + 1].text if i + 1 < len(lines) else ""
             year_matches = re.findall(r"(?:19|20)\d{2}", degree_line + " " + neighbour)
             unique_years = []
             for full in year_matches:
@@ -344,21 +467,29 @@ def extract_education(text):
 
 
 def extract_certifications(text):
-    lines = text.split("\n")
-    certs = []
+    doc = as_document(text)
+    if doc.has_section("CERTIFICATIONS"):
+        # Every entry of the certifications section
+        return [BULLET_MARKER_RE.sub("", line.text) for line in doc.section("CERTIFICATIONS")]
 
-    for line in lines:
-        if "certification" in line.lower() or "certified" in line.lower():
-            certs.append(line.strip())
+    certs = []
+    for line in doc.lines:
+        if line.kind is None and ("certification" in line.lower or "certified" in line.lower):
+            certs.append(line.text)
 
     return certs
 
 
 def extract_summary(text):
-    lines = text.split("\n")
-    for i, line in enumerate(lines):
-        if "summary" in line.lower() or "profile" in line.lower():
-            return lines[i+1] if i+1 < len(lines) else ""
+    doc = as_document(text)
+    if doc.has_section("SUMMARY"):
+        return " ".join(BULLET_MARKER_RE.sub("", line.text) for line in doc.section("SUMMARY"))
+
+    # Inline form: "Summary: Backend engineer with ..."
+    for line in doc.lines:
+        match = re.match(r"(?:professional\s+)?(?:summary|profile|objective)\s*[:\-–]\s*(.+)", line.text, re.IGNORECASE)
+        if match:
+            return match.group(1).strip()
     return ""
 
 
@@ -377,50 +508,6 @@ def fix_broken_words(text):
     return text
 
 
-def normalize_text(text):
-    text = re.sub(r"\r", "\n", text)
-    text = re.sub(r"\n+", "\n", text)
-    return text
-
-
-def is_section_header(line):
-    """
-    Detect if a line is a major section header (Education, Experience, Projects, etc.)
-    Returns the section type or None
-    """
-    clean = line.lower().strip().rstrip(':').rstrip('.')
-    words = clean.split()
-    
-    # Headers should be short
-    if len(words) > 5:
-        return None
-    
-    # Must look like a header
-    if not (line.isupper() or line.istitle() or line.endswith(':') or 
-            (len(words) <= 2 and all(w[0].isupper() for w in words if w))):
-        return None
-    
-    # Experience variations
-    if any(kw in clean for kw in ['experience', 'employment', 'work history', 'internship']):
-        return 'EXPERIENCE'
-    
-    # Projects variations  
-    if any(kw in clean for kw in ['project']):
-        return 'PROJECTS'
-    
-    # Other sections to stop at
-    other_sections = [
-        'education', 'skill', 'certification', 'award', 'honor',
-        'achievement', 'publication', 'activity', 'leadership',
-        'volunteer', 'interest', 'language', 'reference', 'summary',
-        'objective', 'profile', 'coursework'
-    ]
-    if any(kw in clean for kw in other_sections):
-        return 'OTHER'
-    
-    return None
-
-
 def is_work_role(line):
     """Detect if line contains actual work roles (not extracurricular)"""
     lower = line.lower()
@@ -452,38 +539,10 @@ def extract_sections_with_content(text):
     Extract sections while preserving complete multi-line entries.
     Returns dictionary with section names as keys and lists of lines as values.
     """
-    text = normalize_text(text)
-    lines = text.split("\n")
-    
-    sections = {
-        "EXPERIENCE": [],
-        "PROJECTS": [],
-    }
-    
-    current_section = None
-    
-    for line in lines:
-        stripped = line.strip()
-        if not stripped:
-            continue
-        
-        # Check if this is a section header
-        section_type = is_section_header(stripped)
-        
-        if section_type == 'EXPERIENCE':
-            current_section = 'EXPERIENCE'
-            continue
-        elif section_type == 'PROJECTS':
-            current_section = 'PROJECTS'
-            continue
-        elif section_type == 'OTHER':
-            current_section = None
-            continue
-        
-        # Add line to current section
-        if current_section:
-            sections[current_section].append(stripped)
-    
+    doc = as_document(text)
+    sections = {"EXPERIENCE": [], "PROJECTS": []}
+    for name, _, _ in doc.spans:
+        sections[name] = doc.section_text(name)
     return sections
 
 
@@ -491,8 +550,8 @@ def structure_experience(lines):
     experiences = []
     current_job = None
 
-    for line in lines:
-        line = line.strip()
+    for doc_line in as_doc_lines(lines):
+        line = doc_line.text
 
         # New role
         if is_work_role(line):
@@ -543,7 +602,7 @@ def structure_experience(lines):
         elif current_job:
 
             # Duration detection (fallback if separate line)
-            if not current_job["start_date"] and re.search(r"\b(20\d{2}|19\d{2})\b", line):
+            if not current_job["start_date"] and doc_line.has_year:
                 current_job["duration"] = line # Keep legacy field or parse?
                 # Let's try to parse start/end from this line too
                 if "–" in line:
@@ -556,7 +615,7 @@ def structure_experience(lines):
                      current_job["end_date"] = parts[-1].strip()
 
             # Bullet description
-            elif re.match(r'^[\s]*[•\-\*]', line):
+            elif doc_line.is_bullet:
                 clean_bullet = re.sub(r'^[\s]*[•\-\*]\s*', '', line)
                 current_job["description"].append(clean_bullet)
 
@@ -620,21 +679,14 @@ def structure_projects(lines):
 
         return False
 
-    for line in lines:
-        line = line.strip()
+    for doc_line in as_doc_lines(lines):
+        line = doc_line.text
         if not line:
             continue
 
         # Check if line is a bullet point or tech stack
-        is_bullet = re.match(r'^[\s]*[•\-\*]', line)
-        lower = line.lower()
-        is_tech_stack = (
-            "tech stack" in lower
-            or "technologies" in lower
-            or "technologies used" in lower
-            or "tools used" in lower
-            or lower.startswith("stack:")
-        )
+        is_bullet = doc_line.is_bullet
+        is_tech_stack = doc_line.is_tech_stack
 
         if not is_bullet and not is_tech_stack:
             if current_project is None or looks_like_title(line):
@@ -706,37 +758,78 @@ def remove_placeholder_tokens(data):
 
     return data
 
-def parse_cv(text):
+def canonicalize_tech_stacks(data):
+    """Canonicalize and dedupe experience and project tech_stack lists (see skill_aliases.py)."""
+    canonicalizer = get_skill_canonicalizer()
+    for entry in data.get("experience", []) + data.get("projects", []):
+        if isinstance(entry, dict) and isinstance(entry.get("tech_stack"), list):
+            entry["tech_stack"] = canonicalizer.normalize(entry["tech_stack"])
+    return data
+
+
+def validate_cv_data(data):
+    """
+    Check deterministic parser output against the CV schema. The dict is
+    checked in place (no JSON round-trip); problems are logged and the data
+    is returned either way, as there is nothing better to fall back to.
+    """
+    if validate_cv_dict:
+        errors = validate_cv_dict(data)
+        if errors:
+            logger.warning(f"Parsed CV does not match the schema: {'; '.join(map(str, errors[:5]))}")
+        return remove_placeholder_tokens(data)
+
+    return data
+
+
+def _timed_step(timings, name, fn, *args):
+    started = time.perf_counter()
+    with metrics.timer("parse_stage_duration_seconds", stage=name):
+        result = fn(*args)
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + (time.perf_counter() - started) * 1000
+    return result
+
+
+def parse_cv(text, validate=True, timings=None, refine=False, llm=None):
+    """
+    Deterministic CV parser. Every step is recorded in the
+    parse_stage_duration_seconds metric; if `timings` is a dict, the
+    milliseconds spent in each step are also added to it (see bench_parse.py).
+
+    With `refine`, fragments the parser is unsure of (see refinement.py) are
+    sent to `llm` (default get_llm()) and corrected; confident ones are not.
+    """
     if not text:
         return {}
 
-    text = fix_broken_words(text)
-    sections = extract_sections_with_content(text)
+    text = _timed_step(timings, "fix_broken_words", fix_broken_words, text)
+    # Split, lowercase, classify and segment once; every extractor reads from doc
+    doc = _timed_step(timings, "sectioning", CVDocument, text)
 
-    structured_experience_data = structure_experience(sections["EXPERIENCE"])
+    structured_experience_data = _timed_step(timings, "experience", structure_experience, doc.section("EXPERIENCE"))
 
     data = {
-        "name": extract_name(text),
-        "contact": extract_contact_details(text),
-        "summary": extract_summary(text),
-        "skills": extract_skills(text),
-        "education": extract_education(text),
+        "name": _timed_step(timings, "name", extract_name, doc),
+        "contact": _timed_step(timings, "contact", extract_contact_details, doc),
+        "summary": _timed_step(timings, "summary", extract_summary, doc),
+        "skills": _timed_step(timings, "skills", extract_skills, doc),
+        "education": _timed_step(timings, "education", extract_education, doc),
         "experience": structured_experience_data,
-        "projects": structure_projects(sections["PROJECTS"]),
-        "certifications": extract_certifications(text)
+        "projects": _timed_step(timings, "projects", structure_projects, doc.section("PROJECTS")),
+        "certifications": _timed_step(timings, "certifications", extract_certifications, doc)
     }
 
     # Always sanitize deterministic output
-    data = remove_placeholder_tokens(data)
+    data = _timed_step(timings, "sanitize", remove_placeholder_tokens, data)
 
-    if validate_schema:
-        try:
-            validated_data = validate_schema(json.dumps(data), data)
-            validated_data = remove_placeholder_tokens(validated_data)
-            return validated_data
-        except Exception as e:
-            print(f"Validation error: {e}")
-            return data
+    if refine:
+        data = _timed_step(timings, "refine", refine_low_confidence, data, llm or get_llm())
+
+    data = _timed_step(timings, "canonicalize_skills", canonicalize_tech_stacks, data)
+
+    if validate:
+        return _timed_step(timings, "validate_schema", validate_cv_data, data)
 
     return data
 
@@ -747,17 +840,7 @@ def parse_cv_from_url(url):
 
 
 def extract_skills_with_frequency(text):
-    text_lower = text.lower()
-    skill_counts = Counter()
-
-    for category in TECH_SKILL_DATABASE.values():
-        for skill in category:
-            pattern = rf"\b{re.escape(skill.lower())}\b"
-            matches = re.findall(pattern, text_lower)
-            if matches:
-                skill_counts[skill] = len(matches)
-
-    return dict(skill_counts)
+    return get_skill_matcher().frequencies(text)
 
 
 
@@ -776,8 +859,49 @@ if __name__ == "__main__":
         action="store_true",
         help="Show raw extracted text for debugging"
     )
+    parser.add_argument(
+        "--batch",
+        nargs="+",
+        metavar="DIR_OR_URL",
+        help="Parse every CV in these directories/files/URLs across a process pool, "
+             "printing one JSON line per CV."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for --batch (default: BATCH_WORKERS, one per core)."
+    )
+    parser.add_argument(
+        "--output",
+        default="-",
+        help="JSON Lines file for --batch results (default: stdout)."
+    )
     
     args = parser.parse_args()
+
+    if args.batch:
+        import sys
+        try:
+            from batch import BATCH_WORKERS, expand_sources, run_batch, write_jsonl
+        except ImportError:
+            from .batch import BATCH_WORKERS, expand_sources, run_batch, write_jsonl
+
+        sources = expand_sources(args.batch)
+        out = sys.stdout if args.output == "-" else open(args.output, "w")
+        started = time.perf_counter()
+        try:
+            counts = write_jsonl(run_batch(sources, args.workers or BATCH_WORKERS), out)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        elapsed = time.perf_counter() - started
+        print(
+            f"{len(sources)} CVs in {elapsed:.1f}s ({len(sources) / elapsed if elapsed else 0:.2f}/s): "
+            f"{counts['ok']} ok, {counts['error']} failed",
+            file=sys.stderr
+        )
+        raise SystemExit(1 if counts["error"] else 0)
     
     if args.debug:
         text = extract_text_from_pdf(args.url)
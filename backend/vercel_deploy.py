@@ -0,0 +1,207 @@
+import os
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from .site_renderer import MANIFEST_NAME
+except ImportError:
+    from site_renderer import MANIFEST_NAME
+
+logger = logging.getLogger(__name__)
+
+# Point at a local stub (see vercel_stub.py) to exercise deploys offline
+VERCEL_API_BASE = os.environ.get("VERCEL_API_BASE", "https://api.vercel.com").rstrip("/")
+VERCEL_TEAM_ID = os.environ.get("VERCEL_TEAM_ID", "")
+VERCEL_UPLOAD_WORKERS = int(os.environ.get("VERCEL_UPLOAD_WORKERS", 4))
+VERCEL_HTTP_TIMEOUT = float(os.environ.get("VERCEL_HTTP_TIMEOUT", 60))
+
+# Deployment retries after uploading the files Vercel reported missing
+MAX_MISSING_FILE_ROUNDS = 2
+
+CHUNK_SIZE = 1 << 16
+
+# Build metadata that stays on the server
+DEPLOY_EXCLUDE = {MANIFEST_NAME}
+
+
+class DeployError(RuntimeError):
+    """
+    A deployment the Vercel API rejected. `status` is the HTTP status of the
+    failing response, or None for errors found before or without one.
+    """
+
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def retryable(self) -> bool:
+        """Rate limits and server errors may pass on retry; anything else won't."""
+        return self.status is not None and (self.status == 429 or self.status >= 500)
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for deploy failures worth retrying: 429s, 5xx responses and network errors."""
+    if isinstance(error, DeployError):
+        return error.retryable
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Process-wide session so deploys reuse pooled keep-alive connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(VERCEL_UPLOAD_WORKERS, 4))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def sha1_file(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def collect_files(repo_path: str) -> list:
+    """[{file, sha, size, path}] for every deployable file under repo_path, sorted by file."""
+    files = []
+    for root, _, filenames in os.walk(repo_path):
+        for filename in filenames:
+            if filename in DEPLOY_EXCLUDE and root == repo_path:
+                continue
+            path = os.path.join(root, filename)
+            files.append({
+                "file": os.path.relpath(path, repo_path).replace("\\", "/"),
+                "sha": sha1_file(path),
+                "size": os.path.getsize(path),
+                "path": path,
+            })
+    return sorted(files, key=lambda f: f["file"])
+
+
+class VercelClient:
+    """Minimal client for the file-upload + file-reference deployment flow."""
+
+    def __init__(self, token: str, base_url: str = VERCEL_API_BASE, team_id: str = VERCEL_TEAM_ID,
+                 session: requests.Session = None, timeout: float = VERCEL_HTTP_TIMEOUT):
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.params = {"teamId": team_id} if team_id else {}
+        self.session = session or get_session()
+        self.timeout = timeout
+
+    def _headers(self, **extra) -> dict:
+        return {"Authorization": f"Bearer {self.token}", **extra}
+
+    def upload_file(self, entry: dict):
+        """Stream one file body to /v2/files, addressed by its SHA-1."""
+        with open(entry["path"], "rb") as f:
+            response = self.session.post(
+                f"{self.base_url}/v2/files",
+                params=self.params,
+                headers=self._headers(**{
+                    "Content-Type": "application/octet-stream",
+                    "Content-Length": str(entry["size"]),
+                    "x-vercel-digest": entry["sha"],
+                }),
+                data=f,
+                timeout=self.timeout,
+            )
+        if response.status_code not in (200, 201):
+            raise DeployError(
+                f"Uploading {entry['file']} failed: {_error_message(response)}", response.status_code
+            )
+
+    def create_deployment(self, name: str, files: list) -> requests.Response:
+        payload = {
+            "name": name,
+            "files": [{"file": f["file"], "sha": f["sha"], "size": f["size"]} for f in files],
+            "projectSettings": {
+                "framework": None  # Static site
+            },
+        }
+        return self.session.post(
+            f"{self.base_url}/v13/deployments",
+            params=self.params,
+            headers=self._headers(**{"Content-Type": "application/json"}),
+            json=payload,
+            timeout=self.timeout,
+        )
+
+    def upload_files(self, entries: list):
+        if not entries:
+            return
+        with ThreadPoolExecutor(max_workers=min(VERCEL_UPLOAD_WORKERS, len(entries))) as executor:
+            # list() re-raises the first upload error
+            list(executor.map(self.upload_file, entries))
+
+    def deploy(self, repo_path: str, name: str) -> dict:
+        """
+        Reference every file by SHA-1 and upload only the ones Vercel reports
+        missing, then retry. Unchanged files from earlier deploys (by anyone
+        on the account) are never re-sent.
+        """
+        files = collect_files(repo_path)
+        if not files:
+            raise DeployError("No files found in the generated folder to deploy.")
+
+        by_sha = {}
+        for entry in files:
+            by_sha.setdefault(entry["sha"], entry)
+
+        uploaded = 0
+        for _ in range(MAX_MISSING_FILE_ROUNDS + 1):
+            response = self.create_deployment(name, files)
+            if response.status_code == 200:
+                data = response.json()
+                return {
+                    "deployment_id": data.get("id"),
+                    "url": data["url"],
+                    "files": len(files),
+                    "uploaded": uploaded,
+                }
+
+            missing = _missing_files(response)
+            if not missing:
+                raise DeployError(_error_message(response), response.status_code)
+            unknown = [sha for sha in missing if sha not in by_sha]
+            if unknown:
+                raise DeployError(f"Vercel requested unknown files: {unknown}")
+
+            logger.info(f"Uploading {len(missing)} of {len(by_sha)} files missing on Vercel")
+            self.upload_files([by_sha[sha] for sha in missing])
+            uploaded += len(missing)
+
+        raise DeployError("Vercel still reports missing files after uploading them")
+
+
+def _missing_files(response: requests.Response) -> list:
+    try:
+        error = response.json().get("error", {})
+    except ValueError:
+        return []
+    if error.get("code") == "missing_files":
+        return list(error.get("missing") or [])
+    return []
+
+
+def _error_message(response: requests.Response) -> str:
+    try:
+        return response.json().get("error", {}).get("message", "Unknown Vercel API error")
+    except ValueError:
+        return f"HTTP {response.status_code}: {response.text[:200]}"
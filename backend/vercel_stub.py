@@ -0,0 +1,134 @@
+"""
+Local stand-in for the two Vercel endpoints deploy_site_tool uses.
+
+    POST /v2/files         store a blob, checked against x-vercel-digest
+    POST /v13/deployments  400 missing_files until every referenced sha is stored
+    GET  /_stub/stats      request/upload counters
+
+--fail-first N answers the first N deployment requests with a 500, to
+exercise the deploy queue's retries.
+
+Run it and point the backend at it:
+
+    python vercel_stub.py --port 8787
+    VERCEL_API_BASE=http://127.0.0.1:8787 VERCEL_TOKEN=dev uvicorn main:app
+"""
+import json
+import hashlib
+import argparse
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubState:
+    def __init__(self, fail_deployments: int = 0):
+        self.fail_deployments = fail_deployments
+        self.blobs = {}
+        self.deployments = []
+        self.counters = Counter()
+        self.lock = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    state: StubState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: dict):
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _authorized(self) -> bool:
+        if self.headers.get("Authorization", "").startswith("Bearer "):
+            return True
+        self._send(403, {"error": {"code": "forbidden", "message": "Missing token"}})
+        return False
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def do_GET(self):
+        if self.path.startswith("/_stub/stats"):
+            with self.state.lock:
+                self._send(200, {
+                    "blobs": len(self.state.blobs),
+                    "deployments": len(self.state.deployments),
+                    **self.state.counters
+                })
+        else:
+            self._send(404, {"error": {"code": "not_found", "message": self.path}})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        path = self.path.split("?", 1)[0]
+        if path == "/v2/files":
+            self._upload()
+        elif path == "/v13/deployments":
+            self._deploy()
+        else:
+            self._send(404, {"error": {"code": "not_found", "message": self.path}})
+
+    def _upload(self):
+        body = self._body()
+        digest = self.headers.get("x-vercel-digest", "")
+        if hashlib.sha1(body).hexdigest() != digest:
+            self._send(400, {"error": {"code": "invalid_digest", "message": "SHA-1 mismatch"}})
+            return
+        with self.state.lock:
+            self.state.blobs[digest] = body
+            self.state.counters["uploads"] += 1
+            self.state.counters["uploaded_bytes"] += len(body)
+        self._send(200, {})
+
+    def _deploy(self):
+        payload = json.loads(self._body() or b"{}")
+        files = payload.get("files") or []
+        with self.state.lock:
+            self.state.counters["deployment_requests"] += 1
+            if self.state.fail_deployments > 0:
+                self.state.fail_deployments -= 1
+                self._send(500, {"error": {"code": "internal_error", "message": "Injected stub failure"}})
+                return
+            missing = sorted({f["sha"] for f in files if f.get("sha") not in self.state.blobs})
+            if missing:
+                self._send(400, {"error": {
+                    "code": "missing_files",
+                    "message": "Missing files",
+                    "missing": missing
+                }})
+                return
+            deployment_id = f"dpl_{len(self.state.deployments) + 1}"
+            self.state.deployments.append({"id": deployment_id, "name": payload.get("name"), "files": files})
+        self._send(200, {
+            "id": deployment_id,
+            "url": f"{payload.get('name', 'site')}-{deployment_id}.stub.local",
+            "readyState": "READY"
+        })
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, fail_deployments: int = 0):
+    """Start the stub on a background thread; returns (server, base_url)."""
+    handler = type("BoundStubHandler", (StubHandler,), {"state": StubState(fail_deployments)})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local Vercel API stub.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--fail-first", type=int, default=0, help="Fail this many deployment requests with a 500.")
+    args = parser.parse_args()
+
+    handler = type("BoundStubHandler", (StubHandler,), {"state": StubState(args.fail_first)})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"Vercel stub listening on http://{args.host}:{args.port}")
+    server.serve_forever()
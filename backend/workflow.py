@@ -0,0 +1,284 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from typing import Annotated, Optional, TypedDict
+
+from langgraph.graph import StateGraph, START, END
+
+try:
+    from .pipeline import parse_cv_file, map_stage
+    from .metrics import metrics
+    from .tools import (
+        update_user_state_tool,
+        generate_site_tool,
+        preview_site_tool,
+        update_site_tool,
+    )
+except ImportError:
+    from pipeline import parse_cv_file, map_stage
+    from metrics import metrics
+    from tools import (
+        update_user_state_tool,
+        generate_site_tool,
+        preview_site_tool,
+        update_site_tool,
+    )
+
+logger = logging.getLogger(__name__)
+
+WORKFLOW_CHECKPOINT_PATH = os.environ.get("WORKFLOW_CHECKPOINT_PATH", "workflow_checkpoints.sqlite3")
+
+
+def _merge_timings(old: Optional[dict], new: Optional[dict]) -> dict:
+    return {**(old or {}), **(new or {})}
+
+
+class PortfolioState(TypedDict, total=False):
+    user_id: str
+    # Spooled upload; only readable during the run that parses it
+    file_path: str
+    # SHA-256 computed while the upload was spooled; reused as the parse cache key
+    file_digest: Optional[str]
+    enhancement_mode: str
+    cv_data: dict
+    portfolio_data: dict
+    confirmed: bool
+    theme: str
+    # What the current invocation asks for: None (run until confirmation is
+    # needed), "generate", "edit" or "deploy"
+    action: Optional[str]
+    updates: Optional[dict]
+    site: dict
+    preview: dict
+    rebuilt_sections: list
+    deployment: dict
+    # Last wall-clock duration of every node that ran on this thread
+    node_timings: Annotated[dict, _merge_timings]
+
+
+class NodeTimings:
+    """Process-wide per-node wall-clock stats for /workflow/stats."""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, node: str, duration_ms: float):
+        with self._lock:
+            stats = self._stats.setdefault(node, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0})
+            stats["count"] += 1
+            stats["total_ms"] += duration_ms
+            stats["max_ms"] = max(stats["max_ms"], duration_ms)
+            stats["last_ms"] = duration_ms
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                node: {
+                    **{key: round(value, 1) for key, value in stats.items()},
+                    "avg_ms": round(stats["total_ms"] / stats["count"], 1),
+                }
+                for node, stats in self._stats.items()
+            }
+
+
+node_timings = NodeTimings()
+
+
+def timed_node(name: str, fn):
+    """Wrap a node so its duration lands in the thread state, node_timings and /metrics."""
+    async def run(state: PortfolioState) -> dict:
+        started = time.perf_counter()
+        with metrics.timer("workflow_node_duration_seconds", node=name):
+            update = await fn(state) or {}
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        node_timings.record(name, duration_ms)
+        logger.info(f"Workflow node {name} for user {state.get('user_id')} took {duration_ms} ms")
+        return {**update, "node_timings": {name: duration_ms}}
+    return run
+
+
+def route_entry(state: PortfolioState) -> str:
+    """
+    Pick the first node that still has work to do, so a resumed thread
+    skips everything its checkpoint already holds.
+    """
+    if state.get("portfolio_data") is None:
+        return "map_portfolio" if state.get("cv_data") is not None else "parse_cv"
+    action = state.get("action")
+    if action == "edit":
+        return "edit_site"
+    if action == "deploy":
+        return "deploy_site"
+    if action == "generate" or not state.get("site"):
+        return "confirm_cv"
+    return "preview_site"
+
+
+def check_confirmation(state: PortfolioState) -> str:
+    # Unconfirmed runs stop here; the next invocation re-enters via route_entry
+    return "generate_site" if state.get("confirmed") else END
+
+
+def build_workflow(pool, deploy_queue) -> StateGraph:
+    """
+    parse_cv -> map_portfolio -> confirm_cv -> generate_site -> preview_site,
+    with edit_site and deploy_site reachable once a site exists.
+
+    Blocking work runs on the CV PipelinePool or in threads; deploys are
+    handed to the DeployQueue.
+    """
+
+    async def parse_cv(state):
+        cv_data = await pool.execute(
+            parse_cv_file,
+            state["file_path"],
+            state.get("enhancement_mode", "off"),
+            None,
+            state.get("file_digest")
+        )
+        return {"cv_data": cv_data}
+
+    async def map_portfolio(state):
+        portfolio_data = await pool.execute(map_stage, state["cv_data"])
+        await asyncio.to_thread(update_user_state_tool.invoke, {
+            "user_id": state["user_id"],
+            "fields": {
+                "cv_data": state["cv_data"],
+                "portfolio_data": portfolio_data,
+                "file_digest": state.get("file_digest")
+            }
+        })
+        return {"portfolio_data": portfolio_data}
+
+    async def confirm_cv(state):
+        return {}
+
+    async def generate_site(state):
+        repo_path = await asyncio.to_thread(generate_site_tool.invoke, {
+            "portfolio_data": state["portfolio_data"],
+            "theme": state.get("theme", "modern")
+        })
+        site = {"repo_path": repo_path}
+        await asyncio.to_thread(update_user_state_tool.invoke, {
+            "user_id": state["user_id"],
+            "fields": {"site": site}
+        })
+        return {"site": site}
+
+    async def preview_site(state):
+        return {"preview": preview_site_tool.invoke({"repo_path": state["site"]["repo_path"]})}
+
+    async def edit_site(state):
+        if not state.get("site"):
+            raise ValueError("No site has been generated yet")
+        result = await asyncio.to_thread(update_site_tool.invoke, {
+            "repo_path": state["site"]["repo_path"],
+            "updates": state.get("updates") or {},
+            "portfolio_data": state["portfolio_data"]
+        })
+        if result.get("status") != "success":
+            raise ValueError(result.get("message", "Site update failed"))
+
+        # Edits are copy-on-write, so the site may now live in a different folder
+        site = {**state["site"], "repo_path": result["repo_path"]}
+        await asyncio.to_thread(update_user_state_tool.invoke, {
+            "user_id": state["user_id"],
+            "fields": {"portfolio_data": result["portfolio_data"], "site": site}
+        })
+        return {
+            "portfolio_data": result["portfolio_data"],
+            "site": site,
+            "rebuilt_sections": result["rebuilt_sections"],
+            "updates": None
+        }
+
+    async def deploy_site(state):
+        if not state.get("site"):
+            raise ValueError("No site has been generated yet")
+        deployment = await deploy_queue.enqueue(state["user_id"], state["site"]["repo_path"])
+        return {"deployment": deployment.to_dict()}
+
+    graph = StateGraph(PortfolioState)
+    for name, fn in (
+        ("parse_cv", parse_cv),
+        ("map_portfolio", map_portfolio),
+        ("confirm_cv", confirm_cv),
+        ("generate_site", generate_site),
+        ("preview_site", preview_site),
+        ("edit_site", edit_site),
+        ("deploy_site", deploy_site),
+    ):
+        graph.add_node(name, timed_node(name, fn))
+
+    graph.add_conditional_edges(START, route_entry, {
+        name: name for name in
+        ("parse_cv", "map_portfolio", "confirm_cv", "preview_site", "edit_site", "deploy_site")
+    })
+    graph.add_edge("parse_cv", "map_portfolio")
+    graph.add_edge("map_portfolio", "confirm_cv")
+    graph.add_conditional_edges("confirm_cv", check_confirmation, {
+        "generate_site": "generate_site",
+        END: END
+    })
+    graph.add_edge("generate_site", "preview_site")
+    graph.add_edge("edit_site", "preview_site")
+    graph.add_edge("preview_site", END)
+    graph.add_edge("deploy_site", END)
+    return graph
+
+
+class WorkflowRunner:
+    """
+    The compiled workflow plus its SQLite checkpointer.
+
+    Each user is one checkpoint thread, so every later call for the same
+    user_id (generate, edit, deploy) resumes from that user's last completed
+    node instead of parsing again. Every upload starts a new user and so a
+    new thread. start() compiles the graph once; it must run inside the
+    event loop that will serve requests.
+    """
+
+    def __init__(self, graph: StateGraph, checkpoint_path: str = WORKFLOW_CHECKPOINT_PATH):
+        self.graph = graph
+        self.checkpoint_path = checkpoint_path
+        self.runnable = None
+        self._conn = None
+
+    async def start(self):
+        if self.runnable is not None:
+            return
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        self._conn = await aiosqlite.connect(self.checkpoint_path)
+        checkpointer = AsyncSqliteSaver(self._conn)
+        await checkpointer.setup()
+        self.runnable = self.graph.compile(checkpointer=checkpointer)
+        logger.info(f"Workflow compiled with checkpoints in {self.checkpoint_path}")
+
+    async def stop(self):
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+        self.runnable = None
+
+    @staticmethod
+    def _config(user_id: str) -> dict:
+        return {"configurable": {"thread_id": user_id}}
+
+    async def run(self, user_id: str, **inputs) -> dict:
+        """Run the graph for a user with the given state inputs; returns the resulting state."""
+        await self.start()
+        inputs = {"user_id": user_id, "action": None, **inputs}
+        return await self.runnable.ainvoke(inputs, self._config(user_id))
+
+    async def snapshot(self, user_id: str):
+        """Checkpointed state for a user, or None if they have never run."""
+        await self.start()
+        snapshot = await self.runnable.aget_state(self._config(user_id))
+        if not snapshot.values:
+            return None
+        return snapshot